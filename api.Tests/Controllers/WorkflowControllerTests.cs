@@ -220,4 +220,90 @@ public class WorkflowControllerTests : IAsyncLifetime
         Assert.Equal(workflowDto.Id, workflow.Id);
         Assert.Null(workflowDto.Result);
     }
+
+    [Fact]
+    public async Task CheckThatDTOIncludesResultStoredInBlobStorage()
+    {
+        // Arrange
+        var record = await _db.NewInspectionRecord(
+            blobName: "test",
+            inspectionType: "thermal-reading",
+            tag: "test-tag",
+            inspectionDescription: "test-descr"
+        );
+        var analysis = await _db.NewAnalysis(inspectionRecords: [record]);
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(run, workflowType: "thermal-reading");
+        workflow.Status = WorkflowStatus.Succeeded;
+        workflow.ResultBlobStorageLocation = _db.NewBlobStorageLocation(blobName: "result.json");
+        await _context.SaveChangesAsync(TestContext.Current.CancellationToken);
+        _factory.BlobStorageService.Blobs[workflow.ResultBlobStorageLocation.ToString()] =
+            JsonSerializer.SerializeToUtf8Bytes(new { temperature = 42.5f, confidence = 0.93f });
+
+        // Act
+        string Url = $"/api/workflow/id/{workflow.Id}";
+        var response = await Client.GetAsync(Url, TestContext.Current.CancellationToken);
+
+        var jsonOptions = new JsonSerializerOptions();
+        jsonOptions.Converters.Add(new JsonStringEnumConverter());
+        jsonOptions.PropertyNameCaseInsensitive = true;
+        jsonOptions.IncludeFields = true;
+
+        // Assert
+        Assert.True(response.IsSuccessStatusCode);
+
+        var workflowDto = await response.Content.ReadFromJsonAsync<WorkflowDto>(
+            jsonOptions,
+            TestContext.Current.CancellationToken
+        );
+
+        Assert.NotNull(workflowDto);
+        Assert.Null(workflowDto.ResultJson);
+        Assert.NotNull(workflowDto.ResultBlobSAS);
+        Assert.NotNull(workflowDto.Result);
+        Assert.Equal(42.5f.ToString("F2"), workflowDto.Result.Value);
+    }
+
+    [Fact]
+    public async Task CheckThatListDTOLinksResultStoredInBlobStorageWithoutReadingIt()
+    {
+        // Arrange
+        var record = await _db.NewInspectionRecord(
+            blobName: "test",
+            inspectionType: "thermal-reading",
+            tag: "test-tag",
+            inspectionDescription: "test-descr"
+        );
+        var analysis = await _db.NewAnalysis(inspectionRecords: [record]);
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(run, workflowType: "thermal-reading");
+        workflow.Status = WorkflowStatus.Succeeded;
+        workflow.ResultBlobStorageLocation = _db.NewBlobStorageLocation(blobName: "result.json");
+        await _context.SaveChangesAsync(TestContext.Current.CancellationToken);
+        _factory.BlobStorageService.Blobs[workflow.ResultBlobStorageLocation.ToString()] =
+            JsonSerializer.SerializeToUtf8Bytes(new { temperature = 42.5f, confidence = 0.93f });
+
+        // Act
+        string Url = $"/api/workflow?analysisRunId={run.Id}";
+        var response = await Client.GetAsync(Url, TestContext.Current.CancellationToken);
+
+        var jsonOptions = new JsonSerializerOptions();
+        jsonOptions.Converters.Add(new JsonStringEnumConverter());
+        jsonOptions.PropertyNameCaseInsensitive = true;
+        jsonOptions.IncludeFields = true;
+
+        // Assert
+        Assert.True(response.IsSuccessStatusCode);
+
+        var page = await response.Content.ReadFromJsonAsync<PagedResponse<WorkflowDto>>(
+            jsonOptions,
+            TestContext.Current.CancellationToken
+        );
+
+        Assert.NotNull(page);
+        var workflowDto = Assert.Single(page.Items);
+        Assert.Equal(workflow.Id, workflowDto.Id);
+        Assert.NotNull(workflowDto.ResultBlobSAS);
+        Assert.Null(workflowDto.Result);
+    }
 }
@@ -0,0 +1,603 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.IO.Compression;
+using System.Linq;
+using System.Net;
+using System.Net.Http;
+using System.Net.Http.Headers;
+using System.Net.Http.Json;
+using System.Text;
+using System.Text.Json;
+using System.Threading.Tasks;
+using api.Controllers;
+using api.Database.Context;
+using api.Database.Models;
+using Api.Test.Database;
+using Microsoft.EntityFrameworkCore;
+using Testcontainers.PostgreSql;
+using Xunit;
+
+namespace Api.Test.Controllers;
+
+public class WorkflowNotificationControllerTests : IAsyncLifetime
+{
+    private PostgreSqlContainer _container = null!;
+    private TestWebApplicationFactory<Program> _factory = null!;
+    private SaraDbContext _context = null!;
+    private DatabaseUtilities _db = null!;
+    private HttpClient _client = null!;
+
+    public async ValueTask InitializeAsync()
+    {
+        (_container, string cs) = await TestSetupHelpers.ConfigurePostgreSqlDatabase();
+        _factory = TestSetupHelpers.ConfigureWebApplicationFactory(cs);
+        _context = TestSetupHelpers.ConfigurePostgreSqlContext(cs);
+        _db = new DatabaseUtilities(_context);
+        _client = TestSetupHelpers.ConfigureHttpClient(_factory);
+    }
+
+    public async ValueTask DisposeAsync()
+    {
+        _client.Dispose();
+        await _context.DisposeAsync();
+        await _factory.DisposeAsync();
+        await _container.DisposeAsync();
+        GC.SuppressFinalize(this);
+    }
+
+    private static string LargeResultJson() =>
+        JsonSerializer.Serialize(
+            new
+            {
+                unit = "celsius",
+                temperatures = Enumerable.Range(0, 50_000).Select(i => 18 + i % 7700 / 100.0),
+            }
+        );
+
+    private static ByteArrayContent GzipJson(string json)
+    {
+        using var buffer = new MemoryStream();
+        using (var gzip = new GZipStream(buffer, CompressionLevel.Optimal))
+        {
+            gzip.Write(Encoding.UTF8.GetBytes(json));
+        }
+        var content = new ByteArrayContent(buffer.ToArray());
+        content.Headers.ContentType = new MediaTypeHeaderValue("application/json");
+        content.Headers.ContentEncoding.Add("gzip");
+        return content;
+    }
+
+    [Fact]
+    public async Task WorkflowResult_GzipBody_StoresDecompressedResult()
+    {
+        var record = await _db.NewInspectionRecord();
+        var analysis = await _db.NewAnalysis(inspectionRecords: [record]);
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(run);
+        var resultJson = LargeResultJson();
+
+        var response = await _client.PutAsync(
+            $"/api/workflow/{workflow.Id}/result",
+            GzipJson(JsonSerializer.Serialize(new { resultJson })),
+            TestContext.Current.CancellationToken
+        );
+
+        Assert.Equal(HttpStatusCode.NoContent, response.StatusCode);
+        await _context.Entry(workflow).ReloadAsync(TestContext.Current.CancellationToken);
+        Assert.Equal(resultJson, workflow.ResultJson);
+    }
+
+    [Fact]
+    public async Task WorkflowResult_UncompressedBody_StillAccepted()
+    {
+        var record = await _db.NewInspectionRecord();
+        var analysis = await _db.NewAnalysis(inspectionRecords: [record]);
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(run);
+        var resultJson = "{\"isBreak\":false,\"confidence\":0.5}";
+
+        var response = await _client.PutAsync(
+            $"/api/workflow/{workflow.Id}/result",
+            new StringContent(
+                JsonSerializer.Serialize(new { resultJson }),
+                Encoding.UTF8,
+                "application/json"
+            ),
+            TestContext.Current.CancellationToken
+        );
+
+        Assert.Equal(HttpStatusCode.NoContent, response.StatusCode);
+        var stored = await _context
+            .Workflows.AsNoTracking()
+            .SingleAsync(w => w.Id == workflow.Id, TestContext.Current.CancellationToken);
+        Assert.Equal(resultJson, stored.ResultJson);
+    }
+
+    [Fact]
+    public async Task WorkflowResult_BlobLocationInOutputContainer_StoresLocation()
+    {
+        var analysis = await _db.NewAnalysis();
+        var run = await _db.NewAnalysisRun(analysis);
+        var output = _db.NewBlobStorageLocation(blobName: "out/image.jpg");
+        var workflow = await _db.NewWorkflow(run, outputBlobStorageLocation: output);
+        var blobName = $"out/{workflow.Id}.result.json";
+
+        var response = await _client.PutAsJsonAsync(
+            $"/api/workflow/{workflow.Id}/result",
+            new
+            {
+                resultBlobStorageLocation = new
+                {
+                    storageAccount = output.StorageAccount,
+                    blobContainer = output.BlobContainer,
+                    blobName,
+                },
+            },
+            TestContext.Current.CancellationToken
+        );
+
+        Assert.Equal(HttpStatusCode.NoContent, response.StatusCode);
+        var stored = await _context
+            .Workflows.AsNoTracking()
+            .SingleAsync(w => w.Id == workflow.Id, TestContext.Current.CancellationToken);
+        Assert.Null(stored.ResultJson);
+        Assert.NotNull(stored.ResultBlobStorageLocation);
+        Assert.Equal(blobName, stored.ResultBlobStorageLocation.BlobName);
+    }
+
+    [Fact]
+    public async Task WorkflowResult_BlobLocationOutsideOutputContainer_ReturnsBadRequest()
+    {
+        var analysis = await _db.NewAnalysis();
+        var run = await _db.NewAnalysisRun(analysis);
+        var output = _db.NewBlobStorageLocation();
+        var workflow = await _db.NewWorkflow(run, outputBlobStorageLocation: output);
+
+        var response = await _client.PutAsJsonAsync(
+            $"/api/workflow/{workflow.Id}/result",
+            new
+            {
+                resultBlobStorageLocation = new
+                {
+                    storageAccount = output.StorageAccount,
+                    blobContainer = "elsewhere",
+                    blobName = "result.json",
+                },
+            },
+            TestContext.Current.CancellationToken
+        );
+
+        Assert.Equal(HttpStatusCode.BadRequest, response.StatusCode);
+        var stored = await _context
+            .Workflows.AsNoTracking()
+            .SingleAsync(w => w.Id == workflow.Id, TestContext.Current.CancellationToken);
+        Assert.Null(stored.ResultBlobStorageLocation);
+    }
+
+    private Task<HttpResponseMessage> PutExited(Guid workflowId, object body, string key)
+    {
+        var request = new HttpRequestMessage(HttpMethod.Put, $"/api/workflow/{workflowId}/exited")
+        {
+            Content = JsonContent.Create(body),
+        };
+        request.Headers.Add(WorkflowNotificationController.IdempotencyKeyHeader, key);
+        return _client.SendAsync(request, TestContext.Current.CancellationToken);
+    }
+
+    [Fact]
+    public async Task WorkflowExited_RepeatedIdempotencyKey_CompletesWorkflowOnce()
+    {
+        var analysis = await _db.NewAnalysis();
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(run, workflowType: "test-workflow-1", stepNumber: 1);
+        await _db.NewWorkflow(
+            run,
+            workflowType: "test-workflow-2",
+            stepNumber: 2,
+            outputBlobStorageLocation: _db.NewBlobStorageLocation()
+        );
+        var key = Guid.NewGuid().ToString();
+
+        var first = await PutExited(workflow.Id, new { exitStatus = "Succeeded" }, key);
+        await _factory.WaitForWorkflowCompletions();
+        var stored = await _context
+            .Workflows.AsNoTracking()
+            .SingleAsync(w => w.Id == workflow.Id, TestContext.Current.CancellationToken);
+        var repeated = await PutExited(workflow.Id, new { exitStatus = "Succeeded" }, key);
+        await _factory.WaitForWorkflowCompletions();
+
+        Assert.Equal(HttpStatusCode.Accepted, first.StatusCode);
+        Assert.Equal(HttpStatusCode.NoContent, repeated.StatusCode);
+        var afterRepeat = await _context
+            .Workflows.AsNoTracking()
+            .SingleAsync(w => w.Id == workflow.Id, TestContext.Current.CancellationToken);
+        Assert.Equal(key, afterRepeat.ExitedIdempotencyKey);
+        Assert.Equal(stored.CompletedAt, afterRepeat.CompletedAt);
+        // The next step was triggered by the first exit only.
+        Assert.Single(_factory.ArgoHttpHandler.Requests, r => r.Method == HttpMethod.Post);
+    }
+
+    [Fact]
+    public async Task WorkflowExited_ParallelRequestsWithSameKey_CompleteWorkflowOnce()
+    {
+        var analysis = await _db.NewAnalysis();
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(run, workflowType: "test-workflow-1", stepNumber: 1);
+        await _db.NewWorkflow(
+            run,
+            workflowType: "test-workflow-2",
+            stepNumber: 2,
+            outputBlobStorageLocation: _db.NewBlobStorageLocation()
+        );
+        var key = Guid.NewGuid().ToString();
+
+        var responses = await Task.WhenAll(
+            Enumerable
+                .Range(0, 2)
+                .Select(_ => PutExited(workflow.Id, new { exitStatus = "Succeeded" }, key))
+        );
+        await _factory.WaitForWorkflowCompletions();
+
+        Assert.All(responses, r => Assert.True(r.IsSuccessStatusCode));
+        Assert.Single(_factory.ArgoHttpHandler.Requests, r => r.Method == HttpMethod.Post);
+    }
+
+    [Fact]
+    public async Task WorkflowExited_RepeatedKeyBeforeCompletionProcessed_QueuesCompletionAgain()
+    {
+        var analysis = await _db.NewAnalysis();
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(run, workflowType: "test-workflow-1", stepNumber: 1);
+        await _db.NewWorkflow(
+            run,
+            workflowType: "test-workflow-2",
+            stepNumber: 2,
+            outputBlobStorageLocation: _db.NewBlobStorageLocation()
+        );
+        var key = Guid.NewGuid().ToString();
+        await PutExited(workflow.Id, new { exitStatus = "Succeeded" }, key);
+        await _factory.WaitForWorkflowCompletions();
+        // As if the pod had restarted before the completion ran.
+        await _context
+            .Workflows.Where(w => w.Id == workflow.Id)
+            .ExecuteUpdateAsync(
+                setters => setters.SetProperty(w => w.CompletionProcessedAt, (DateTime?)null),
+                TestContext.Current.CancellationToken
+            );
+
+        var repeated = await PutExited(workflow.Id, new { exitStatus = "Succeeded" }, key);
+        await _factory.WaitForWorkflowCompletions();
+
+        Assert.Equal(HttpStatusCode.Accepted, repeated.StatusCode);
+        var stored = await _context
+            .Workflows.AsNoTracking()
+            .SingleAsync(w => w.Id == workflow.Id, TestContext.Current.CancellationToken);
+        Assert.NotNull(stored.CompletionProcessedAt);
+    }
+
+    [Fact]
+    public async Task WorkflowExited_NewIdempotencyKey_IsApplied()
+    {
+        var workflows = await NewWorkflows(1);
+
+        await PutExited(workflows[0].Id, new { exitStatus = "Failed", errorMessage = "a" }, "k1");
+        var response = await PutExited(
+            workflows[0].Id,
+            new { exitStatus = "Failed", errorMessage = "b" },
+            "k2"
+        );
+
+        Assert.Equal(HttpStatusCode.Accepted, response.StatusCode);
+        var stored = await _context
+            .Workflows.AsNoTracking()
+            .SingleAsync(w => w.Id == workflows[0].Id, TestContext.Current.CancellationToken);
+        Assert.Equal("b", stored.ErrorMessage);
+        Assert.Equal("k2", stored.ExitedIdempotencyKey);
+    }
+
+    [Fact]
+    public async Task WorkflowExited_ReturnsAcceptedAndCompletesInBackground()
+    {
+        var analysis = await _db.NewAnalysis();
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(run, workflowType: "test-workflow-1", stepNumber: 1);
+        await _db.NewWorkflow(
+            run,
+            workflowType: "test-workflow-2",
+            stepNumber: 2,
+            outputBlobStorageLocation: _db.NewBlobStorageLocation()
+        );
+
+        var response = await PutExited(
+            workflow.Id,
+            new { exitStatus = "Succeeded" },
+            Guid.NewGuid().ToString()
+        );
+
+        Assert.Equal(HttpStatusCode.Accepted, response.StatusCode);
+        var stored = await _context
+            .Workflows.AsNoTracking()
+            .SingleAsync(w => w.Id == workflow.Id, TestContext.Current.CancellationToken);
+        Assert.Equal(WorkflowStatus.Succeeded, stored.Status);
+        await _factory.WaitForWorkflowCompletions();
+        Assert.Single(_factory.ArgoHttpHandler.Requests, r => r.Method == HttpMethod.Post);
+    }
+
+    private Task<HttpResponseMessage> PutProgress(Guid workflowId, object body) =>
+        _client.PutAsJsonAsync(
+            $"/api/workflow/{workflowId}/progress",
+            body,
+            TestContext.Current.CancellationToken
+        );
+
+    [Fact]
+    public async Task WorkflowProgress_StoresLatestProgressAndMarksStarted()
+    {
+        var workflows = await NewWorkflows(1);
+
+        await PutProgress(workflows[0].Id, new { percent = 10, stage = "Loading" });
+        var response = await PutProgress(
+            workflows[0].Id,
+            new { percent = 42.5, stage = "Anonymizing frames" }
+        );
+
+        Assert.Equal(HttpStatusCode.NoContent, response.StatusCode);
+        var stored = await _context
+            .Workflows.AsNoTracking()
+            .SingleAsync(w => w.Id == workflows[0].Id, TestContext.Current.CancellationToken);
+        Assert.Equal(WorkflowStatus.InProgress, stored.Status);
+        Assert.NotNull(stored.StartedAt);
+        Assert.Equal(42.5, stored.ProgressPercent);
+        Assert.Equal("Anonymizing frames", stored.ProgressStage);
+        Assert.NotNull(stored.ProgressUpdatedAt);
+    }
+
+    [Fact]
+    public async Task WorkflowProgress_AfterExit_IsIgnored()
+    {
+        var workflows = await NewWorkflows(1);
+        await PutExited(workflows[0].Id, new { exitStatus = "Failed" }, "exited-key");
+        await _factory.WaitForWorkflowCompletions();
+
+        var response = await PutProgress(workflows[0].Id, new { percent = 90 });
+
+        Assert.Equal(HttpStatusCode.NoContent, response.StatusCode);
+        var stored = await _context
+            .Workflows.AsNoTracking()
+            .SingleAsync(w => w.Id == workflows[0].Id, TestContext.Current.CancellationToken);
+        Assert.Equal(WorkflowStatus.Failed, stored.Status);
+        Assert.Null(stored.ProgressPercent);
+        Assert.Null(stored.ProgressUpdatedAt);
+    }
+
+    [Fact]
+    public async Task WorkflowProgress_Invalid_ReturnsBadRequest()
+    {
+        var workflows = await NewWorkflows(1);
+
+        var outOfRange = await PutProgress(workflows[0].Id, new { percent = 120 });
+        var empty = await PutProgress(workflows[0].Id, new { });
+
+        Assert.Equal(HttpStatusCode.BadRequest, outOfRange.StatusCode);
+        Assert.Equal(HttpStatusCode.BadRequest, empty.StatusCode);
+    }
+
+    private async Task<List<Workflow>> NewWorkflows(int count)
+    {
+        var record = await _db.NewInspectionRecord();
+        var analysis = await _db.NewAnalysis(inspectionRecords: [record]);
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflows = new List<Workflow>();
+        for (var i = 0; i < count; i++)
+        {
+            workflows.Add(await _db.NewWorkflow(run, stepNumber: i + 1));
+        }
+        return workflows;
+    }
+
+    [Fact]
+    public async Task WorkflowBatch_AppliesEventsInOrder()
+    {
+        var workflows = await NewWorkflows(2);
+        var unknownId = Guid.NewGuid();
+        WorkflowNotificationEvent[] events =
+        [
+            new()
+            {
+                WorkflowId = workflows[0].Id,
+                Event = WorkflowNotificationEventType.Started,
+                ArgoWorkflowName = "argo-0",
+            },
+            new()
+            {
+                WorkflowId = workflows[1].Id,
+                Event = WorkflowNotificationEventType.Started,
+            },
+            new()
+            {
+                WorkflowId = workflows[0].Id,
+                Event = WorkflowNotificationEventType.Result,
+                ResultJson = "{\"rain\":true}",
+            },
+            new()
+            {
+                WorkflowId = workflows[1].Id,
+                Event = WorkflowNotificationEventType.Exited,
+                ExitStatus = WorkflowExitStatus.Failed,
+                ErrorMessage = "boom",
+            },
+            new() { WorkflowId = unknownId, Event = WorkflowNotificationEventType.Started },
+        ];
+
+        var response = await _client.PutAsJsonAsync(
+            "/api/workflow/batch",
+            events,
+            TestContext.Current.CancellationToken
+        );
+
+        Assert.Equal(HttpStatusCode.OK, response.StatusCode);
+        var body = await response.Content.ReadFromJsonAsync<WorkflowNotificationBatchResponse>(
+            TestContext.Current.CancellationToken
+        );
+        Assert.NotNull(body);
+        Assert.Equal(4, body.Applied);
+        Assert.Equal([unknownId], body.NotFound);
+
+        var stored = await _context
+            .Workflows.AsNoTracking()
+            .Where(w => w.Id == workflows[0].Id || w.Id == workflows[1].Id)
+            .ToDictionaryAsync(w => w.Id, TestContext.Current.CancellationToken);
+        Assert.Equal(WorkflowStatus.InProgress, stored[workflows[0].Id].Status);
+        Assert.Equal("argo-0", stored[workflows[0].Id].ArgoWorkflowName);
+        Assert.Equal("{\"rain\":true}", stored[workflows[0].Id].ResultJson);
+        Assert.Equal(WorkflowStatus.Failed, stored[workflows[1].Id].Status);
+        Assert.Equal("boom", stored[workflows[1].Id].ErrorMessage);
+    }
+
+    [Fact]
+    public async Task WorkflowBatch_RepeatedExitedKey_IsCountedAsDuplicate()
+    {
+        var workflows = await NewWorkflows(1);
+        var exited = new WorkflowNotificationEvent
+        {
+            WorkflowId = workflows[0].Id,
+            Event = WorkflowNotificationEventType.Exited,
+            ExitStatus = WorkflowExitStatus.Failed,
+            ErrorMessage = "boom",
+            IdempotencyKey = "exited-key",
+        };
+
+        var response = await _client.PutAsJsonAsync(
+            "/api/workflow/batch",
+            new[] { exited, exited },
+            TestContext.Current.CancellationToken
+        );
+
+        Assert.Equal(HttpStatusCode.OK, response.StatusCode);
+        var body = await response.Content.ReadFromJsonAsync<WorkflowNotificationBatchResponse>(
+            TestContext.Current.CancellationToken
+        );
+        Assert.NotNull(body);
+        Assert.Equal(1, body.Applied);
+        Assert.Equal(1, body.Duplicates);
+    }
+
+    [Fact]
+    public async Task WorkflowBatch_ExitedWithoutStatus_ReturnsBadRequest()
+    {
+        var workflows = await NewWorkflows(1);
+
+        var response = await _client.PutAsJsonAsync(
+            "/api/workflow/batch",
+            new[]
+            {
+                new { workflowId = workflows[0].Id, @event = "Exited" },
+            },
+            TestContext.Current.CancellationToken
+        );
+
+        Assert.Equal(HttpStatusCode.BadRequest, response.StatusCode);
+    }
+
+    [Fact]
+    public async Task WorkflowBatch_ProgressAfterExited_IsIgnored()
+    {
+        var workflows = await NewWorkflows(2);
+        WorkflowNotificationEvent[] events =
+        [
+            new()
+            {
+                WorkflowId = workflows[0].Id,
+                Event = WorkflowNotificationEventType.Progress,
+                Percent = 50,
+            },
+            new()
+            {
+                WorkflowId = workflows[1].Id,
+                Event = WorkflowNotificationEventType.Exited,
+                ExitStatus = WorkflowExitStatus.Succeeded,
+            },
+            new()
+            {
+                WorkflowId = workflows[1].Id,
+                Event = WorkflowNotificationEventType.Progress,
+                Stage = "Late",
+            },
+        ];
+
+        var response = await _client.PutAsJsonAsync(
+            "/api/workflow/batch",
+            events,
+            TestContext.Current.CancellationToken
+        );
+        await _factory.WaitForWorkflowCompletions();
+
+        Assert.Equal(HttpStatusCode.OK, response.StatusCode);
+        var stored = await _context
+            .Workflows.AsNoTracking()
+            .Where(w => w.Id == workflows[0].Id || w.Id == workflows[1].Id)
+            .ToDictionaryAsync(w => w.Id, TestContext.Current.CancellationToken);
+        Assert.Equal(50, stored[workflows[0].Id].ProgressPercent);
+        Assert.Null(stored[workflows[1].Id].ProgressStage);
+    }
+
+    /// <summary>
+    /// Benchmark: N started notifications sent one request at a time versus in
+    /// one batch, against the Testcontainers database.
+    /// </summary>
+    [Fact]
+    public async Task WorkflowBatch_IsFasterThanSingleNotifications()
+    {
+        const int count = 50;
+        var workflows = await NewWorkflows(2 * count);
+        var single = workflows.Take(count).ToList();
+        var batched = workflows.Skip(count).ToList();
+
+        // Warm up routing, authentication and EF Core before timing.
+        await _client.PutAsync(
+            $"/api/workflow/{single[0].Id}/started",
+            null,
+            TestContext.Current.CancellationToken
+        );
+
+        var singleTimer = Stopwatch.StartNew();
+        foreach (var workflow in single)
+        {
+            var response = await _client.PutAsync(
+                $"/api/workflow/{workflow.Id}/started",
+                null,
+                TestContext.Current.CancellationToken
+            );
+            Assert.Equal(HttpStatusCode.NoContent, response.StatusCode);
+        }
+        singleTimer.Stop();
+
+        var batchTimer = Stopwatch.StartNew();
+        var batchResponse = await _client.PutAsJsonAsync(
+            "/api/workflow/batch",
+            batched.Select(w => new WorkflowNotificationEvent
+            {
+                WorkflowId = w.Id,
+                Event = WorkflowNotificationEventType.Started,
+            }),
+            TestContext.Current.CancellationToken
+        );
+        batchTimer.Stop();
+
+        Assert.Equal(HttpStatusCode.OK, batchResponse.StatusCode);
+        TestContext.Current.TestOutputHelper?.WriteLine(
+            $"{count} started events: {singleTimer.ElapsedMilliseconds} ms as single "
+                + $"requests, {batchTimer.ElapsedMilliseconds} ms as one batch"
+        );
+        Assert.True(batchTimer.Elapsed < singleTimer.Elapsed);
+        Assert.Equal(
+            2 * count,
+            await _context.Workflows.CountAsync(
+                w => w.Status == WorkflowStatus.InProgress,
+                TestContext.Current.CancellationToken
+            )
+        );
+    }
+}
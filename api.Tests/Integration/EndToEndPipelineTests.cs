@@ -83,11 +83,13 @@ public class EndToEndPipelineTests : IAsyncLifetime
     {
         var client = _factory.CreateClient();
         var notification = new WorkflowExitedNotification { ExitStatus = exitStatus };
-        return await client.PutAsJsonAsync(
+        var response = await client.PutAsJsonAsync(
             $"/api/workflow/{workflowId}/exited",
             notification,
             TestContext.Current.CancellationToken
         );
+        await _factory.WaitForWorkflowCompletions();
+        return response;
     }
 
     [Fact]
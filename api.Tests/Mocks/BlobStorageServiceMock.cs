@@ -1,4 +1,5 @@
 using System;
+using System.Collections.Concurrent;
 using System.IO;
 using System.Threading.Tasks;
 using api.Database.Models;
@@ -6,14 +7,26 @@ using api.Services;
 
 namespace Api.Test.Mocks;
 
+/// <summary>
+/// In-memory stand-in for blob storage, in the spirit of Azurite: uploaded blobs are
+/// kept in <see cref="Blobs"/> by location and can be downloaded again. Downloading a
+/// blob that was never uploaded returns an empty stream.
+/// </summary>
 public class BlobStorageServiceMock : IBlobStorageService
 {
     public bool BlobExists { get; set; } = true;
 
+    public ConcurrentDictionary<string, byte[]> Blobs { get; } = new();
+
+    public ConcurrentQueue<BlobStorageLocation> Downloads { get; } = new();
+
     public async Task<MemoryStream> DownloadBlobAsync(BlobStorageLocation location)
     {
-        var stream = new MemoryStream();
-        return stream;
+        await Task.CompletedTask;
+        Downloads.Enqueue(location);
+        return Blobs.TryGetValue(location.ToString(), out var content)
+            ? new MemoryStream(content)
+            : new MemoryStream();
     }
 
     public async Task UploadBlobAsync(
@@ -22,7 +35,10 @@ public class BlobStorageServiceMock : IBlobStorageService
         string contentType
     )
     {
-        await Task.CompletedTask;
+        using var buffer = new MemoryStream();
+        content.Position = 0;
+        await content.CopyToAsync(buffer);
+        Blobs[destination.ToString()] = buffer.ToArray();
     }
 
     public async Task CopyBlobAsync(BlobStorageLocation source, BlobStorageLocation destination)
@@ -1,6 +1,7 @@
 using System;
 using System.Collections.Generic;
 using System.Linq;
+using System.Text;
 using System.Text.Json;
 using System.Threading.Tasks;
 using api.Database.Context;
@@ -78,6 +79,39 @@ public class CLOEResultHandlerTests : IAsyncLifetime
         Assert.Equal(oilLevel * 100, upload.Value);
     }
 
+    [Fact]
+    public async Task OnWorkflowCompleted_ResultInBlobStorage_DownloadsAndPublishesIt()
+    {
+        const float oilLevel = 0.42f;
+
+        var record = await _db.NewInspectionRecord(inspectionId: "insp-123");
+        var analysis = await _db.NewAnalysis(inspectionRecords: [record]);
+        var run = await _db.NewAnalysisRun(analysis);
+        var output = _db.NewBlobStorageLocation(blobName: "result.json");
+        var workflow = await _db.NewWorkflow(
+            run,
+            workflowType: "cloe",
+            outputBlobStorageLocation: output
+        );
+        var resultBlob = _db.NewBlobStorageLocation(blobName: $"{workflow.Id}.result.json");
+        _factory.BlobStorageService.Blobs[resultBlob.ToString()] = Encoding.UTF8.GetBytes(
+            JsonSerializer.Serialize(new { oilLevel = oilLevel, confidence = 0.93f })
+        );
+        workflow.ResultBlobStorageLocation = resultBlob;
+        await _context.SaveChangesAsync(TestContext.Current.CancellationToken);
+
+        using var scope = _factory.Services.CreateScope();
+        var handler = ResolveHandler(scope);
+
+        await handler.OnWorkflowCompleted(workflow);
+
+        Assert.Single(_factory.MqttPublisher.AnalysisResultMessages);
+        var upload = Assert.Single(_factory.TimeseriesService.Uploads);
+        Assert.Equal(oilLevel * 100, upload.Value);
+        var download = Assert.Single(_factory.BlobStorageService.Downloads);
+        Assert.Equal(resultBlob.ToString(), download.ToString());
+    }
+
     [Fact]
     public async Task OnWorkflowCompleted_NoResolvableInspectionRecord_DoesNotPublish()
     {
@@ -0,0 +1,79 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics.Metrics;
+using System.Threading.Tasks;
+using api.Configurations;
+using api.Services;
+using Microsoft.Extensions.Options;
+using Xunit;
+
+namespace Api.Test.Services;
+
+public class WorkflowCompletionQueueTests : IDisposable
+{
+    private readonly Meter _meter = new("WorkflowCompletionQueueTests");
+
+    public void Dispose()
+    {
+        _meter.Dispose();
+        GC.SuppressFinalize(this);
+    }
+
+    private WorkflowCompletionQueue NewQueue(int capacity) =>
+        new(Options.Create(new AnalysisOptions { CompletionQueueCapacity = capacity }), _meter);
+
+    [Fact]
+    public void TryEnqueue_QueueFull_ReturnsFalse()
+    {
+        var queue = NewQueue(capacity: 2);
+
+        Assert.True(queue.TryEnqueue(Guid.NewGuid()));
+        Assert.True(queue.TryEnqueue(Guid.NewGuid()));
+        Assert.False(queue.TryEnqueue(Guid.NewGuid()));
+        Assert.Equal(2, queue.Pending);
+    }
+
+    [Fact]
+    public async Task TryEnqueue_WorkflowQueuedOrBeingProcessed_IsNotQueuedAgain()
+    {
+        var queue = NewQueue(capacity: 10);
+        var workflowId = Guid.NewGuid();
+        var processed = new List<Guid>();
+
+        Assert.True(queue.TryEnqueue(workflowId));
+        Assert.True(queue.TryEnqueue(workflowId));
+        queue.Complete();
+        await queue.ProcessAllAsync(id =>
+        {
+            processed.Add(id);
+            Assert.True(queue.TryEnqueue(id));
+            return Task.CompletedTask;
+        });
+
+        Assert.Equal(workflowId, Assert.Single(processed));
+        Assert.Equal(0, queue.Pending);
+    }
+
+    [Fact]
+    public async Task ProcessAllAsync_AfterComplete_DrainsQueuedWorkflowsInOrder()
+    {
+        var queue = NewQueue(capacity: 10);
+        var queued = new[] { Guid.NewGuid(), Guid.NewGuid(), Guid.NewGuid() };
+        foreach (var workflowId in queued)
+        {
+            queue.TryEnqueue(workflowId);
+        }
+        var processed = new List<Guid>();
+
+        queue.Complete();
+        await queue.ProcessAllAsync(workflowId =>
+        {
+            processed.Add(workflowId);
+            return Task.CompletedTask;
+        });
+
+        Assert.Equal(queued, processed);
+        Assert.Equal(0, queue.Pending);
+        Assert.False(queue.TryEnqueue(Guid.NewGuid()));
+    }
+}
@@ -1,4 +1,7 @@
 using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
 using System.Net;
 using System.Text.Json;
 using System.Threading.Tasks;
@@ -134,6 +137,26 @@ public class WorkflowServiceTests : IAsyncLifetime
         Assert.Equal(workflowType, doc.RootElement.GetProperty("workflowType").GetString());
     }
 
+    [Fact]
+    public async Task TriggerWorkflow_PayloadIncludesTraceparentOfCurrentActivity()
+    {
+        var analysis = await _db.NewAnalysis();
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(
+            run,
+            workflowType: "test-workflow-1",
+            outputBlobStorageLocation: _db.NewBlobStorageLocation()
+        );
+
+        using var activity = new Activity("test").SetIdFormat(ActivityIdFormat.W3C).Start();
+        await TriggerWorkflowInScope(workflow.Id);
+
+        var request = Assert.Single(_factory.ArgoHttpHandler.Requests);
+        using var doc = JsonDocument.Parse(request.Body);
+        var traceparent = doc.RootElement.GetProperty("traceparent").GetString();
+        Assert.Contains(activity.TraceId.ToHexString(), traceparent);
+    }
+
     [Fact]
     public async Task TriggerWorkflow_HappyPathWithEnricher_PayloadIncludesEnrichedFields()
     {
@@ -263,6 +286,116 @@ public class WorkflowServiceTests : IAsyncLifetime
         Assert.Empty(_factory.ArgoHttpHandler.Requests);
     }
 
+    [Fact]
+    public async Task OnWorkflowCompleted_AlreadyProcessed_IsSkipped()
+    {
+        var analysis = await _db.NewAnalysis();
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(run, workflowType: "test-workflow-1", stepNumber: 1);
+        workflow.Status = WorkflowStatus.Succeeded;
+        await _db.NewWorkflow(
+            run,
+            workflowType: "test-workflow-2",
+            stepNumber: 2,
+            outputBlobStorageLocation: _db.NewBlobStorageLocation()
+        );
+        await _context.SaveChangesAsync(TestContext.Current.CancellationToken);
+
+        await OnWorkflowCompletedInScope(workflow.Id);
+        await OnWorkflowCompletedInScope(workflow.Id);
+
+        await _context.Entry(workflow).ReloadAsync(TestContext.Current.CancellationToken);
+        Assert.NotNull(workflow.CompletionProcessedAt);
+        Assert.Single(_factory.ArgoHttpHandler.Requests);
+    }
+
+    [Fact]
+    public async Task OnWorkflowCompleted_ClaimedByAnotherWorker_IsSkipped()
+    {
+        var analysis = await _db.NewAnalysis();
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(run, workflowType: "test-workflow-1", stepNumber: 1);
+        workflow.Status = WorkflowStatus.Succeeded;
+        workflow.CompletionClaimedAt = DateTime.UtcNow;
+        await _db.NewWorkflow(
+            run,
+            workflowType: "test-workflow-2",
+            stepNumber: 2,
+            outputBlobStorageLocation: _db.NewBlobStorageLocation()
+        );
+        await _context.SaveChangesAsync(TestContext.Current.CancellationToken);
+
+        await OnWorkflowCompletedInScope(workflow.Id);
+
+        await _context.Entry(workflow).ReloadAsync(TestContext.Current.CancellationToken);
+        Assert.Null(workflow.CompletionProcessedAt);
+        Assert.Empty(_factory.ArgoHttpHandler.Requests);
+    }
+
+    [Fact]
+    public async Task OnWorkflowCompleted_ExpiredClaim_IsTakenOver()
+    {
+        var analysis = await _db.NewAnalysis();
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflow = await _db.NewWorkflow(run, workflowType: "test-workflow-1", stepNumber: 1);
+        workflow.Status = WorkflowStatus.Succeeded;
+        workflow.CompletionClaimedAt = DateTime.UtcNow.AddHours(-1);
+        await _db.NewWorkflow(
+            run,
+            workflowType: "test-workflow-2",
+            stepNumber: 2,
+            outputBlobStorageLocation: _db.NewBlobStorageLocation()
+        );
+        await _context.SaveChangesAsync(TestContext.Current.CancellationToken);
+
+        await OnWorkflowCompletedInScope(workflow.Id);
+
+        await _context.Entry(workflow).ReloadAsync(TestContext.Current.CancellationToken);
+        Assert.NotNull(workflow.CompletionProcessedAt);
+        Assert.Null(workflow.CompletionClaimedAt);
+        Assert.Single(_factory.ArgoHttpHandler.Requests);
+    }
+
+    [Fact]
+    public async Task ReadIdsAwaitingCompletion_ReturnsUnprocessedUnclaimedExitsBeforeCutoff()
+    {
+        var analysis = await _db.NewAnalysis();
+        var run = await _db.NewAnalysisRun(analysis);
+        var workflows = new List<Workflow>();
+        for (var i = 0; i < 7; i++)
+        {
+            workflows.Add(await _db.NewWorkflow(run, stepNumber: i + 1));
+        }
+        var longAgo = DateTime.UtcNow.AddHours(-1);
+        workflows[0].Status = WorkflowStatus.Succeeded;
+        workflows[0].CompletedAt = longAgo;
+        workflows[1].Status = WorkflowStatus.Failed;
+        workflows[1].CompletedAt = longAgo;
+        workflows[2].Status = WorkflowStatus.Succeeded;
+        workflows[2].CompletedAt = longAgo;
+        workflows[2].CompletionProcessedAt = longAgo;
+        workflows[3].Status = WorkflowStatus.Succeeded;
+        workflows[3].CompletedAt = DateTime.UtcNow;
+        workflows[4].Status = WorkflowStatus.Skipped;
+        workflows[4].CompletedAt = longAgo;
+        workflows[5].Status = WorkflowStatus.Succeeded;
+        workflows[5].CompletedAt = longAgo;
+        workflows[5].CompletionClaimedAt = DateTime.UtcNow;
+        workflows[6].Status = WorkflowStatus.Succeeded;
+        workflows[6].CompletedAt = longAgo;
+        workflows[6].CompletionClaimedAt = longAgo;
+        await _context.SaveChangesAsync(TestContext.Current.CancellationToken);
+
+        using var scope = _factory.Services.CreateScope();
+        var ids = await ResolveService(scope)
+            .ReadIdsAwaitingCompletion(DateTime.UtcNow.AddMinutes(-1), limit: 10);
+
+        Assert.Equal(
+            new[] { workflows[0].Id, workflows[1].Id, workflows[6].Id }.Order(),
+            ids.Order()
+        );
+    }
+
     [Fact]
     public async Task OnWorkflowCompleted_SucceededWithRegisteredHandler_DispatchesHandler()
     {
@@ -404,6 +537,7 @@ public class WorkflowServiceTests : IAsyncLifetime
         gate.Status = WorkflowStatus.Succeeded;
         gate.ResultJson = "{\"skip\":true}";
         gate.CompletedAt = DateTime.UtcNow;
+        gate.ExitedIdempotencyKey = "first-run";
         var downstream = await _db.NewWorkflow(
             run,
             workflowType: "test-workflow-2",
@@ -431,6 +565,7 @@ public class WorkflowServiceTests : IAsyncLifetime
         Assert.Null(run.CompletedAt);
         Assert.Equal(WorkflowStatus.InProgress, gate.Status);
         Assert.Null(gate.ResultJson);
+        Assert.Null(gate.ExitedIdempotencyKey);
         Assert.Equal(WorkflowStatus.Pending, downstream.Status);
         Assert.Null(downstream.CompletedAt);
         var request = Assert.Single(_factory.ArgoHttpHandler.Requests);
@@ -1,10 +1,13 @@
+using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Threading.Tasks;
 using api.Configurations;
 using api.Database.Context;
 using api.MQTT;
 using api.Services;
+using api.Services.HostedServices;
 using Api.Test.Mocks;
 using Microsoft.AspNetCore.Authentication;
 using Microsoft.AspNetCore.Hosting;
@@ -25,6 +28,9 @@ namespace Api.Test;
 /// replaces <see cref="IMqttPublisherService"/> with a recording fake, swaps
 /// the named "Argo" HttpClient onto a recording handler, and removes background
 /// hosted services so the test host does not connect to a real broker.
+/// <see cref="WorkflowCompletionService"/> is kept, so exited notifications are
+/// completed in the background as in production; see
+/// <see cref="WaitForWorkflowCompletions"/>.
 /// </summary>
 public class TestWebApplicationFactory<TProgram>(
     string postgresConnectionString,
@@ -56,6 +62,25 @@ public class TestWebApplicationFactory<TProgram>(
         return options.Workflows[workflowType].TriggerUrl;
     }
 
+    /// <summary>
+    /// Waits until every workflow completion queued so far has been processed.
+    /// </summary>
+    public async Task WaitForWorkflowCompletions()
+    {
+        var queue = Services.GetRequiredService<IWorkflowCompletionQueue>();
+        var deadline = DateTime.UtcNow.AddSeconds(30);
+        while (queue.Pending > 0)
+        {
+            if (DateTime.UtcNow > deadline)
+            {
+                throw new TimeoutException(
+                    $"{queue.Pending} workflow completions still pending after 30 seconds"
+                );
+            }
+            await Task.Delay(TimeSpan.FromMilliseconds(20));
+        }
+    }
+
     protected override void ConfigureWebHost(IWebHostBuilder builder)
     {
         string projectDir = Directory.GetCurrentDirectory();
@@ -166,7 +191,10 @@ public class TestWebApplicationFactory<TProgram>(
     private static void RemoveHostedServices(IServiceCollection services)
     {
         var hostedDescriptors = services
-            .Where(d => d.ServiceType == typeof(IHostedService))
+            .Where(d =>
+                d.ServiceType == typeof(IHostedService)
+                && d.ImplementationType != typeof(WorkflowCompletionService)
+            )
             .ToList();
         foreach (var descriptor in hostedDescriptors)
         {
@@ -18,6 +18,14 @@ public class AnalysisOptions
     public int AnalysisGroupTimeoutMinutes { get; set; } = 30;
 
     public int AnalysisGroupTimeoutCheckIntervalSeconds { get; set; } = 60;
+
+    public int CompletionQueueCapacity { get; set; } = 1000;
+
+    public int CompletionWorkers { get; set; } = 4;
+
+    public int CompletionSweepIntervalSeconds { get; set; } = 60;
+
+    public int CompletionClaimTimeoutSeconds { get; set; } = 300;
 }
 
 public class AnalysisConfig
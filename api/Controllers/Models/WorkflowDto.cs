@@ -41,26 +41,41 @@ public class WorkflowDto
             workflow.OutputBlobStorageLocation != null
                 ? blobService.CreateReadSasUri(workflow.OutputBlobStorageLocation).Result
                 : null;
-        this.Result = GetAnalysisResultDtoFromResultJson(
-            workflow.ResultJson,
-            workflow.AnalysisRun.AnalysisId,
-            workflow.WorkflowType
-        );
+        this.Result = GetAnalysisResultDto(workflow, workflow.ResultJson);
         this.ResultJson = workflow.ResultJson;
+        this.ResultBlobSAS =
+            workflow.ResultBlobStorageLocation != null
+                ? blobService.CreateReadSasUri(workflow.ResultBlobStorageLocation).Result
+                : null;
         this.StartedAt = workflow.StartedAt;
+        this.ProgressPercent = workflow.ProgressPercent;
+        this.ProgressStage = workflow.ProgressStage;
+        this.ProgressUpdatedAt = workflow.ProgressUpdatedAt;
         this.CompletedAt = workflow.CompletedAt;
         this.ErrorMessage = workflow.ErrorMessage;
     }
 
-    private static AnalysisResultDto? GetAnalysisResultDtoFromResultJson(
-        string? resultJson,
-        Guid analysisId,
-        string workflowType
-    )
+    /// <summary>
+    /// Whether results of <paramref name="workflowType"/> are summarized in
+    /// <see cref="Result"/>.
+    /// </summary>
+    public static bool HasAnalysisResult(string workflowType) =>
+        workflowType is "fencilla" or "cloe" or "thermal-reading";
+
+    /// <summary>
+    /// Summarize <paramref name="resultJson"/> for the workflow types shown with a value.
+    /// The constructor passes <see cref="Workflow.ResultJson"/>, so results stored in
+    /// blob storage are left out and only linked through <see cref="ResultBlobSAS"/>;
+    /// a caller that has read such a result can summarize it with this.
+    /// </summary>
+    public static AnalysisResultDto? GetAnalysisResultDto(Workflow workflow, string? resultJson)
     {
         if (resultJson is null)
             return null;
 
+        var analysisId = workflow.AnalysisRun.AnalysisId;
+        var workflowType = workflow.WorkflowType;
+
         var jsonOptions = new JsonSerializerOptions()
         {
             PropertyNamingPolicy = JsonNamingPolicy.CamelCase,
@@ -154,7 +169,16 @@ public class WorkflowDto
     public Uri? OutputBlobSAS { get; set; }
     public AnalysisResultDto? Result { get; set; }
     public string? ResultJson { get; set; }
+
+    /// <summary>
+    /// Set instead of <see cref="ResultJson"/> for results stored in blob storage.
+    /// <see cref="Result"/> is only filled in for those by the single workflow endpoint.
+    /// </summary>
+    public Uri? ResultBlobSAS { get; set; }
     public DateTime? StartedAt { get; set; }
+    public double? ProgressPercent { get; set; }
+    public string? ProgressStage { get; set; }
+    public DateTime? ProgressUpdatedAt { get; set; }
     public DateTime? CompletedAt { get; set; }
     public string? ErrorMessage { get; set; }
 }
@@ -1,6 +1,7 @@
 using api.Controllers.Models;
 using api.Database.Models;
 using api.Services;
+using Azure;
 using Microsoft.AspNetCore.Authorization;
 using Microsoft.AspNetCore.Mvc;
 
@@ -11,7 +12,8 @@ namespace api.Controllers;
 public class WorkflowController(
     ILogger<WorkflowController> logger,
     IWorkflowService service,
-    IBlobStorageService blobService
+    IBlobStorageService blobService,
+    IWorkflowResultReader resultReader
 ) : ControllerBase
 {
     [HttpGet]
@@ -56,6 +58,26 @@ public class WorkflowController(
             return NotFound($"Could not find workflow with id {id}");
         }
         var workflowDto = new WorkflowDto(workflow, blobService);
+        if (
+            WorkflowDto.HasAnalysisResult(workflow.WorkflowType)
+            && workflow.ResultJson is null
+            && workflow.ResultBlobStorageLocation is not null
+        )
+        {
+            try
+            {
+                var resultJson = await resultReader.ReadResultJson(workflow);
+                workflowDto.Result = WorkflowDto.GetAnalysisResultDto(workflow, resultJson);
+            }
+            catch (RequestFailedException e)
+            {
+                logger.LogWarning(
+                    e,
+                    "Could not read the result of workflow {WorkflowId} from blob storage",
+                    id
+                );
+            }
+        }
         return Ok(workflowDto);
     }
 
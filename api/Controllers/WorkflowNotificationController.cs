@@ -12,15 +12,33 @@ namespace api.Controllers;
 /// Notification endpoints for reporting workflow lifecycle events. Routes are
 /// keyed by <see cref="Workflow.Id"/> so concurrent workflows of the same type
 /// (reruns, grouped analyses) can be addressed unambiguously.
+/// Exited notifications may carry an idempotency key (the
+/// <see cref="IdempotencyKeyHeader"/> header, or a batch item's
+/// <see cref="WorkflowNotificationEvent.IdempotencyKey"/>); a repeat of the key
+/// that completed the workflow is acknowledged without running
+/// <see cref="IWorkflowService.OnWorkflowCompleted"/> again, also when it arrives while
+/// the first exit is still being stored. Until that completion has been processed
+/// (<see cref="Workflow.CompletionProcessedAt"/>), a repeat queues it again.
+/// Completions are queued on <see cref="IWorkflowCompletionQueue"/> and run in the
+/// background, so exited notifications return once the exit is stored. When the queue
+/// is full the completion runs in the request instead.
+/// Progress notifications only update the workflow's latest progress; the notifier
+/// coalesces them to at most one per interval, and they are ignored once the workflow
+/// has completed.
 /// </summary>
 [ApiController]
 [Route("workflow")]
 public class WorkflowNotificationController(
     ILogger<WorkflowNotificationController> logger,
     SaraDbContext context,
-    IWorkflowService workflowService
+    IWorkflowService workflowService,
+    IWorkflowCompletionQueue completionQueue
 ) : ControllerBase
 {
+    public const int MaxBatchSize = 1000;
+
+    public const string IdempotencyKeyHeader = "Idempotency-Key";
+
     /// <summary>
     /// Notify that the workflow has started executing.
     /// </summary>
@@ -47,12 +65,58 @@ public class WorkflowNotificationController(
             notification?.ArgoWorkflowName
         );
 
-        workflow.Status = WorkflowStatus.InProgress;
-        workflow.StartedAt = DateTime.UtcNow;
-        if (!string.IsNullOrWhiteSpace(notification?.ArgoWorkflowName))
+        ApplyStarted(workflow, notification?.ArgoWorkflowName);
+        await context.SaveChangesAsync();
+
+        return NoContent();
+    }
+
+    /// <summary>
+    /// Record how far the workflow has come: a percentage, the name of the current
+    /// stage, or both. A workflow that reports progress is running, so a pending
+    /// workflow whose started notification was lost is marked as started. Progress
+    /// reported after the workflow has completed is ignored.
+    /// </summary>
+    [HttpPut]
+    [Authorize(Roles = Role.WorkflowStatusWrite)]
+    [Route("{workflowId:guid}/progress")]
+    [ProducesResponseType(StatusCodes.Status204NoContent)]
+    [ProducesResponseType(StatusCodes.Status400BadRequest)]
+    [ProducesResponseType(StatusCodes.Status404NotFound)]
+    public async Task<IActionResult> WorkflowProgress(
+        [FromRoute] Guid workflowId,
+        [FromBody] WorkflowProgressNotification notification
+    )
+    {
+        if (ValidateProgress(notification.Percent, notification.Stage) is { } error)
+        {
+            return BadRequest(error);
+        }
+
+        var workflow = await context.Workflows.FirstOrDefaultAsync(w => w.Id == workflowId);
+        if (workflow is null)
+        {
+            return NotFound($"Workflow {workflowId} not found");
+        }
+
+        if (!ApplyProgress(workflow, notification.Percent, notification.Stage))
         {
-            workflow.ArgoWorkflowName = notification.ArgoWorkflowName;
+            logger.LogInformation(
+                "Workflow {WorkflowType} (Id: {WorkflowId}) reported progress after completing as {Status}; ignored",
+                workflow.WorkflowType,
+                workflow.Id,
+                workflow.Status
+            );
+            return NoContent();
         }
+
+        logger.LogDebug(
+            "Workflow {WorkflowType} (Id: {WorkflowId}) reported progress: {Percent}% {Stage}",
+            workflow.WorkflowType,
+            workflow.Id,
+            notification.Percent,
+            notification.Stage
+        );
         await context.SaveChangesAsync();
 
         return NoContent();
@@ -61,12 +125,16 @@ public class WorkflowNotificationController(
     /// <summary>
     /// Receive the workflow's result payload. The body is stored verbatim on the
     /// <see cref="Workflow"/> row and deserialized later by the per-workflow
-    /// result handler.
+    /// result handler. Large results are uploaded by the notifier to blob storage
+    /// instead, and only their location is sent; it must be in the storage account
+    /// and container of the workflow's output, and is downloaded when the result is
+    /// read through <see cref="IWorkflowResultReader"/>.
     /// </summary>
     [HttpPut]
     [Authorize(Roles = Role.WorkflowStatusWrite)]
     [Route("{workflowId:guid}/result")]
     [ProducesResponseType(StatusCodes.Status204NoContent)]
+    [ProducesResponseType(StatusCodes.Status400BadRequest)]
     [ProducesResponseType(StatusCodes.Status404NotFound)]
     public async Task<IActionResult> WorkflowResult(
         [FromRoute] Guid workflowId,
@@ -79,14 +147,37 @@ public class WorkflowNotificationController(
             return NotFound($"Workflow {workflowId} not found");
         }
 
-        logger.LogInformation(
-            "Workflow {WorkflowType} (Id: {WorkflowId}) reported result ({Length} bytes)",
-            workflow.WorkflowType,
-            workflow.Id,
-            notification.ResultJson?.Length ?? 0
-        );
+        if (notification.ResultBlobStorageLocation is { } location)
+        {
+            if (notification.ResultJson is not null)
+            {
+                return BadRequest("Send either resultJson or resultBlobStorageLocation, not both");
+            }
+            if (!IsInOutputContainer(workflow, location))
+            {
+                return BadRequest(
+                    $"Result blob {location} is not in the output container of workflow {workflowId}"
+                );
+            }
+
+            logger.LogInformation(
+                "Workflow {WorkflowType} (Id: {WorkflowId}) reported result stored at {Location}",
+                workflow.WorkflowType,
+                workflow.Id,
+                location
+            );
+        }
+        else
+        {
+            logger.LogInformation(
+                "Workflow {WorkflowType} (Id: {WorkflowId}) reported result ({Length} bytes)",
+                workflow.WorkflowType,
+                workflow.Id,
+                notification.ResultJson?.Length ?? 0
+            );
+        }
 
-        workflow.ResultJson = notification.ResultJson;
+        ApplyResult(workflow, notification.ResultJson, notification.ResultBlobStorageLocation);
         await context.SaveChangesAsync();
 
         return NoContent();
@@ -94,52 +185,345 @@ public class WorkflowNotificationController(
 
     /// <summary>
     /// Notify that the workflow has exited. Marks the workflow as
-    /// <see cref="WorkflowStatus.Succeeded"/> or <see cref="WorkflowStatus.Failed"/>,
-    /// then dispatches result handlers and advances the analysis run via
-    /// <see cref="IWorkflowService.OnWorkflowCompleted"/>.
+    /// <see cref="WorkflowStatus.Succeeded"/> or <see cref="WorkflowStatus.Failed"/>
+    /// and returns 202 Accepted; result handlers and the next step of the analysis run
+    /// follow in the background via <see cref="IWorkflowService.OnWorkflowCompleted"/>.
+    /// Returns 204 No Content when the completion ran in the request because the queue
+    /// was full, and for a repeated idempotency key whose completion has been processed.
     /// </summary>
     [HttpPut]
     [Authorize(Roles = Role.WorkflowStatusWrite)]
     [Route("{workflowId:guid}/exited")]
+    [ProducesResponseType(StatusCodes.Status202Accepted)]
     [ProducesResponseType(StatusCodes.Status204NoContent)]
     [ProducesResponseType(StatusCodes.Status404NotFound)]
     public async Task<IActionResult> WorkflowExited(
         [FromRoute] Guid workflowId,
-        [FromBody] WorkflowExitedNotification notification
+        [FromBody] WorkflowExitedNotification notification,
+        [FromHeader(Name = IdempotencyKeyHeader)] string? idempotencyKey = null
     )
     {
-        var workflow = await context.Workflows.FirstOrDefaultAsync(w => w.Id == workflowId);
+        var (workflow, applied) = await InTransaction(async () =>
+        {
+            var workflow = await context.Workflows.FirstOrDefaultAsync(w => w.Id == workflowId);
+            if (workflow is null || !await TryClaimExit(workflowId, idempotencyKey))
+            {
+                return (workflow, false);
+            }
+            ApplyExited(
+                workflow,
+                notification.ExitStatus,
+                notification.ErrorMessage,
+                idempotencyKey
+            );
+            await context.SaveChangesAsync();
+            return (workflow, true);
+        });
         if (workflow is null)
         {
             return NotFound($"Workflow {workflowId} not found");
         }
 
-        var terminalStatus = notification.ExitStatus switch
+        if (!applied)
         {
-            WorkflowExitStatus.Succeeded => WorkflowStatus.Succeeded,
-            _ => WorkflowStatus.Failed,
-        };
+            if (workflow.CompletionProcessedAt is not null)
+            {
+                logger.LogInformation(
+                    "Workflow {WorkflowType} (Id: {WorkflowId}) reported exit again with idempotency key {IdempotencyKey}; ignored",
+                    workflow.WorkflowType,
+                    workflow.Id,
+                    idempotencyKey
+                );
+                return NoContent();
+            }
+
+            logger.LogInformation(
+                "Workflow {WorkflowType} (Id: {WorkflowId}) reported exit again with idempotency key {IdempotencyKey} before its completion was processed; queued again",
+                workflow.WorkflowType,
+                workflow.Id,
+                idempotencyKey
+            );
+            return await QueueCompletion(workflow.Id);
+        }
 
         logger.LogInformation(
             "Workflow {WorkflowType} (Id: {WorkflowId}) reported exit: {ExitStatus} -> {TerminalStatus}",
             workflow.WorkflowType,
             workflow.Id,
             notification.ExitStatus,
-            terminalStatus
+            workflow.Status
         );
 
-        workflow.Status = terminalStatus;
-        workflow.CompletedAt = DateTime.UtcNow;
-        if (terminalStatus == WorkflowStatus.Failed)
+        return await QueueCompletion(workflow.Id);
+    }
+
+    /// <summary>
+    /// Apply a batch of started, result, exited and progress events in one request. All
+    /// referenced workflows are loaded with one query and the changes are
+    /// committed together; <see cref="IWorkflowService.OnWorkflowCompleted"/> is then
+    /// queued for each workflow that exited. Events are applied in array order.
+    /// Events for unknown workflows are skipped and reported in the response, and
+    /// repeated exited events are skipped and counted as duplicates; their completion is
+    /// queued again if it has not been processed.
+    /// </summary>
+    [HttpPut]
+    [Authorize(Roles = Role.WorkflowStatusWrite)]
+    [Route("batch")]
+    [ProducesResponseType(typeof(WorkflowNotificationBatchResponse), StatusCodes.Status200OK)]
+    [ProducesResponseType(StatusCodes.Status400BadRequest)]
+    public async Task<ActionResult<WorkflowNotificationBatchResponse>> WorkflowBatch(
+        [FromBody] List<WorkflowNotificationEvent> events
+    )
+    {
+        if (events.Count > MaxBatchSize)
         {
-            workflow.ErrorMessage = notification.ErrorMessage;
+            return BadRequest($"A batch may contain at most {MaxBatchSize} events");
+        }
+        var invalid = events.FindIndex(e =>
+            e.Event == WorkflowNotificationEventType.Exited && e.ExitStatus is null
+        );
+        if (invalid >= 0)
+        {
+            return BadRequest($"Event {invalid} is an exited event without exitStatus");
+        }
+        for (var i = 0; i < events.Count; i++)
+        {
+            if (
+                events[i].Event == WorkflowNotificationEventType.Progress
+                && ValidateProgress(events[i].Percent, events[i].Stage) is { } error
+            )
+            {
+                return BadRequest($"Event {i} is an invalid progress event: {error}");
+            }
+        }
+
+        var workflowIds = events.Select(e => e.WorkflowId).Distinct().ToList();
+        var (applied, duplicates, exited, notFound) = await InTransaction(async () =>
+        {
+            var workflows = await context
+                .Workflows.Where(w => workflowIds.Contains(w.Id))
+                .ToDictionaryAsync(w => w.Id);
+
+            var applied = 0;
+            var duplicates = 0;
+            var exited = new List<Guid>();
+            foreach (var notification in events)
+            {
+                if (!workflows.TryGetValue(notification.WorkflowId, out var workflow))
+                {
+                    continue;
+                }
+
+                switch (notification.Event)
+                {
+                    case WorkflowNotificationEventType.Started:
+                        ApplyStarted(workflow, notification.ArgoWorkflowName);
+                        break;
+                    case WorkflowNotificationEventType.Result:
+                        ApplyResult(workflow, notification.ResultJson, null);
+                        break;
+                    case WorkflowNotificationEventType.Progress:
+                        ApplyProgress(workflow, notification.Percent, notification.Stage);
+                        break;
+                    case WorkflowNotificationEventType.Exited:
+                        if (!await TryClaimExit(workflow.Id, notification.IdempotencyKey))
+                        {
+                            duplicates++;
+                            if (
+                                workflow.CompletionProcessedAt is null
+                                && !exited.Contains(workflow.Id)
+                            )
+                            {
+                                exited.Add(workflow.Id);
+                            }
+                            continue;
+                        }
+                        ApplyExited(
+                            workflow,
+                            notification.ExitStatus!.Value,
+                            notification.ErrorMessage,
+                            notification.IdempotencyKey
+                        );
+                        if (!exited.Contains(workflow.Id))
+                        {
+                            exited.Add(workflow.Id);
+                        }
+                        break;
+                }
+                applied++;
+            }
+
+            await context.SaveChangesAsync();
+            var notFound = workflowIds.Where(id => !workflows.ContainsKey(id)).ToList();
+            return (applied, duplicates, exited, notFound);
+        });
+
+        logger.LogInformation(
+            "Applied {Applied} of {Count} batched workflow events ({Exited} exited, {Duplicates} duplicates, {NotFound} unknown workflows)",
+            applied,
+            events.Count,
+            exited.Count,
+            duplicates,
+            notFound.Count
+        );
+
+        foreach (var workflowId in exited)
+        {
+            if (!completionQueue.TryEnqueue(workflowId))
+            {
+                await workflowService.OnWorkflowCompleted(workflowId);
+            }
         }
-        await context.SaveChangesAsync();
 
-        await workflowService.OnWorkflowCompleted(workflow.Id);
+        return Ok(
+            new WorkflowNotificationBatchResponse
+            {
+                Applied = applied,
+                Duplicates = duplicates,
+                NotFound = notFound,
+            }
+        );
+    }
 
+    /// <summary>
+    /// Queue the workflow's completion and return 202 Accepted, or run it in the
+    /// request and return 204 No Content when the queue is full.
+    /// </summary>
+    private async Task<IActionResult> QueueCompletion(Guid workflowId)
+    {
+        if (completionQueue.TryEnqueue(workflowId))
+        {
+            return Accepted();
+        }
+
+        logger.LogWarning(
+            "Workflow completion queue is full; completing workflow {WorkflowId} inline",
+            workflowId
+        );
+        await workflowService.OnWorkflowCompleted(workflowId);
         return NoContent();
     }
+
+    private static void ApplyStarted(Workflow workflow, string? argoWorkflowName)
+    {
+        workflow.Status = WorkflowStatus.InProgress;
+        workflow.StartedAt = DateTime.UtcNow;
+        if (!string.IsNullOrWhiteSpace(argoWorkflowName))
+        {
+            workflow.ArgoWorkflowName = argoWorkflowName;
+        }
+    }
+
+    private static string? ValidateProgress(double? percent, string? stage)
+    {
+        if (percent is null && stage is null)
+        {
+            return "Progress needs a percent or a stage";
+        }
+        if (percent is < 0 or > 100)
+        {
+            return $"Percent must be between 0 and 100, got {percent}";
+        }
+        return null;
+    }
+
+    /// <summary>
+    /// Store the workflow's latest progress; returns false, changing nothing, if the
+    /// workflow has already completed.
+    /// </summary>
+    private static bool ApplyProgress(Workflow workflow, double? percent, string? stage)
+    {
+        if (workflow.Status is not (WorkflowStatus.Pending or WorkflowStatus.InProgress))
+        {
+            return false;
+        }
+        if (workflow.Status == WorkflowStatus.Pending)
+        {
+            ApplyStarted(workflow, null);
+        }
+        workflow.ProgressPercent = percent;
+        workflow.ProgressStage = stage;
+        workflow.ProgressUpdatedAt = DateTime.UtcNow;
+        return true;
+    }
+
+    private static void ApplyResult(
+        Workflow workflow,
+        string? resultJson,
+        BlobStorageLocation? resultBlobStorageLocation
+    )
+    {
+        workflow.ResultJson = resultJson;
+        workflow.ResultBlobStorageLocation = resultBlobStorageLocation;
+    }
+
+    private static bool IsInOutputContainer(Workflow workflow, BlobStorageLocation location) =>
+        workflow.OutputBlobStorageLocation is { } output
+        && location.StorageAccount == output.StorageAccount
+        && location.BlobContainer == output.BlobContainer;
+
+    /// <summary>
+    /// Run <paramref name="operation"/> in a transaction. On a transient failure the
+    /// execution strategy runs it again from the start, with an empty change tracker.
+    /// </summary>
+    private async Task<T> InTransaction<T>(Func<Task<T>> operation)
+    {
+        var strategy = context.Database.CreateExecutionStrategy();
+        return await strategy.ExecuteAsync(async () =>
+        {
+            context.ChangeTracker.Clear();
+            await using var transaction = await context.Database.BeginTransactionAsync();
+            var result = await operation();
+            await transaction.CommitAsync();
+            return result;
+        });
+    }
+
+    /// <summary>
+    /// Store the exited idempotency key on the workflow's row unless the row already
+    /// has it, and return whether it was stored; an exit without a key is always
+    /// applied. The update is conditional in the database rather than checked on the
+    /// loaded entity, and holds the row lock until the transaction commits, so of
+    /// concurrent exits with the same key exactly one is applied: the others wait for
+    /// it and then match no row.
+    /// </summary>
+    private async Task<bool> TryClaimExit(Guid workflowId, string? idempotencyKey)
+    {
+        if (idempotencyKey is null)
+        {
+            return true;
+        }
+        var claimed = await context
+            .Workflows.Where(w => w.Id == workflowId && w.ExitedIdempotencyKey != idempotencyKey)
+            .ExecuteUpdateAsync(setters =>
+                setters.SetProperty(w => w.ExitedIdempotencyKey, idempotencyKey)
+            );
+        return claimed > 0;
+    }
+
+    private static void ApplyExited(
+        Workflow workflow,
+        WorkflowExitStatus exitStatus,
+        string? errorMessage,
+        string? idempotencyKey
+    )
+    {
+        var terminalStatus = exitStatus switch
+        {
+            WorkflowExitStatus.Succeeded => WorkflowStatus.Succeeded,
+            _ => WorkflowStatus.Failed,
+        };
+
+        workflow.Status = terminalStatus;
+        workflow.CompletedAt = DateTime.UtcNow;
+        workflow.ExitedIdempotencyKey = idempotencyKey;
+        workflow.CompletionProcessedAt = null;
+        workflow.CompletionClaimedAt = null;
+        if (terminalStatus == WorkflowStatus.Failed)
+        {
+            workflow.ErrorMessage = errorMessage;
+        }
+    }
 }
 
 public class WorkflowStartedNotification
@@ -150,6 +534,18 @@ public class WorkflowStartedNotification
 public class WorkflowResultNotification
 {
     public string? ResultJson { get; set; }
+
+    /// <summary>Where the notifier uploaded a result too large to send inline.</summary>
+    public BlobStorageLocation? ResultBlobStorageLocation { get; set; }
+}
+
+public class WorkflowProgressNotification
+{
+    /// <summary>How far the workflow has come, from 0 to 100.</summary>
+    public double? Percent { get; set; }
+
+    /// <summary>What the workflow is doing, e.g. "Anonymizing frames".</summary>
+    public string? Stage { get; set; }
 }
 
 public enum WorkflowExitStatus
@@ -163,3 +559,37 @@ public class WorkflowExitedNotification
     public required WorkflowExitStatus ExitStatus { get; set; }
     public string? ErrorMessage { get; set; }
 }
+
+public enum WorkflowNotificationEventType
+{
+    Started,
+    Result,
+    Exited,
+    Progress,
+}
+
+public class WorkflowNotificationEvent
+{
+    public required Guid WorkflowId { get; set; }
+    public required WorkflowNotificationEventType Event { get; set; }
+    public string? ArgoWorkflowName { get; set; }
+    public string? ResultJson { get; set; }
+
+    /// <summary>Required for <see cref="WorkflowNotificationEventType.Exited"/>.</summary>
+    public WorkflowExitStatus? ExitStatus { get; set; }
+    public string? ErrorMessage { get; set; }
+
+    /// <summary>For <see cref="WorkflowNotificationEventType.Progress"/>.</summary>
+    public double? Percent { get; set; }
+    public string? Stage { get; set; }
+
+    /// <summary>Repeated exited events with the same key are applied once.</summary>
+    public string? IdempotencyKey { get; set; }
+}
+
+public class WorkflowNotificationBatchResponse
+{
+    public required int Applied { get; set; }
+    public int Duplicates { get; set; }
+    public required List<Guid> NotFound { get; set; }
+}
@@ -71,9 +71,54 @@ public class Workflow
 
     public string? ResultJson { get; set; }
 
+    /// <summary>
+    /// Location of a result the workflow notifier uploaded to blob storage instead of
+    /// sending it inline; set instead of <see cref="ResultJson"/>. Always in the storage
+    /// account and container of <see cref="OutputBlobStorageLocation"/>. Read through
+    /// <see cref="Services.IWorkflowResultReader"/>.
+    /// </summary>
+    public BlobStorageLocation? ResultBlobStorageLocation { get; set; }
+
     public DateTime? StartedAt { get; set; }
 
+    /// <summary>
+    /// Latest progress reported by the workflow notifier while the workflow runs, as a
+    /// percentage and/or the name of the current stage. The notifier sends at most one
+    /// update per interval, so <see cref="ProgressUpdatedAt"/> falling far behind tells
+    /// that a running workflow has stalled. Cleared when the workflow is retried.
+    /// </summary>
+    public double? ProgressPercent { get; set; }
+
+    public string? ProgressStage { get; set; }
+
+    public DateTime? ProgressUpdatedAt { get; set; }
+
     public DateTime? CompletedAt { get; set; }
 
     public string? ErrorMessage { get; set; }
+
+    /// <summary>
+    /// Idempotency key of the exited notification that completed the workflow. A
+    /// repeated exited notification with the same key is acknowledged without
+    /// being applied again. Cleared when the workflow is retried.
+    /// </summary>
+    public string? ExitedIdempotencyKey { get; set; }
+
+    /// <summary>
+    /// When <see cref="Services.IWorkflowService.OnWorkflowCompleted"/> finished for the
+    /// workflow's exit. Null while the completion is pending, so a completion lost to a
+    /// restart or a failing handler is queued again by
+    /// <see cref="Services.HostedServices.WorkflowCompletionService"/>. Cleared when the
+    /// workflow exits or is retried.
+    /// </summary>
+    public DateTime? CompletionProcessedAt { get; set; }
+
+    /// <summary>
+    /// When a worker claimed the workflow's completion. While the claim is younger than
+    /// <see cref="Configurations.AnalysisOptions.CompletionClaimTimeoutSeconds"/> no other
+    /// worker or replica processes the completion, and the sweep does not queue it.
+    /// Cleared when the completion is processed or fails, and when the workflow exits or
+    /// is retried.
+    /// </summary>
+    public DateTime? CompletionClaimedAt { get; set; }
 }
@@ -0,0 +1,48 @@
+﻿using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace api.Migrations
+{
+    /// <inheritdoc />
+    public partial class AddResultBlobStorageLocationToWorkflow : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.AddColumn<string>(
+                name: "ResultBlobStorageLocation_StorageAccount",
+                table: "Workflows",
+                type: "text",
+                nullable: true);
+
+            migrationBuilder.AddColumn<string>(
+                name: "ResultBlobStorageLocation_BlobContainer",
+                table: "Workflows",
+                type: "text",
+                nullable: true);
+
+            migrationBuilder.AddColumn<string>(
+                name: "ResultBlobStorageLocation_BlobName",
+                table: "Workflows",
+                type: "text",
+                nullable: true);
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropColumn(
+                name: "ResultBlobStorageLocation_StorageAccount",
+                table: "Workflows");
+
+            migrationBuilder.DropColumn(
+                name: "ResultBlobStorageLocation_BlobContainer",
+                table: "Workflows");
+
+            migrationBuilder.DropColumn(
+                name: "ResultBlobStorageLocation_BlobName",
+                table: "Workflows");
+        }
+    }
+}
@@ -0,0 +1,49 @@
+﻿using System;
+using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace api.Migrations
+{
+    /// <inheritdoc />
+    public partial class AddProgressToWorkflow : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.AddColumn<double>(
+                name: "ProgressPercent",
+                table: "Workflows",
+                type: "double precision",
+                nullable: true);
+
+            migrationBuilder.AddColumn<string>(
+                name: "ProgressStage",
+                table: "Workflows",
+                type: "text",
+                nullable: true);
+
+            migrationBuilder.AddColumn<DateTime>(
+                name: "ProgressUpdatedAt",
+                table: "Workflows",
+                type: "timestamp with time zone",
+                nullable: true);
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropColumn(
+                name: "ProgressPercent",
+                table: "Workflows");
+
+            migrationBuilder.DropColumn(
+                name: "ProgressStage",
+                table: "Workflows");
+
+            migrationBuilder.DropColumn(
+                name: "ProgressUpdatedAt",
+                table: "Workflows");
+        }
+    }
+}
@@ -0,0 +1,37 @@
+﻿using System;
+using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace api.Migrations
+{
+    /// <inheritdoc />
+    public partial class AddCompletionProcessedAtToWorkflow : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.AddColumn<DateTime>(
+                name: "CompletionProcessedAt",
+                table: "Workflows",
+                type: "timestamp with time zone",
+                nullable: true);
+
+            // Workflows that exited (Succeeded = 2, Failed = 3) before this migration have
+            // had their completion processed; without this they would all be queued again.
+            migrationBuilder.Sql(@"
+                UPDATE ""Workflows""
+                SET ""CompletionProcessedAt"" = COALESCE(""CompletedAt"", now())
+                WHERE ""Status"" IN (2, 3);
+            ");
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropColumn(
+                name: "CompletionProcessedAt",
+                table: "Workflows");
+        }
+    }
+}
@@ -214,9 +214,27 @@ namespace api.Migrations
                     b.Property<DateTime?>("CompletedAt")
                         .HasColumnType("timestamp with time zone");
 
+                    b.Property<DateTime?>("CompletionClaimedAt")
+                        .HasColumnType("timestamp with time zone");
+
+                    b.Property<DateTime?>("CompletionProcessedAt")
+                        .HasColumnType("timestamp with time zone");
+
                     b.Property<string>("ErrorMessage")
                         .HasColumnType("text");
 
+                    b.Property<string>("ExitedIdempotencyKey")
+                        .HasColumnType("text");
+
+                    b.Property<double?>("ProgressPercent")
+                        .HasColumnType("double precision");
+
+                    b.Property<string>("ProgressStage")
+                        .HasColumnType("text");
+
+                    b.Property<DateTime?>("ProgressUpdatedAt")
+                        .HasColumnType("timestamp with time zone");
+
                     b.Property<string>("ResultJson")
                         .HasColumnType("text");
 
@@ -546,11 +564,38 @@ namespace api.Migrations
                                 .HasForeignKey("WorkflowId");
                         });
 
+                    b.OwnsOne("api.Database.Models.BlobStorageLocation", "ResultBlobStorageLocation", b1 =>
+                        {
+                            b1.Property<Guid>("WorkflowId")
+                                .HasColumnType("uuid");
+
+                            b1.Property<string>("BlobContainer")
+                                .IsRequired()
+                                .HasColumnType("text");
+
+                            b1.Property<string>("BlobName")
+                                .IsRequired()
+                                .HasColumnType("text");
+
+                            b1.Property<string>("StorageAccount")
+                                .IsRequired()
+                                .HasColumnType("text");
+
+                            b1.HasKey("WorkflowId");
+
+                            b1.ToTable("Workflows");
+
+                            b1.WithOwner()
+                                .HasForeignKey("WorkflowId");
+                        });
+
                     b.Navigation("AnalysisRun");
 
                     b.Navigation("InputBlobStorageLocations");
 
                     b.Navigation("OutputBlobStorageLocation");
+
+                    b.Navigation("ResultBlobStorageLocation");
                 });
 
             modelBuilder.Entity("api.Database.Models.Analysis", b =>
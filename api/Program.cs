@@ -52,6 +52,8 @@ builder.Services.ConfigureMQTT();
 var openTelemetryEnabled = builder.Configuration.GetValue<bool?>("OpenTelemetry:Enabled") ?? false;
 var otelActivitySource = new ActivitySource(applicationName);
 var otelMeter = new Meter($"{applicationName}.Metrics", "0.0.1");
+builder.Services.AddSingleton(otelActivitySource);
+builder.Services.AddSingleton(otelMeter);
 if (openTelemetryEnabled)
 {
     builder.AddCustomOpenTelemetry(otelActivitySource, otelMeter);
@@ -83,6 +85,7 @@ builder.Services.AddScoped<IMqttPublisherService, MqttPublisherService>();
 builder.Services.AddScoped<IDashboardService, DashboardService>();
 
 builder.Services.AddScoped<IWorkflowService, WorkflowService>();
+builder.Services.AddScoped<IWorkflowResultReader, WorkflowResultReader>();
 builder.Services.AddHttpClient(WorkflowService.ArgoHttpClientName);
 builder.Services.AddScoped<ITriggerPayloadEnricher, AnonymizerPayloadEnricher>();
 builder.Services.AddScoped<ITriggerPayloadEnricher, ThermalReadingPayloadEnricher>();
@@ -102,10 +105,12 @@ builder.Services.AddScoped<IAnalysisTriggerService, AnalysisTriggerService>();
 builder.Services.AddScoped<ITimeseriesService, TimeseriesService>();
 builder.Services.AddScoped<IEmailService, EmailService>();
 builder.Services.AddScoped<IAnalysisGroupTimeoutProcessor, AnalysisGroupTimeoutProcessor>();
+builder.Services.AddSingleton<IWorkflowCompletionQueue, WorkflowCompletionQueue>();
 
 builder.Services.AddHostedService<MqttEventHandler>();
 builder.Services.AddHostedService<MqttService>();
 builder.Services.AddHostedService<AnalysisGroupTimeoutService>();
+builder.Services.AddHostedService<WorkflowCompletionService>();
 
 builder
     .Services.AddControllers(options =>
@@ -118,6 +123,9 @@ builder
         options.JsonSerializerOptions.ReferenceHandler = ReferenceHandler.IgnoreCycles;
     });
 
+// The workflow notifier gzips large result bodies (Content-Encoding: gzip).
+builder.Services.AddRequestDecompression();
+
 // Learn more about configuring Swagger/OpenAPI at https://aka.ms/aspnetcore/swashbuckle
 builder.Services.AddEndpointsApiExplorer();
 builder.Services.ConfigureSwagger(builder.Configuration);
@@ -189,6 +197,17 @@ app.UseCors(corsBuilder =>
         .AllowCredentials()
 );
 
+// Only the workflow result and batch routes accept compressed request bodies.
+app.UseWhen(
+    context =>
+        context.Request.Path.StartsWithSegments("/api/workflow")
+        && (
+            context.Request.Path.Value!.EndsWith("/result", StringComparison.OrdinalIgnoreCase)
+            || context.Request.Path.StartsWithSegments("/api/workflow/batch")
+        ),
+    branch => branch.UseRequestDecompression()
+);
+
 app.UseAuthentication();
 app.UseAuthorization();
 
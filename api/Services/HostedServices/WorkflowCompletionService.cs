@@ -0,0 +1,103 @@
+using api.Configurations;
+using Microsoft.Extensions.Options;
+
+namespace api.Services.HostedServices;
+
+/// <summary>
+/// Runs <see cref="IWorkflowService.OnWorkflowCompleted"/> for the workflows queued on
+/// <see cref="IWorkflowCompletionQueue"/>, with
+/// <see cref="AnalysisOptions.CompletionWorkers"/> workers, each in its own scope per
+/// workflow. On shutdown the queue stops accepting workflows and the ones already
+/// queued are processed before the service stops.
+/// At startup and then every <see cref="AnalysisOptions.CompletionSweepIntervalSeconds"/>
+/// it queues again the workflows that exited more than one interval ago and whose
+/// completion has not been processed, because the pod restarted before it ran or
+/// because it failed. Workflows whose completion is claimed by a worker on this or
+/// another replica are not queued until the claim expires.
+/// </summary>
+public class WorkflowCompletionService(
+    IServiceProvider serviceProvider,
+    IWorkflowCompletionQueue completionQueue,
+    IOptions<AnalysisOptions> analysisOptions,
+    ILogger<WorkflowCompletionService> logger
+) : BackgroundService
+{
+    private readonly int _workers = Math.Max(1, analysisOptions.Value.CompletionWorkers);
+
+    private readonly int _sweepLimit = Math.Max(1, analysisOptions.Value.CompletionQueueCapacity);
+
+    private readonly TimeSpan _sweepInterval = TimeSpan.FromSeconds(
+        Math.Max(1, analysisOptions.Value.CompletionSweepIntervalSeconds)
+    );
+
+    protected override async Task ExecuteAsync(CancellationToken stoppingToken)
+    {
+        logger.LogInformation("WorkflowCompletionService started ({Workers} workers)", _workers);
+
+        using var registration = stoppingToken.Register(completionQueue.Complete);
+        await Task.WhenAll(
+            Enumerable
+                .Range(0, _workers)
+                .Select(_ => Task.Run(() => completionQueue.ProcessAllAsync(Complete)))
+                .Append(Task.Run(() => SweepAsync(stoppingToken)))
+        );
+
+        logger.LogInformation("WorkflowCompletionService stopped");
+    }
+
+    private async Task Complete(Guid workflowId)
+    {
+        try
+        {
+            using var scope = serviceProvider.CreateScope();
+            var workflowService = scope.ServiceProvider.GetRequiredService<IWorkflowService>();
+            await workflowService.OnWorkflowCompleted(workflowId);
+        }
+        catch (Exception ex)
+        {
+            logger.LogError(
+                ex,
+                "Error while completing workflow {WorkflowId}; it is queued again by the next sweep",
+                workflowId
+            );
+        }
+    }
+
+    private async Task SweepAsync(CancellationToken stoppingToken)
+    {
+        while (!stoppingToken.IsCancellationRequested)
+        {
+            try
+            {
+                using var scope = serviceProvider.CreateScope();
+                var workflowService = scope.ServiceProvider.GetRequiredService<IWorkflowService>();
+                var workflowIds = await workflowService.ReadIdsAwaitingCompletion(
+                    DateTime.UtcNow - _sweepInterval,
+                    _sweepLimit
+                );
+                var queued = workflowIds.TakeWhile(completionQueue.TryEnqueue).Count();
+                if (workflowIds.Count > 0)
+                {
+                    logger.LogWarning(
+                        "Queued {Queued} of {Count} workflows whose completion was not processed",
+                        queued,
+                        workflowIds.Count
+                    );
+                }
+            }
+            catch (Exception ex)
+            {
+                logger.LogError(ex, "Error while sweeping for unprocessed workflow completions");
+            }
+
+            try
+            {
+                await Task.Delay(_sweepInterval, stoppingToken);
+            }
+            catch (OperationCanceledException) when (stoppingToken.IsCancellationRequested)
+            {
+                break;
+            }
+        }
+    }
+}
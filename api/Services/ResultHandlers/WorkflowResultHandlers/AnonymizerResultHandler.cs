@@ -16,6 +16,7 @@ internal sealed class AnonymizerResult
 public class AnonymizerResultHandler(
     SaraDbContext context,
     IMqttPublisherService mqttPublisherService,
+    IWorkflowResultReader resultReader,
     ILogger<AnonymizerResultHandler> logger
 ) : IWorkflowResultHandler
 {
@@ -23,8 +24,9 @@ public class AnonymizerResultHandler(
 
     public async Task OnWorkflowCompleted(Workflow workflow)
     {
-        var result = WorkflowResultHandlerHelpers.DeserializeResult<AnonymizerResult>(
+        var result = await WorkflowResultHandlerHelpers.DeserializeResult<AnonymizerResult>(
             workflow,
+            resultReader,
             logger
         );
 
@@ -17,6 +17,7 @@ public class CLOEResultHandler(
     SaraDbContext context,
     IMqttPublisherService mqttPublisherService,
     ITimeseriesService timeseriesService,
+    IWorkflowResultReader resultReader,
     ILogger<CLOEResultHandler> logger
 ) : IWorkflowResultHandler
 {
@@ -34,7 +35,11 @@ public class CLOEResultHandler(
         if (inspectionRecord is null)
             return;
 
-        var result = WorkflowResultHandlerHelpers.DeserializeResult<CLOEResult>(workflow, logger);
+        var result = await WorkflowResultHandlerHelpers.DeserializeResult<CLOEResult>(
+            workflow,
+            resultReader,
+            logger
+        );
 
         var message = new SaraAnalysisResultMessage
         {
@@ -16,6 +16,7 @@ public class FencillaResultHandler(
     SaraDbContext context,
     IMqttPublisherService mqttPublisherService,
     IEmailService emailService,
+    IWorkflowResultReader resultReader,
     ILogger<FencillaResultHandler> logger
 ) : IWorkflowResultHandler
 {
@@ -33,8 +34,9 @@ public class FencillaResultHandler(
         if (inspectionRecord is null)
             return;
 
-        var result = WorkflowResultHandlerHelpers.DeserializeResult<FencillaResult>(
+        var result = await WorkflowResultHandlerHelpers.DeserializeResult<FencillaResult>(
             workflow,
+            resultReader,
             logger
         );
 
@@ -16,6 +16,7 @@ public class ThermalReadingResultHandler(
     SaraDbContext context,
     IMqttPublisherService mqttPublisherService,
     ITimeseriesService timeseriesService,
+    IWorkflowResultReader resultReader,
     ILogger<ThermalReadingResultHandler> logger
 ) : IWorkflowResultHandler
 {
@@ -33,8 +34,9 @@ public class ThermalReadingResultHandler(
         if (inspectionRecord is null)
             return;
 
-        var result = WorkflowResultHandlerHelpers.DeserializeResult<ThermalReadingResult>(
+        var result = await WorkflowResultHandlerHelpers.DeserializeResult<ThermalReadingResult>(
             workflow,
+            resultReader,
             logger
         );
 
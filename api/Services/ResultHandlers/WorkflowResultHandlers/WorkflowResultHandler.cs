@@ -1,5 +1,6 @@
 using System.Text.Json;
 using api.Database.Models;
+using Azure;
 
 namespace api.Services.ResultHandlers.WorkflowResultHandlers;
 
@@ -18,10 +19,31 @@ internal static class WorkflowResultHandlerHelpers
         PropertyNameCaseInsensitive = true,
     };
 
-    public static T? DeserializeResult<T>(Workflow workflow, ILogger logger)
+    public static async Task<T?> DeserializeResult<T>(
+        Workflow workflow,
+        IWorkflowResultReader resultReader,
+        ILogger logger
+    )
         where T : class
     {
-        if (string.IsNullOrWhiteSpace(workflow.ResultJson))
+        string? resultJson;
+        try
+        {
+            resultJson = await resultReader.ReadResultJson(workflow);
+        }
+        catch (RequestFailedException ex)
+        {
+            logger.LogError(
+                ex,
+                "Failed to download result of workflow {WorkflowType} (Id: {WorkflowId}) from {Location}",
+                workflow.WorkflowType,
+                workflow.Id,
+                workflow.ResultBlobStorageLocation
+            );
+            return null;
+        }
+
+        if (string.IsNullOrWhiteSpace(resultJson))
         {
             logger.LogWarning(
                 "Workflow {WorkflowType} (Id: {WorkflowId}) has no ResultJson",
@@ -33,7 +55,7 @@ internal static class WorkflowResultHandlerHelpers
 
         try
         {
-            return JsonSerializer.Deserialize<T>(workflow.ResultJson, JsonOptions);
+            return JsonSerializer.Deserialize<T>(resultJson, JsonOptions);
         }
         catch (JsonException ex)
         {
@@ -43,7 +65,7 @@ internal static class WorkflowResultHandlerHelpers
                 workflow.WorkflowType,
                 workflow.Id,
                 typeof(T).Name,
-                workflow.ResultJson
+                resultJson
             );
             return null;
         }
@@ -0,0 +1,120 @@
+using System.Collections.Concurrent;
+using System.Diagnostics;
+using System.Diagnostics.Metrics;
+using System.Threading.Channels;
+using api.Configurations;
+using Microsoft.Extensions.Options;
+
+namespace api.Services;
+
+/// <summary>
+/// Bounded in-process queue of workflows whose exit has been persisted and whose
+/// <see cref="IWorkflowService.OnWorkflowCompleted"/> is still to run. Filled by the
+/// exited notifications and drained by
+/// <see cref="HostedServices.WorkflowCompletionService"/>. The queue is not durable: a
+/// completion it loses is found again through
+/// <see cref="Database.Models.Workflow.CompletionProcessedAt"/>.
+/// </summary>
+public interface IWorkflowCompletionQueue
+{
+    /// <summary>
+    /// Workflows enqueued and not yet processed, including those being processed.
+    /// </summary>
+    int Pending { get; }
+
+    /// <summary>
+    /// Queue the workflow's completion. A workflow that is already queued or being
+    /// processed is not queued again, and true is returned. Returns false when the queue
+    /// is full or has been completed; the caller then runs the completion itself.
+    /// </summary>
+    bool TryEnqueue(Guid workflowId);
+
+    /// <summary>
+    /// Run <paramref name="process"/> for each queued workflow until the queue has
+    /// been completed and drained. May be called by several workers at once.
+    /// </summary>
+    Task ProcessAllAsync(Func<Guid, Task> process);
+
+    /// <summary>
+    /// Stop accepting workflows. Workflows already queued are still processed.
+    /// </summary>
+    void Complete();
+}
+
+public class WorkflowCompletionQueue : IWorkflowCompletionQueue
+{
+    private readonly Channel<QueuedCompletion> _channel;
+    private readonly Histogram<double> _lag;
+    private readonly Counter<long> _inline;
+    private readonly ConcurrentDictionary<Guid, byte> _queued = new();
+    private int _pending;
+
+    public WorkflowCompletionQueue(IOptions<AnalysisOptions> analysisOptions, Meter meter)
+    {
+        _channel = Channel.CreateBounded<QueuedCompletion>(
+            new BoundedChannelOptions(Math.Max(1, analysisOptions.Value.CompletionQueueCapacity))
+            {
+                FullMode = BoundedChannelFullMode.Wait,
+            }
+        );
+
+        meter.CreateObservableGauge(
+            "sara.workflow_completion.queue_depth",
+            () => _channel.Reader.Count,
+            unit: "{workflow}",
+            description: "Completed workflows waiting for completion processing"
+        );
+        _lag = meter.CreateHistogram<double>(
+            "sara.workflow_completion.lag",
+            unit: "s",
+            description: "Time from an exited notification to the start of its completion processing"
+        );
+        _inline = meter.CreateCounter<long>(
+            "sara.workflow_completion.inline",
+            unit: "{workflow}",
+            description: "Completions run in the notification request because the queue was full"
+        );
+    }
+
+    public int Pending => Volatile.Read(ref _pending);
+
+    public bool TryEnqueue(Guid workflowId)
+    {
+        if (!_queued.TryAdd(workflowId, 0))
+        {
+            return true;
+        }
+
+        Interlocked.Increment(ref _pending);
+        if (_channel.Writer.TryWrite(new QueuedCompletion(workflowId, Stopwatch.GetTimestamp())))
+        {
+            return true;
+        }
+
+        Interlocked.Decrement(ref _pending);
+        _queued.TryRemove(workflowId, out _);
+        _inline.Add(1);
+        return false;
+    }
+
+    public async Task ProcessAllAsync(Func<Guid, Task> process)
+    {
+        await foreach (var completion in _channel.Reader.ReadAllAsync())
+        {
+            _lag.Record(Stopwatch.GetElapsedTime(completion.EnqueuedAt).TotalSeconds);
+            try
+            {
+                await process(completion.WorkflowId);
+            }
+            finally
+            {
+                _queued.TryRemove(completion.WorkflowId, out _);
+                Interlocked.Decrement(ref _pending);
+            }
+        }
+    }
+
+    public void Complete() => _channel.Writer.TryComplete();
+
+    private sealed record QueuedCompletion(Guid WorkflowId, long EnqueuedAt);
+}
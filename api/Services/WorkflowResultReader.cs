@@ -0,0 +1,57 @@
+using api.Database.Models;
+
+namespace api.Services;
+
+/// <summary>
+/// Reads a workflow's result for result handlers and gates. Results reported inline
+/// are stored in <see cref="Workflow.ResultJson"/>; large results are uploaded by the
+/// workflow notifier to blob storage and only their
+/// <see cref="Workflow.ResultBlobStorageLocation"/> is stored, so the blob is
+/// downloaded here the first time the result is read, and kept for the rest of the
+/// scope.
+/// </summary>
+public interface IWorkflowResultReader
+{
+    /// <summary>
+    /// The workflow's result JSON, or null if the workflow has not reported a result.
+    /// </summary>
+    Task<string?> ReadResultJson(Workflow workflow);
+}
+
+public class WorkflowResultReader(
+    IBlobStorageService blobStorageService,
+    ILogger<WorkflowResultReader> logger
+) : IWorkflowResultReader
+{
+    private readonly Dictionary<Guid, string> _downloaded = [];
+
+    public async Task<string?> ReadResultJson(Workflow workflow)
+    {
+        if (
+            workflow.ResultJson is not null
+            || workflow.ResultBlobStorageLocation is not { } location
+        )
+        {
+            return workflow.ResultJson;
+        }
+
+        if (_downloaded.TryGetValue(workflow.Id, out var resultJson))
+        {
+            return resultJson;
+        }
+
+        using var content = await blobStorageService.DownloadBlobAsync(location);
+        using var reader = new StreamReader(content);
+        resultJson = await reader.ReadToEndAsync();
+        _downloaded[workflow.Id] = resultJson;
+
+        logger.LogInformation(
+            "Downloaded result of workflow {WorkflowType} (Id: {WorkflowId}) from {Location} ({Length} bytes)",
+            workflow.WorkflowType,
+            workflow.Id,
+            location,
+            content.Length
+        );
+        return resultJson;
+    }
+}
@@ -1,3 +1,4 @@
+using System.Diagnostics;
 using System.Text;
 using System.Text.Json;
 using api.Configurations;
@@ -6,6 +7,7 @@ using api.Database.Models;
 using api.Services.ResultHandlers.AnalysisResultHandlers;
 using api.Services.ResultHandlers.WorkflowResultHandlers;
 using api.Utilities;
+using Azure;
 using Microsoft.EntityFrameworkCore;
 using Microsoft.Extensions.Options;
 
@@ -18,8 +20,21 @@ public interface IWorkflowService
 {
     public Task TriggerWorkflow(Guid workflowId);
 
+    /// <summary>
+    /// Run the result handlers and the next step of the analysis run for a workflow
+    /// that has exited, then record it in <see cref="Workflow.CompletionProcessedAt"/>.
+    /// The completion is first claimed in <see cref="Workflow.CompletionClaimedAt"/>;
+    /// does nothing if it has already been processed or another worker holds the claim.
+    /// </summary>
     public Task OnWorkflowCompleted(Guid workflowId);
 
+    /// <summary>
+    /// Ids of at most <paramref name="limit"/> workflows that exited before
+    /// <paramref name="completedBefore"/> and whose completion has not been processed
+    /// and is not claimed, or whose claim has expired.
+    /// </summary>
+    public Task<List<Guid>> ReadIdsAwaitingCompletion(DateTime completedBefore, int limit);
+
     public Task<Workflow?> ReadById(Guid id);
 
     public Task<PagedList<Workflow>> GetWorkflows(WorkflowParameters parameters);
@@ -45,6 +60,8 @@ public class WorkflowService(
     IEnumerable<IWorkflowResultHandler> workflowResultHandlers,
     IEnumerable<IAnalysisResultHandler> analysisResultHandlers,
     IHttpClientFactory httpClientFactory,
+    IWorkflowResultReader resultReader,
+    ActivitySource activitySource,
     ILogger<WorkflowService> logger
 ) : IWorkflowService
 {
@@ -68,6 +85,9 @@ public class WorkflowService(
 
     public async Task TriggerWorkflow(Guid workflowId)
     {
+        using var activity = activitySource.StartActivity("TriggerWorkflow");
+        activity?.SetTag("workflow.id", workflowId);
+
         var workflow = await context.Workflows.FirstOrDefaultAsync(w => w.Id == workflowId);
         if (workflow is null)
         {
@@ -127,6 +147,17 @@ public class WorkflowService(
                 ["extras"] = extras,
             };
 
+            // Passed on by the Argo template to the workflow-notifier as
+            // TRACEPARENT, so the notifier calls join the trace of this run.
+            if (Activity.Current is { IdFormat: ActivityIdFormat.W3C } current)
+            {
+                payload["traceparent"] = current.Id!;
+                if (current.TraceStateString is not null)
+                {
+                    payload["tracestate"] = current.TraceStateString;
+                }
+            }
+
             var json = JsonSerializer.Serialize(payload, useCamelCaseOption);
             var content = new StringContent(json, Encoding.UTF8, "application/json");
 
@@ -181,6 +212,9 @@ public class WorkflowService(
 
     public async Task OnWorkflowCompleted(Guid workflowId)
     {
+        using var activity = activitySource.StartActivity("OnWorkflowCompleted");
+        activity?.SetTag("workflow.id", workflowId);
+
         var workflow = await context
             .Workflows.Include(w => w.AnalysisRun)
             .FirstOrDefaultAsync(w => w.Id == workflowId);
@@ -189,7 +223,108 @@ public class WorkflowService(
             logger.LogError("Workflow {WorkflowId} not found when handling completion", workflowId);
             return;
         }
+        if (workflow.CompletionProcessedAt is not null)
+        {
+            logger.LogInformation(
+                "Completion of workflow {WorkflowId} was already processed at {ProcessedAt}; skipped",
+                workflowId,
+                workflow.CompletionProcessedAt
+            );
+            return;
+        }
+
+        if (!await TryClaimCompletion(workflowId))
+        {
+            logger.LogInformation(
+                "Completion of workflow {WorkflowId} is processed or claimed by another worker; skipped",
+                workflowId
+            );
+            return;
+        }
+
+        try
+        {
+            await ProcessCompletion(workflow);
+        }
+        catch
+        {
+            await ReleaseCompletionClaim(workflowId);
+            throw;
+        }
+
+        workflow.CompletionProcessedAt = DateTime.UtcNow;
+        // The claim was set by ExecuteUpdateAsync, so the tracked value is still null
+        // and assigning null would not be saved.
+        workflow.CompletionClaimedAt = null;
+        context.Entry(workflow).Property(w => w.CompletionClaimedAt).IsModified = true;
+        await context.SaveChangesAsync();
+    }
+
+    public async Task<List<Guid>> ReadIdsAwaitingCompletion(DateTime completedBefore, int limit)
+    {
+        var claimExpiredBefore = DateTime.UtcNow - CompletionClaimTimeout;
+        return await context
+            .Workflows.Where(w =>
+                (w.Status == WorkflowStatus.Succeeded || w.Status == WorkflowStatus.Failed)
+                && w.CompletionProcessedAt == null
+                && (w.CompletionClaimedAt == null || w.CompletionClaimedAt < claimExpiredBefore)
+                && w.CompletedAt < completedBefore
+            )
+            .OrderBy(w => w.CompletedAt)
+            .Select(w => w.Id)
+            .Take(limit)
+            .ToListAsync();
+    }
+
+    private TimeSpan CompletionClaimTimeout =>
+        TimeSpan.FromSeconds(Math.Max(1, _options.CompletionClaimTimeoutSeconds));
+
+    /// <summary>
+    /// Set <see cref="Workflow.CompletionClaimedAt"/> if the completion is not processed
+    /// and not claimed, or its claim has expired. The update is conditional in the
+    /// database, so of the replicas and workers completing the same workflow exactly
+    /// one claims it.
+    /// </summary>
+    private async Task<bool> TryClaimCompletion(Guid workflowId)
+    {
+        var now = DateTime.UtcNow;
+        var claimExpiredBefore = now - CompletionClaimTimeout;
+        var claimed = await context
+            .Workflows.Where(w =>
+                w.Id == workflowId
+                && w.CompletionProcessedAt == null
+                && (w.CompletionClaimedAt == null || w.CompletionClaimedAt < claimExpiredBefore)
+            )
+            .ExecuteUpdateAsync(setters => setters.SetProperty(w => w.CompletionClaimedAt, now));
+        return claimed > 0;
+    }
+
+    /// <summary>
+    /// Clear the claim of a completion that failed, so the next sweep queues it again
+    /// without waiting for the claim to expire.
+    /// </summary>
+    private async Task ReleaseCompletionClaim(Guid workflowId)
+    {
+        try
+        {
+            await context
+                .Workflows.Where(w => w.Id == workflowId)
+                .ExecuteUpdateAsync(setters =>
+                    setters.SetProperty(w => w.CompletionClaimedAt, (DateTime?)null)
+                );
+        }
+        catch (Exception ex)
+        {
+            logger.LogWarning(
+                ex,
+                "Failed to release the completion claim of workflow {WorkflowId}; it is queued again when the claim expires",
+                workflowId
+            );
+        }
+    }
 
+    private async Task ProcessCompletion(Workflow workflow)
+    {
         var run = await context
             .AnalysisRuns.Include(r => r.Workflows)
             .FirstAsync(r => r.Id == workflow.AnalysisRunId);
@@ -276,7 +411,7 @@ public class WorkflowService(
             return false;
         }
 
-        var skipReason = EvaluateSkipRule(workflow, workflowConfig.SkipChainIf);
+        var skipReason = await EvaluateSkipRule(workflow, workflowConfig.SkipChainIf);
         if (skipReason is null)
         {
             return false;
@@ -314,7 +449,7 @@ public class WorkflowService(
         return true;
     }
 
-    private string? EvaluateSkipRule(Workflow workflow, SkipRule rule)
+    private async Task<string?> EvaluateSkipRule(Workflow workflow, SkipRule rule)
     {
         logger.LogDebug(
             "Evaluating skip rule for gate workflow {WorkflowType} with Id: {WorkflowId}",
@@ -325,7 +460,24 @@ public class WorkflowService(
         string? actualValue = null;
         string? failReason = null;
 
-        if (string.IsNullOrWhiteSpace(workflow.ResultJson))
+        string? resultJson;
+        try
+        {
+            resultJson = await resultReader.ReadResultJson(workflow);
+        }
+        catch (RequestFailedException ex)
+        {
+            logger.LogError(
+                ex,
+                "Failed to download result of gate workflow {WorkflowType} with Id: {WorkflowId} from {Location}",
+                workflow.WorkflowType,
+                workflow.Id,
+                workflow.ResultBlobStorageLocation
+            );
+            resultJson = null;
+        }
+
+        if (string.IsNullOrWhiteSpace(resultJson))
         {
             failReason = "Gate result missing";
         }
@@ -333,7 +485,7 @@ public class WorkflowService(
         {
             try
             {
-                using var result = JsonDocument.Parse(workflow.ResultJson);
+                using var result = JsonDocument.Parse(resultJson);
                 if (
                     result.RootElement.TryGetProperty(
                         rule.ResultJsonKeyToCheckForSkipBoolean,
@@ -500,6 +652,13 @@ public class WorkflowService(
         workflow.CompletedAt = null;
         workflow.ErrorMessage = null;
         workflow.ResultJson = null;
+        workflow.ResultBlobStorageLocation = null;
+        workflow.ExitedIdempotencyKey = null;
+        workflow.CompletionProcessedAt = null;
+        workflow.CompletionClaimedAt = null;
+        workflow.ProgressPercent = null;
+        workflow.ProgressStage = null;
+        workflow.ProgressUpdatedAt = null;
 
         var run = await context.AnalysisRuns.FirstOrDefaultAsync(r =>
             r.Id == workflow.AnalysisRunId
@@ -528,6 +687,10 @@ public class WorkflowService(
             sibling.CompletedAt = null;
             sibling.ErrorMessage = null;
             sibling.ResultJson = null;
+            sibling.ResultBlobStorageLocation = null;
+            sibling.ProgressPercent = null;
+            sibling.ProgressStage = null;
+            sibling.ProgressUpdatedAt = null;
         }
 
         await context.SaveChangesAsync();
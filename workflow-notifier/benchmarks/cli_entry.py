@@ -0,0 +1,35 @@
+"""The notifier CLI as started by ``main.py``, with a fake credential.
+
+Used by the benchmarks to run the real CLI in a fresh process without talking
+to Entra ID: ``python -m benchmarks.cli_entry <command> ...``.
+"""
+
+import time
+from typing import NamedTuple
+
+from workflow_notifier import notifications
+
+
+class _AccessToken(NamedTuple):
+    token: str
+    expires_on: int
+
+
+class FakeCredential:
+    def get_token(self, *scopes: str, **kwargs: object) -> _AccessToken:
+        return _AccessToken("benchmark-token", int(time.time()) + 3600)
+
+
+def install_fake_credential() -> None:
+    notifications._get_credential = lambda: FakeCredential()  # type: ignore
+
+
+if __name__ == "__main__":
+    from workflow_notifier.app import make_app
+    from workflow_notifier.config.logger import setup_logger
+    from workflow_notifier.config.open_telemetry import setup_open_telemetry
+
+    setup_logger()
+    setup_open_telemetry()
+    install_fake_credential()
+    make_app()()
@@ -0,0 +1,327 @@
+"""Benchmarks of the notifier's cost per workflow event.
+
+Runs the real CLI against a local SARA stand-in (``mocks.sara_mock``) with a
+fake credential, for ``started``, ``result`` with a small and a multi-MB
+payload, and ``exited``, in two modes:
+
+- ``cold``: a fresh ``python`` process per event, as an Argo step runs it
+- ``inproc``: repeated invocations in this process, i.e. the cost once
+  imports, credential and connections are warm
+
+For every scenario it reports the p50/p95/p99 wall time, the peak RSS of the
+``cold`` processes and the request body bytes that reached SARA. With
+``--baseline`` the results are compared to a stored run: the command exits
+with 1 when a scenario needs more memory or sends more bytes than the baseline
+plus ``--tolerance``. Wall times vary too much between runs on a shared machine
+to fail on, so p50/p95 increases beyond ``--timing-tolerance`` and
+``--timing-floor-ms`` are only reported::
+
+    uv run python -m benchmarks.run --baseline benchmarks/baseline.json
+    uv run python -m benchmarks.run --update-baseline benchmarks/baseline.json
+
+Run it from the ``workflow-notifier`` directory.
+"""
+
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Optional
+from uuid import uuid4
+
+import typer
+
+from mocks.sara_mock import SaraMock
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# Metrics that fail the comparison with the baseline.
+GATED_METRICS = ("max_rss_mb", "wire_bytes")
+# Timings compared with the baseline and reported. p99 is too noisy to compare
+# with the iteration counts used in CI.
+TIMING_METRICS = ("p50_ms", "p95_ms")
+
+SETTINGS_ENV = {
+    "TENANT_ID": "benchmark-tenant",
+    "NOTIFIER_CLIENT_ID": "benchmark-client",
+    "SARA_APP_REG_SCOPE": "api://benchmark/.default",
+    "SARA_SERVER_URL": "http://127.0.0.1:9",
+}
+
+
+class Mode(str, Enum):
+    cold = "cold"
+    inproc = "inproc"
+    both = "both"
+
+
+@dataclass
+class Scenario:
+    name: str
+    args: Callable[[str], list[str]]
+
+
+def _scenarios(workdir: Path, large_result_mb: int) -> list[Scenario]:
+    small = json.dumps({"oilLevel": 0.42, "detections": [{"x": 1, "y": 2}] * 20})
+    large_file = workdir / "large_result.json"
+    rng = random.Random(0)
+    readings = [
+        {"tag": f"tag-{i}", "value": rng.random(), "ok": rng.random() > 0.1}
+        for i in range(large_result_mb * 1024 * 1024 // 60)
+    ]
+    large_file.write_text(json.dumps({"readings": readings}))
+
+    return [
+        Scenario("started", lambda wid: ["started", wid, "argo-benchmark"]),
+        Scenario("result_small", lambda wid: ["result", wid, small]),
+        Scenario(
+            "result_large",
+            lambda wid: ["result", wid, "--from-file", str(large_file)],
+        ),
+        Scenario("exited", lambda wid: ["exited", wid, "Succeeded"]),
+    ]
+
+
+def _summary(
+    wall_seconds: list[float], wire_bytes: list[int], rss_kb: Optional[list[int]]
+) -> dict[str, float]:
+    cuts = statistics.quantiles(wall_seconds, n=100, method="inclusive")
+    summary = {
+        "p50_ms": round(cuts[49] * 1000, 1),
+        "p95_ms": round(cuts[94] * 1000, 1),
+        "p99_ms": round(cuts[98] * 1000, 1),
+        "wire_bytes": round(statistics.mean(wire_bytes)),
+    }
+    if rss_kb is not None:
+        summary["max_rss_mb"] = round(max(rss_kb) / 1024, 1)
+    return summary
+
+
+def _wire_bytes(sara: SaraMock) -> int:
+    received, sara.received = sara.received, []
+    return sum(notification.wire_bytes for notification in received)
+
+
+def run_cold(
+    scenario: Scenario, iterations: int, base_url: str, sara: SaraMock, otel_dir: str
+) -> dict[str, float]:
+    env = {
+        **os.environ,
+        **SETTINGS_ENV,
+        "SARA_SERVER_URL": base_url,
+        "OTEL_EXPORTER_OTLP_PROTOCOL": "file",
+        "OTEL_FILE_EXPORT_DIRECTORY": otel_dir,
+        "PYTHONPATH": os.pathsep.join(
+            [
+                str(PROJECT_DIR / "src"),
+                str(PROJECT_DIR),
+                os.environ.get("PYTHONPATH", ""),
+            ]
+        ),
+    }
+    wall, rss, wire = [], [], []
+    for _ in range(iterations):
+        command = [sys.executable, "-m", "benchmarks.cli_entry"]
+        command += scenario.args(str(uuid4()))
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            command,
+            cwd=PROJECT_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        _, status, usage = os.wait4(process.pid, 0)
+        wall.append(time.perf_counter() - start)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            raise RuntimeError(f"{scenario.name} exited with {process.returncode}")
+        rss.append(usage.ru_maxrss)
+        wire.append(_wire_bytes(sara))
+    return _summary(wall, wire, rss)
+
+
+def run_inproc(
+    scenario: Scenario, iterations: int, base_url: str, sara: SaraMock
+) -> dict[str, float]:
+    from typer.testing import CliRunner
+
+    from benchmarks.cli_entry import install_fake_credential
+    from workflow_notifier.config.settings import settings
+    from workflow_notifier.notifier import app
+
+    install_fake_credential()
+    settings.SARA_SERVER_URL = base_url
+    runner = CliRunner()
+
+    def invoke() -> None:
+        result = runner.invoke(app, scenario.args(str(uuid4())))
+        if result.exit_code != 0:
+            raise RuntimeError(f"{scenario.name} exited with {result.exit_code}")
+
+    # Warm up imports, credential and connection pool.
+    invoke()
+    _wire_bytes(sara)
+
+    wall, wire = [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        invoke()
+        wall.append(time.perf_counter() - start)
+        wire.append(_wire_bytes(sara))
+    # The peak RSS of this process would include the scenarios run before.
+    return _summary(wall, wire, None)
+
+
+def run_benchmarks(
+    modes: list[str],
+    iterations: int,
+    scenario_names: Optional[list[str]] = None,
+    large_result_mb: int = 4,
+) -> dict[str, dict[str, dict[str, float]]]:
+    """Run the scenarios and return ``{mode: {scenario: summary}}``."""
+    for key, value in SETTINGS_ENV.items():
+        os.environ.setdefault(key, value)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    sara = SaraMock()
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    with tempfile.TemporaryDirectory() as workdir, sara.serve() as base_url:
+        scenarios = [
+            s
+            for s in _scenarios(Path(workdir), large_result_mb)
+            if not scenario_names or s.name in scenario_names
+        ]
+        for mode in modes:
+            for scenario in scenarios:
+                if mode == Mode.cold:
+                    otel_dir = str(Path(workdir) / "otel")
+                    summary = run_cold(scenario, iterations, base_url, sara, otel_dir)
+                else:
+                    summary = run_inproc(scenario, iterations, base_url, sara)
+                results.setdefault(mode, {})[scenario.name] = summary
+    return results
+
+
+def find_regressions(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    tolerance: float,
+) -> list[str]:
+    """Describe every gated metric that exceeds its baseline by more than
+    ``tolerance`` (a fraction, e.g. 0.25 for 25%)."""
+    return _exceeding(
+        results, baseline, GATED_METRICS, lambda expected: expected * (1 + tolerance)
+    )
+
+
+def find_slowdowns(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    tolerance: float,
+    floor_ms: float,
+) -> list[str]:
+    """Describe every timing that exceeds its baseline both by more than
+    ``tolerance`` and by more than ``floor_ms``."""
+    return _exceeding(
+        results,
+        baseline,
+        TIMING_METRICS,
+        lambda expected: max(expected * (1 + tolerance), expected + floor_ms),
+    )
+
+
+def _exceeding(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    metrics: tuple[str, ...],
+    limit_of: Callable[[float], float],
+) -> list[str]:
+    exceeding = []
+    for mode, scenarios in results.items():
+        for name, summary in scenarios.items():
+            expected = baseline.get(mode, {}).get(name)
+            if expected is None:
+                continue
+            for metric in metrics:
+                if metric not in expected or metric not in summary:
+                    continue
+                limit = limit_of(expected[metric])
+                if summary[metric] > limit:
+                    exceeding.append(
+                        f"{mode}/{name} {metric}: {summary[metric]} > "
+                        f"{limit:.1f} (baseline {expected[metric]})"
+                    )
+    return exceeding
+
+
+def _print_table(results: dict[str, dict[str, dict[str, float]]]) -> None:
+    columns = ["p50_ms", "p95_ms", "p99_ms", "max_rss_mb", "wire_bytes"]
+    print(f"{'mode':<7} {'scenario':<13} " + " ".join(f"{c:>11}" for c in columns))
+    for mode, scenarios in results.items():
+        for name, summary in scenarios.items():
+            values = " ".join(f"{summary.get(c, '-'):>11}" for c in columns)
+            print(f"{mode:<7} {name:<13} {values}")
+
+
+def main(
+    mode: Mode = typer.Option(Mode.both, help="Cold processes, in-process or both."),
+    iterations: int = typer.Option(20, min=2, help="Measured runs per scenario."),
+    scenario: Optional[list[str]] = typer.Option(
+        None, help="Only run these scenarios (repeatable)."
+    ),
+    large_result_mb: int = typer.Option(4, min=1, help="Size of result_large."),
+    baseline: Optional[Path] = typer.Option(
+        None, exists=True, dir_okay=False, help="Fail on regressions against this."
+    ),
+    tolerance: float = typer.Option(
+        0.25,
+        min=0,
+        help="Allowed increase of RSS and bytes over the baseline, as a fraction.",
+    ),
+    timing_tolerance: float = typer.Option(
+        0.5, min=0, help="Report p50/p95 increases beyond this fraction."
+    ),
+    timing_floor_ms: float = typer.Option(
+        20.0, min=0, help="Ignore p50/p95 increases smaller than this."
+    ),
+    update_baseline: Optional[Path] = typer.Option(
+        None, dir_okay=False, help="Write the results to this baseline file."
+    ),
+    output: Optional[Path] = typer.Option(
+        None, dir_okay=False, help="Write the results as JSON to this path."
+    ),
+) -> None:
+    modes = [Mode.cold, Mode.inproc] if mode == Mode.both else [mode]
+    results = run_benchmarks(
+        [m.value for m in modes], iterations, scenario, large_result_mb
+    )
+    _print_table(results)
+
+    for path in (output, update_baseline):
+        if path is not None:
+            path.write_text(json.dumps(results, indent=2) + "\n")
+
+    if baseline is not None:
+        expected = json.loads(baseline.read_text())
+        for slowdown in find_slowdowns(
+            results, expected, timing_tolerance, timing_floor_ms
+        ):
+            print(f"SLOWER {slowdown}")
+        regressions = find_regressions(results, expected, tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,126 +1,563 @@
 """Local Argo-workflow mock.
 
 Listens for trigger requests from SARA, then asynchronously calls back into
-SARA via the generic notifier (`started` / `result` / `exited`). The
-per-workflow-type endpoints exist only because SARA's configuration assigns
-one TriggerUrl per workflow type; the dispatch logic itself is generic.
+SARA via the generic notifier (`started` / `result` / `exited`). Workflow
+types are rows in a registry file (``mocks/workflow_types.toml`` by default)
+mapping each trigger path to a result generator, latency and failure rate; a
+single route dispatches every trigger through it, and edits to the file take
+effect on the next trigger without a restart.
+
+Simulated workflows do not hold a thread while they "run". A single timer
+thread keeps the next callback of every in-flight workflow in a heap and hands
+due callbacks to a bounded pool of workers, so thousands of concurrent
+workflows cost a heap entry each and the number of simultaneous requests to
+SARA is capped by ``--workers``. ``GET /stats`` reports the simulation's
+progress, including how far callbacks lag behind their due time when the
+workers cannot keep up.
+
+``--scenario`` picks a load and fault profile (see ``SCENARIOS``) whose rates
+can be overridden individually: result sizes, failed and timed-out workflows,
+dropped, duplicated and out-of-order callbacks, and bursty arrivals. Every
+callback's latency and outcome as seen from the mock is summarised per event
+in ``GET /stats`` and printed when the mock stops.
 """
 
+import heapq
+import itertools
 import json
+import math
 import random
 import threading
 import time
-from typing import Any, Optional
+import tomllib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional
+from uuid import UUID
 
+import requests
 import typer
 from flask import Flask, jsonify, request
-from typer.testing import CliRunner
 
-from workflow_notifier.notifier import app as notifier_app
+from mocks.result_generators import GENERATORS
+from workflow_notifier.client import NotifierClient
+from workflow_notifier.notifications import NotifierError, WorkflowExitStatus
 
-flask_app = Flask(__name__)
-_runner = CliRunner()
 
+@dataclass(frozen=True)
+class LogNormal:
+    """Log-normally distributed around ``median`` with shape ``sigma`` (0 for a
+    fixed value). Used for callback delays in seconds and result sizes in bytes."""
 
-def _invoke_notifier(args: list[str]) -> None:
-    """Drive the Typer CLI in-process. Mirrors how Argo invokes the binary."""
-    result = _runner.invoke(notifier_app, args)
-    if result.exit_code != 0:
-        print(f"Notifier failed (exit={result.exit_code}): {result.output}")
+    median: float = 2.0
+    sigma: float = 0.0
 
+    def sample(self, rng: random.Random) -> float:
+        if self.sigma <= 0:
+            return self.median
+        return self.median * math.exp(rng.gauss(0.0, self.sigma))
 
-def _run_workflow(
-    workflow_id: str,
-    result_payload: dict[str, Any],
-    delay_seconds: float = 2.0,
-) -> None:
-    """Generic mock workflow: started -> result -> exited(Succeeded)."""
-    time.sleep(delay_seconds)
-    _invoke_notifier(["started", workflow_id])
-
-    time.sleep(delay_seconds)
-    _invoke_notifier(["result", workflow_id, json.dumps(result_payload)])
-
-    time.sleep(delay_seconds)
-    _invoke_notifier(["exited", workflow_id, "Succeeded"])
-
-
-def _extract_workflow_id(data: dict[str, Any]) -> Optional[str]:
-    workflow_id = data.get("workflowId")
-    if not workflow_id:
-        print(f"Trigger payload missing workflowId: {data}")
-    return workflow_id
-
-
-@flask_app.route("/trigger-anonymizer", methods=["POST"])
-def trigger_anonymizer():
-    data = request.get_json()
-    print(f"Received anonymizer trigger: {data}")
-    workflow_id = _extract_workflow_id(data)
-    if workflow_id is None:
-        return jsonify({"error": "workflowId missing"}), 400
-
-    threading.Thread(
-        target=_run_workflow,
-        args=(workflow_id, {"isPersonInImage": True}),
-    ).start()
-    return jsonify({"message": "Anonymizer triggered"}), 200
-
-
-@flask_app.route("/trigger-constant-level-oiler-estimator", methods=["POST"])
-def trigger_cloe():
-    data = request.get_json()
-    print(f"Received CLOE trigger: {data}")
-    workflow_id = _extract_workflow_id(data)
-    if workflow_id is None:
-        return jsonify({"error": "workflowId missing"}), 400
-
-    payload = {
-        "oilLevel": str(random.uniform(0, 1)),
-        "confidence": 0.95,
-    }
-    threading.Thread(target=_run_workflow, args=(workflow_id, payload)).start()
-    return jsonify({"message": "CLOE triggered"}), 200
 
+DEFAULT_REGISTRY = Path(__file__).with_name("workflow_types.toml")
+
+
+@dataclass(frozen=True)
+class WorkflowType:
+    name: str
+    result: Callable[[random.Random], dict[str, Any]]
+    latency: LogNormal = field(default_factory=LogNormal)
+    # Overrides the scenario's failure rate for this type.
+    failure_rate: Optional[float] = None
+    path: Optional[str] = None
+
+    @property
+    def trigger_path(self) -> str:
+        return self.path or f"/trigger-{self.name}"
+
+
+def load_workflow_types(path: Path) -> dict[str, WorkflowType]:
+    """Read a registry file into workflow types keyed by trigger path.
+
+    Every generator is run once, so an unknown generator or parameter fails
+    the load instead of each trigger.
+    """
+    with path.open("rb") as file:
+        table = tomllib.load(file)
+
+    workflow_types = {}
+    for name, row in table.items():
+        generator = GENERATORS.get(row.get("generator", ""))
+        if generator is None:
+            raise ValueError(
+                f"{path}: {name} has unknown generator {row.get('generator')!r}, "
+                f"expected one of {', '.join(GENERATORS)}"
+            )
+        result = partial(generator, **row.get("params", {}))
+        try:
+            result(random.Random(0))
+        except TypeError as exc:
+            raise ValueError(f"{path}: {name} has invalid params: {exc}") from exc
+        workflow_type = WorkflowType(
+            name,
+            result,
+            LogNormal(**row.get("latency", {})),
+            row.get("failure_rate"),
+            row.get("trigger_path"),
+        )
+        workflow_types[workflow_type.trigger_path] = workflow_type
+    return workflow_types
+
+
+class WorkflowRegistry:
+    """Workflow types by trigger path, reloaded when the registry file changes.
+
+    A file that fails to load keeps the previous types in use, so a half-saved
+    edit does not take the mock down mid-run.
+    """
+
+    def __init__(self, path: Path = DEFAULT_REGISTRY) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._modified = path.stat().st_mtime_ns
+        self._types = load_workflow_types(path)
+
+    def get(self, trigger_path: str) -> Optional[WorkflowType]:
+        self._reload_if_changed()
+        with self._lock:
+            return self._types.get(trigger_path)
+
+    def workflow_types(self) -> list[WorkflowType]:
+        self._reload_if_changed()
+        with self._lock:
+            return list(self._types.values())
+
+    def _reload_if_changed(self) -> None:
+        try:
+            modified = self.path.stat().st_mtime_ns
+        except OSError as exc:
+            print(f"Cannot stat {self.path}, keeping workflow types: {exc}")
+            return
+        with self._lock:
+            if modified == self._modified:
+                return
+            self._modified = modified
+            try:
+                self._types = load_workflow_types(self.path)
+            except (OSError, ValueError, TypeError) as exc:
+                print(f"Reloading {self.path} failed, keeping workflow types: {exc}")
+                return
+        print(f"Reloaded workflow types from {self.path}")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Faults and load shape applied to every simulated workflow.
+
+    Rates are probabilities per workflow (failure, timeout, reorder) or per
+    callback (drop, duplicate). With ``burst_interval_seconds`` set, workflows
+    only start on multiples of the interval, so triggers spread over an
+    interval reach SARA as one burst.
+    """
+
+    # Pad results to a size drawn from this distribution, in bytes.
+    result_bytes: Optional[LogNormal] = None
+    # Report `exited Failed` right after `started`, without a result.
+    failure_rate: float = 0.0
+    # Report `exited Failed` after `timeout_seconds`, without a result.
+    timeout_rate: float = 0.0
+    timeout_seconds: float = 60.0
+    # Never send a callback.
+    drop_rate: float = 0.0
+    # Send a callback a second time right after the first.
+    duplicate_rate: float = 0.0
+    # Send `exited` before `result`.
+    reorder_rate: float = 0.0
+    burst_interval_seconds: float = 0.0
+
+
+SCENARIOS = {
+    "steady": Scenario(),
+    "faulty": Scenario(
+        failure_rate=0.1,
+        timeout_rate=0.05,
+        drop_rate=0.02,
+        duplicate_rate=0.05,
+        reorder_rate=0.05,
+    ),
+    "bursty": Scenario(burst_interval_seconds=10.0),
+    "large-results": Scenario(result_bytes=LogNormal(median=512 * 1024, sigma=1.0)),
+}
+
+
+@dataclass(frozen=True)
+class Callback:
+    event: str
+    exit_status: Optional[WorkflowExitStatus] = None
+    error_message: Optional[str] = None
+    # Seconds after the previous callback; None draws from the type's latency.
+    delay: Optional[float] = None
+
+
+class CallbackReport:
+    """Latency and outcome of every callback the mock sent to SARA."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._seconds: dict[str, list[float]] = {}
+        self._outcomes: dict[str, Counter[str]] = {}
 
-@flask_app.route("/trigger-fencilla", methods=["POST"])
-def trigger_fencilla():
-    data = request.get_json()
-    print(f"Received Fencilla trigger: {data}")
-    workflow_id = _extract_workflow_id(data)
-    if workflow_id is None:
-        return jsonify({"error": "workflowId missing"}), 400
+    def record(self, event: str, seconds: float, outcome: str) -> None:
+        with self._lock:
+            self._seconds.setdefault(event, []).append(seconds)
+            self._outcomes.setdefault(event, Counter())[outcome] += 1
 
-    payload = {"isBreak": True, "confidence": 0.95}
-    threading.Thread(target=_run_workflow, args=(workflow_id, payload)).start()
-    return jsonify({"message": "Fencilla triggered"}), 200
+    def summary(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            seconds = {event: sorted(values) for event, values in self._seconds.items()}
+            outcomes = {event: dict(counts) for event, counts in self._outcomes.items()}
 
+        def percentile(values: list[float], fraction: float) -> float:
+            index = min(int(fraction * len(values)), len(values) - 1)
+            return round(values[index] * 1000, 1)
 
-@flask_app.route("/trigger-rain-drop", methods=["POST"])
-def trigger_rain_drop():
-    data = request.get_json()
-    print(f"Received rain-drop trigger: {data}")
-    workflow_id = _extract_workflow_id(data)
-    if workflow_id is None:
-        return jsonify({"error": "workflowId missing"}), 400
+        summary = {}
+        for event, values in seconds.items():
+            errors = sum(n for o, n in outcomes[event].items() if o != "ok")
+            summary[event] = {
+                "count": len(values),
+                "errors": errors,
+                "errorRate": round(errors / len(values), 4),
+                "p50Ms": percentile(values, 0.50),
+                "p95Ms": percentile(values, 0.95),
+                "p99Ms": percentile(values, 0.99),
+                "maxMs": round(values[-1] * 1000, 1),
+                "outcomes": outcomes[event],
+            }
+        return summary
 
-    payload = {"rain": random.random() < 0.2}
-    threading.Thread(target=_run_workflow, args=(workflow_id, payload)).start()
-    return jsonify({"message": "Rain-drop triggered"}), 200
 
+def outcome_of(exc: BaseException) -> str:
+    """How a failed callback is counted in a :class:`CallbackReport`."""
+    response = getattr(exc, "response", None)
+    if response is not None:
+        return f"http_{response.status_code}"
+    return type(exc).__name__
 
-@flask_app.route("/trigger-thermal-reading", methods=["POST"])
-def trigger_thermal_reading():
-    data = request.get_json()
-    print(f"Received thermal-reading trigger: {data}")
-    workflow_id = _extract_workflow_id(data)
-    if workflow_id is None:
-        return jsonify({"error": "workflowId missing"}), 400
 
-    payload = {"temperature": 69}
-    threading.Thread(target=_run_workflow, args=(workflow_id, payload)).start()
-    return jsonify({"message": "Thermal reading triggered"}), 200
+class Scheduler:
+    """Runs callbacks after a delay on a bounded pool of worker threads."""
+
+    def __init__(self, workers: int) -> None:
+        self._heap: list[tuple[float, int, Callable[..., None], tuple]] = []
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="argo-mock")
+        self._stopped = False
+        self.max_lag_seconds = 0.0
+        self._timer = threading.Thread(
+            target=self._run, name="argo-mock-timer", daemon=True
+        )
+        self._timer.start()
+
+    def call_later(self, delay: float, callback: Callable[..., None], *args) -> None:
+        due = time.monotonic() + max(delay, 0.0)
+        with self._condition:
+            heapq.heappush(self._heap, (due, next(self._sequence), callback, args))
+            self._condition.notify()
+
+    @property
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._timer.join()
+        self._pool.shutdown(wait=True)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._heap:
+                        wait = self._heap[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+                if self._stopped:
+                    return
+                due, _, callback, args = heapq.heappop(self._heap)
+            self._pool.submit(self._call, due, callback, args)
+
+    def _call(self, due: float, callback: Callable[..., None], args: tuple) -> None:
+        # Time spent waiting for a free worker after the callback was due.
+        self.max_lag_seconds = max(self.max_lag_seconds, time.monotonic() - due)
+        callback(*args)
+
+
+class Simulation:
+    """Simulated workflows reporting started -> result -> exited(Succeeded),
+    with the faults of ``scenario`` injected."""
+
+    def __init__(
+        self,
+        scheduler: Scheduler,
+        seed: Optional[int] = None,
+        scenario: Scenario = Scenario(),
+    ) -> None:
+        self._scheduler = scheduler
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.scenario = scenario
+        self.report = CallbackReport()
+        self.in_flight = 0
+        self.triggered = 0
+        self.completed = 0
+        self.notification_failures = 0
+        self.faults: Counter[str] = Counter()
+        # Generated results are of every workflow type and padded, so they are
+        # sent unchecked.
+        self._client = NotifierClient(validate_results=False)
+
+    def start(self, workflow_type: WorkflowType, workflow_id: UUID) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.triggered += 1
+            callbacks = self._plan(workflow_type)
+            delay = self._first_delay(workflow_type)
+        self._scheduler.call_later(
+            delay, self._step, workflow_type, workflow_id, callbacks, 0
+        )
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "triggered": self.triggered,
+                "inFlight": self.in_flight,
+                "completed": self.completed,
+                "notificationFailures": self.notification_failures,
+                "pendingCallbacks": self._scheduler.pending,
+                "maxLagSeconds": round(self._scheduler.max_lag_seconds, 3),
+                "faults": dict(self.faults),
+                "callbacks": self.report.summary(),
+            }
+
+    def _plan(self, workflow_type: WorkflowType) -> list[Callback]:
+        """Draw the callbacks one workflow sends. Called with the lock held."""
+        scenario, rng = self.scenario, self._rng
+        failure_rate = workflow_type.failure_rate
+        if failure_rate is None:
+            failure_rate = scenario.failure_rate
+        roll = rng.random()
+        if roll < failure_rate:
+            self.faults["failed"] += 1
+            plan = [
+                Callback("started"),
+                Callback("exited", WorkflowExitStatus.Failed, "Simulated failure"),
+            ]
+        elif roll < failure_rate + scenario.timeout_rate:
+            self.faults["timedOut"] += 1
+            plan = [
+                Callback("started"),
+                Callback(
+                    "exited",
+                    WorkflowExitStatus.Failed,
+                    f"Simulated timeout after {scenario.timeout_seconds:g}s",
+                    delay=scenario.timeout_seconds,
+                ),
+            ]
+        else:
+            plan = [
+                Callback("started"),
+                Callback("result"),
+                Callback("exited", WorkflowExitStatus.Succeeded),
+            ]
+            if rng.random() < scenario.reorder_rate:
+                self.faults["reordered"] += 1
+                plan[1], plan[2] = plan[2], plan[1]
+
+        callbacks = []
+        for callback in plan:
+            if rng.random() < scenario.drop_rate:
+                self.faults["dropped"] += 1
+                continue
+            callbacks.append(callback)
+            if rng.random() < scenario.duplicate_rate:
+                self.faults["duplicated"] += 1
+                callbacks.append(replace(callback, delay=0.0))
+        return callbacks
+
+    def _first_delay(self, workflow_type: WorkflowType) -> float:
+        delay = workflow_type.latency.sample(self._rng)
+        interval = self.scenario.burst_interval_seconds
+        if interval <= 0:
+            return delay
+        # Round the start up to the next burst.
+        now = time.time()
+        return math.ceil((now + delay) / interval) * interval - now
+
+    def _result(self, workflow_type: WorkflowType) -> str:
+        """Draw a result, padded to the scenario's size.
+
+        Large generated results take a while, so they are drawn from a
+        generator seeded under the lock rather than while holding it.
+        """
+        with self._lock:
+            rng = random.Random(self._rng.getrandbits(64))
+        result = workflow_type.result(rng)
+        if self.scenario.result_bytes is None:
+            return json.dumps(result)
+        size = int(self.scenario.result_bytes.sample(rng))
+        missing = size - len(json.dumps(result)) - len(', "mockPadding": ""')
+        # Random hex so gzip cannot shrink the padding away.
+        missing = max(missing, 0)
+        result["mockPadding"] = rng.randbytes((missing + 1) // 2).hex()[:missing]
+        return json.dumps(result)
+
+    def _send(
+        self, workflow_type: WorkflowType, workflow_id: UUID, callback: Callback
+    ) -> None:
+        if callback.event == "started":
+            self._client.started(workflow_id)
+        elif callback.event == "result":
+            self._client.result(workflow_id, self._result(workflow_type))
+        else:
+            assert callback.exit_status is not None
+            self._client.exited(
+                workflow_id, callback.exit_status, callback.error_message
+            )
+
+    def _step(
+        self,
+        workflow_type: WorkflowType,
+        workflow_id: UUID,
+        callbacks: list[Callback],
+        index: int,
+    ) -> None:
+        outcome = "ok"
+        if index < len(callbacks):
+            callback = callbacks[index]
+            start = time.perf_counter()
+            try:
+                self._send(workflow_type, workflow_id, callback)
+            except (requests.exceptions.RequestException, NotifierError) as exc:
+                print(f"Notifier failed for workflow {workflow_id}: {exc}")
+                outcome = outcome_of(exc)
+            self.report.record(callback.event, time.perf_counter() - start, outcome)
+            index += 1
+
+        with self._lock:
+            if outcome != "ok":
+                self.notification_failures += 1
+            if index >= len(callbacks):
+                self.in_flight -= 1
+                self.completed += 1
+                return
+            following = callbacks[index]
+            delay = following.delay
+            if delay is None:
+                delay = workflow_type.latency.sample(self._rng)
+        self._scheduler.call_later(
+            delay, self._step, workflow_type, workflow_id, callbacks, index
+        )
+
+
+def create_app(simulation: Simulation, registry: WorkflowRegistry) -> Flask:
+    flask_app = Flask(__name__)
+
+    def trigger(trigger_path: str):
+        workflow_type = registry.get(f"/{trigger_path}")
+        if workflow_type is None:
+            return jsonify({"error": f"no workflow type at /{trigger_path}"}), 404
+        data = request.get_json(silent=True) or {}
+        try:
+            workflow_id = UUID(str(data["workflowId"]))
+        except (KeyError, ValueError):
+            print(f"Trigger payload missing a valid workflowId: {data}")
+            return jsonify({"error": "workflowId missing"}), 400
+        simulation.start(workflow_type, workflow_id)
+        return jsonify({"message": f"{workflow_type.name} triggered"}), 200
+
+    def workflow_types():
+        return jsonify(
+            {
+                workflow_type.trigger_path: workflow_type.name
+                for workflow_type in registry.workflow_types()
+            }
+        )
+
+    flask_app.add_url_rule(
+        "/<path:trigger_path>", endpoint="trigger", view_func=trigger, methods=["POST"]
+    )
+    flask_app.add_url_rule(
+        "/stats", endpoint="stats", view_func=lambda: jsonify(simulation.stats())
+    )
+    flask_app.add_url_rule(
+        "/workflow-types", endpoint="workflow_types", view_func=workflow_types
+    )
+    return flask_app
+
+
+def main(
+    port: int = typer.Option(30232, help="Port SARA's TriggerUrls point at."),
+    workers: int = typer.Option(
+        32, min=1, help="Callbacks to SARA that may be in progress at once."
+    ),
+    seed: Optional[int] = typer.Option(None, help="Seed for reproducible runs."),
+    workflow_types: Path = typer.Option(
+        DEFAULT_REGISTRY, exists=True, dir_okay=False, help="Workflow type registry."
+    ),
+    scenario: str = typer.Option(
+        "steady", help=f"Load and fault profile: {', '.join(SCENARIOS)}."
+    ),
+    result_kb: Optional[float] = typer.Option(
+        None, min=0, help="Median result size in KiB (log-normal, sigma 1)."
+    ),
+    failure_rate: Optional[float] = typer.Option(None, min=0, max=1),
+    timeout_rate: Optional[float] = typer.Option(None, min=0, max=1),
+    timeout_seconds: Optional[float] = typer.Option(None, min=0),
+    drop_rate: Optional[float] = typer.Option(None, min=0, max=1),
+    duplicate_rate: Optional[float] = typer.Option(None, min=0, max=1),
+    reorder_rate: Optional[float] = typer.Option(None, min=0, max=1),
+    burst_interval: Optional[float] = typer.Option(
+        None, min=0, help="Start workflows only on multiples of this many seconds."
+    ),
+) -> None:
+    if scenario not in SCENARIOS:
+        raise typer.BadParameter(
+            f"unknown scenario {scenario!r}", param_hint="scenario"
+        )
+    overrides: dict[str, Any] = {
+        "failure_rate": failure_rate,
+        "timeout_rate": timeout_rate,
+        "timeout_seconds": timeout_seconds,
+        "drop_rate": drop_rate,
+        "duplicate_rate": duplicate_rate,
+        "reorder_rate": reorder_rate,
+        "burst_interval_seconds": burst_interval,
+    }
+    if result_kb is not None:
+        overrides["result_bytes"] = LogNormal(median=result_kb * 1024, sigma=1.0)
+    profile = replace(
+        SCENARIOS[scenario],
+        **{key: value for key, value in overrides.items() if value is not None},
+    )
+
+    registry = WorkflowRegistry(workflow_types)
+    scheduler = Scheduler(workers)
+    simulation = Simulation(scheduler, seed, profile)
+    try:
+        create_app(simulation, registry).run(host="127.0.0.1", port=port, threaded=True)
+    finally:
+        print(json.dumps(simulation.stats(), indent=2))
 
 
 if __name__ == "__main__":
-    flask_app.run(host="127.0.0.1", port=30232)
+    typer.run(main)
@@ -0,0 +1,77 @@
+"""Local stand-in for the Azure Blob service, in the spirit of Azurite.
+
+Serves Put Blob and Get Blob for block blobs on Azurite's path-style URLs,
+``/<account>/<container>/<blob>``, so the notifier's result offloading can be
+exercised with ``RESULT_BLOB_ENDPOINT=<base url>/{account}``. Like Azure it
+refuses uploads without a Content-Length, a bearer token or the BlockBlob
+type; the token itself is not checked.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from flask import Flask, request
+from werkzeug.serving import make_server
+
+
+class BlobStorageMock:
+    def __init__(self) -> None:
+        self.blobs: dict[str, bytes] = {}
+        self.content_types: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.flask_app = Flask(__name__)
+        self.flask_app.add_url_rule(
+            "/<account>/<container>/<path:blob>",
+            view_func=self._put_blob,
+            methods=["PUT"],
+        )
+        self.flask_app.add_url_rule(
+            "/<account>/<container>/<path:blob>",
+            view_func=self._get_blob,
+            methods=["GET"],
+        )
+
+    @staticmethod
+    def key(account: str, container: str, blob: str) -> str:
+        return f"{account}/{container}/{blob}"
+
+    def _put_blob(self, account: str, container: str, blob: str):
+        if request.content_length is None:
+            return {"error": "MissingContentLengthHeader"}, 411
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return {"error": "NoAuthenticationInformation"}, 401
+        if request.headers.get("x-ms-blob-type") != "BlockBlob":
+            return {"error": "InvalidBlobType"}, 400
+
+        key = self.key(account, container, blob)
+        with self._lock:
+            self.blobs[key] = request.get_data()
+            self.content_types[key] = request.headers.get(
+                "x-ms-blob-content-type", "application/octet-stream"
+            )
+        return "", 201
+
+    def _get_blob(self, account: str, container: str, blob: str):
+        key = self.key(account, container, blob)
+        with self._lock:
+            if key not in self.blobs:
+                return {"error": "BlobNotFound"}, 404
+            return self.blobs[key], 200, {"Content-Type": self.content_types[key]}
+
+    @contextmanager
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+        """Serve in a background thread; yields the base URL, to which
+        ``/{account}`` is appended for RESULT_BLOB_ENDPOINT."""
+        server = make_server(host, port, self.flask_app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://{host}:{server.server_port}"
+        finally:
+            server.shutdown()
+            thread.join()
+
+
+if __name__ == "__main__":
+    BlobStorageMock().flask_app.run(host="127.0.0.1", port=10000)
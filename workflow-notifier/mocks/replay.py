@@ -0,0 +1,149 @@
+"""Replay a notifier event log against the SARA mock.
+
+Reads a log written by notifiers running with ``EVENT_LOG_PATH`` set and sends
+each ``started``, ``result`` and ``exited`` request again at the offset it
+was originally made, divided by ``--speed``. The requests go through the
+notifier the same way the Argo mock sends them, from a bounded pool of
+workers (``--workers``), so the replay reproduces production's arrival
+pattern and payload sizes::
+
+    uv run python -m mocks.sara_mock
+    SARA_SERVER_URL=http://127.0.0.1:8100 uv run python -m mocks.replay \\
+        events.jsonl --speed 10
+
+The replay targets ``mocks/sara_mock.py`` only. It does not create the logged
+workflows, so a real SARA knows none of them, and with ``--fresh-ids`` none
+can exist: every request ends in a 404 after one lookup, without reaching the
+code that applies the event. Its numbers measure the notifier and the
+transport, not SARA's ``/api/workflow/*`` endpoints.
+
+The log holds no payloads, so each result is a synthetic body of the
+recorded size and every ``exited`` reports ``Succeeded``. Batch requests do
+not record their events and are skipped. ``--fresh-ids`` maps every logged
+workflow id to a new one, for replaying the same log more than once.
+
+The summary reports per-event latency percentiles and error rates as seen
+from the replay, the throughput reached and how far requests fell behind
+their schedule.
+"""
+
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from uuid import UUID, uuid4
+
+import requests
+import typer
+
+from mocks.argo_workflow_mock import CallbackReport, Scheduler, outcome_of
+from workflow_notifier.client import NotifierClient
+from workflow_notifier.event_log import read_event_log
+from workflow_notifier.notifications import NotifierError, WorkflowExitStatus
+
+REPLAYED_EVENTS = ("started", "result", "exited")
+
+# Bytes of {"resultJson": "{\"replayPadding\": \"\"}"} around the padding.
+_RESULT_OVERHEAD = len(json.dumps({"resultJson": json.dumps({"replayPadding": ""})}))
+
+
+def synthetic_result(payload_bytes: int, rng: random.Random) -> str:
+    """A result JSON whose request body is ``payload_bytes`` long."""
+    padding = max(payload_bytes - _RESULT_OVERHEAD, 0)
+    return json.dumps(
+        {"replayPadding": rng.randbytes((padding + 1) // 2).hex()[:padding]}
+    )
+
+
+def _send(
+    client: NotifierClient, entry: dict, workflow_id: UUID, rng: random.Random
+) -> None:
+    if entry["event"] == "started":
+        client.started(workflow_id)
+    elif entry["event"] == "result":
+        client.result(workflow_id, synthetic_result(entry["payloadBytes"], rng))
+    else:
+        client.exited(workflow_id, WorkflowExitStatus.Succeeded)
+
+
+def replay(
+    entries: list[dict], speed: float = 1.0, workers: int = 32, fresh_ids: bool = False
+) -> dict[str, Any]:
+    """Re-send ``entries`` on their original schedule divided by ``speed``
+    and return the summary once all of them have been sent."""
+    scheduled = [
+        entry
+        for entry in entries
+        if entry["event"] in REPLAYED_EVENTS and entry.get("workflowId")
+    ]
+    report = CallbackReport()
+    # Synthetic results do not match any result schema.
+    client = NotifierClient(validate_results=False)
+    workflow_ids: dict[str, UUID] = {}
+    remaining = len(scheduled)
+    lock = threading.Lock()
+    done = threading.Event()
+    if not scheduled:
+        done.set()
+
+    def send(entry: dict, workflow_id: UUID) -> None:
+        nonlocal remaining
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            _send(client, entry, workflow_id, random.Random(entry["ts"]))
+        except (requests.exceptions.RequestException, NotifierError) as exc:
+            outcome = outcome_of(exc)
+        report.record(entry["event"], time.perf_counter() - start, outcome)
+        with lock:
+            remaining -= 1
+            if remaining == 0:
+                done.set()
+
+    scheduler = Scheduler(workers)
+    first = scheduled[0]["ts"] if scheduled else 0.0
+    begin = time.monotonic()
+    for entry in scheduled:
+        logged_id = entry["workflowId"]
+        if logged_id not in workflow_ids:
+            workflow_ids[logged_id] = uuid4() if fresh_ids else UUID(logged_id)
+        due = begin + (entry["ts"] - first) / speed
+        scheduler.call_later(
+            due - time.monotonic(), send, entry, workflow_ids[logged_id]
+        )
+    done.wait()
+    wall_seconds = time.monotonic() - begin
+    scheduler.shutdown()
+
+    original_seconds = scheduled[-1]["ts"] - first if scheduled else 0.0
+    return {
+        "replayed": len(scheduled),
+        "skipped": len(entries) - len(scheduled),
+        "originalSeconds": round(original_seconds, 3),
+        "wallSeconds": round(wall_seconds, 3),
+        "throughputPerSecond": round(len(scheduled) / max(wall_seconds, 1e-9), 1),
+        "maxLagSeconds": round(scheduler.max_lag_seconds, 3),
+        "callbacks": report.summary(),
+    }
+
+
+def main(
+    event_log: Path = typer.Argument(..., exists=True, dir_okay=False),
+    speed: float = typer.Option(
+        1.0, min=0.001, help="Replay this many times faster than recorded."
+    ),
+    workers: int = typer.Option(
+        32, min=1, help="Requests to SARA that may be in progress at once."
+    ),
+    fresh_ids: bool = typer.Option(
+        False, help="Send under new workflow ids instead of the logged ones."
+    ),
+) -> None:
+    summary = replay(read_event_log(str(event_log)), speed, workers, fresh_ids)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,141 @@
+"""Result payload generators for the Argo mock.
+
+Each generator returns the ``resultJson`` object one workflow type reports.
+The fields SARA's result handlers read come first, with the shapes of
+``api/Services/ResultHandlers/WorkflowResultHandlers``. The size parameters
+add the per-detection or per-pixel data a real analysis returns next to
+them, so a workflow type's result handler can be benchmarked with realistic
+payload sizes before its Argo template exists. Parameters come from the
+``params`` table of a workflow type in the registry file.
+"""
+
+import random
+from typing import Any, Callable
+
+Generator = Callable[..., dict[str, Any]]
+
+
+def _blob_location(rng: random.Random, account: str) -> dict[str, str]:
+    return {
+        "storageAccount": account,
+        "blobContainer": "mock",
+        "blobName": f"{rng.getrandbits(64):016x}.jpg",
+    }
+
+
+def _box(rng: random.Random) -> dict[str, float]:
+    x, y = rng.uniform(0, 0.9), rng.uniform(0, 0.9)
+    return {
+        "x": round(x, 4),
+        "y": round(y, 4),
+        "width": round(rng.uniform(0.01, 1 - x), 4),
+        "height": round(rng.uniform(0.01, 1 - y), 4),
+    }
+
+
+def anonymizer(
+    rng: random.Random, person_rate: float = 0.3, detections: int = 0
+) -> dict[str, Any]:
+    """Whether a person was found, where the masked images went and, with
+    ``detections``, the masked regions."""
+    return {
+        "isPersonInImage": rng.random() < person_rate,
+        "outputBlobStorageLocation": _blob_location(rng, "saradevstoreanon"),
+        "preProcessedBlobStorageLocation": _blob_location(rng, "saradevstoreanon"),
+        "detections": [
+            {**_box(rng), "score": round(rng.uniform(0.5, 1), 3)}
+            for _ in range(detections)
+        ],
+    }
+
+
+def oil_level(rng: random.Random, samples: int = 0) -> dict[str, Any]:
+    """An oil level and confidence, with ``samples`` per-frame estimates."""
+    level = rng.uniform(0, 1)
+    return {
+        "oilLevel": round(level, 4),
+        "confidence": round(rng.uniform(0.6, 1), 3),
+        "warning": None,
+        "samples": [round(rng.gauss(level, 0.02), 4) for _ in range(samples)],
+    }
+
+
+def fencilla(
+    rng: random.Random, break_rate: float = 0.05, segments: int = 0
+) -> dict[str, Any]:
+    """Whether a fence break was found, with ``segments`` scored fence
+    segments."""
+    return {
+        "isBreak": rng.random() < break_rate,
+        "confidence": round(rng.uniform(0.6, 1), 3),
+        "warning": None,
+        "segments": [
+            {**_box(rng), "breakScore": round(rng.random(), 3)} for _ in range(segments)
+        ],
+    }
+
+
+def rain(rng: random.Random, rain_rate: float = 0.2, drops: int = 0) -> dict[str, Any]:
+    """Whether the image is obscured by rain, with ``drops`` detected drops."""
+    return {
+        "rain": rng.random() < rain_rate,
+        "drops": [
+            {
+                "x": round(rng.random(), 4),
+                "y": round(rng.random(), 4),
+                "radius": round(rng.uniform(0.001, 0.02), 4),
+            }
+            for _ in range(drops)
+        ],
+    }
+
+
+def thermal(
+    rng: random.Random, width: int = 0, height: int = 0, ambient: float = 20.0
+) -> dict[str, Any]:
+    """A temperature reading and, with ``width`` and ``height``, the
+    radiometric image it was read from, in degrees Celsius per pixel."""
+    pixels = [
+        [round(rng.gauss(ambient, 3.0), 2) for _ in range(width)] for _ in range(height)
+    ]
+    hottest = max((max(row) for row in pixels), default=rng.gauss(ambient + 40, 10))
+    return {
+        "temperature": round(hottest, 2),
+        "confidence": round(rng.uniform(0.6, 1), 3),
+        "warning": None,
+        "thermalImage": {"width": width, "height": height, "celsius": pixels},
+    }
+
+
+def records(
+    rng: random.Random, count: int = 100, labels: tuple[str, ...] = ("a", "b", "c")
+) -> dict[str, Any]:
+    """``count`` labelled, scored detections: a stand-in for an analysis type
+    whose result format is not settled yet."""
+    return {
+        "records": [
+            {
+                "id": i,
+                "label": rng.choice(labels),
+                "score": round(rng.random(), 4),
+                "box": _box(rng),
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def static(rng: random.Random, value: dict[str, Any]) -> dict[str, Any]:
+    """Always ``value``."""
+    return dict(value)
+
+
+GENERATORS: dict[str, Generator] = {
+    "anonymizer": anonymizer,
+    "oil_level": oil_level,
+    "fencilla": fencilla,
+    "rain": rain,
+    "thermal": thermal,
+    "records": records,
+    "static": static,
+}
@@ -0,0 +1,111 @@
+"""Local stand-in for SARA's workflow notification endpoints.
+
+Accepts the notifier's ``PUT /api/workflow/<id>/<event>`` and
+``PUT /api/workflow/batch`` requests, undoes ``Content-Encoding: gzip`` the way
+the API does on the result and batch routes, and records each notification
+together with the number of bytes that went over the wire. Useful for
+exercising the notifier end to end without the API.
+"""
+
+import gzip
+import json
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from flask import Flask, request
+from werkzeug.serving import make_server
+
+
+@dataclass
+class ReceivedNotification:
+    workflow_id: str
+    event: str
+    content_encoding: Optional[str]
+    wire_bytes: int
+    body: Any
+
+
+class SaraMock:
+    def __init__(self) -> None:
+        self.received: list[ReceivedNotification] = []
+        self._lock = threading.Lock()
+        self.flask_app = Flask(__name__)
+        self.flask_app.add_url_rule(
+            "/api/workflow/batch", view_func=self._batch, methods=["PUT"]
+        )
+        self.flask_app.add_url_rule(
+            "/api/workflow/<workflow_id>/<event>",
+            view_func=self._notification,
+            methods=["PUT"],
+        )
+
+    def _read_body(self, compressed_allowed: bool) -> tuple[Optional[bytes], int]:
+        """Return the decoded body (None if the encoding is refused) and the
+        number of bytes received."""
+        raw = request.get_data()
+        encoding = request.headers.get("Content-Encoding")
+        if encoding is None:
+            return raw, len(raw)
+        if encoding == "gzip" and compressed_allowed:
+            return gzip.decompress(raw), len(raw)
+        return None, len(raw)
+
+    def _notification(self, workflow_id: str, event: str):
+        body, wire_bytes = self._read_body(compressed_allowed=event == "result")
+        if body is None:
+            return {"error": "Content-Encoding not supported here"}, 415
+
+        notification = ReceivedNotification(
+            workflow_id=workflow_id,
+            event=event,
+            content_encoding=request.headers.get("Content-Encoding"),
+            wire_bytes=wire_bytes,
+            body=json.loads(body) if body else None,
+        )
+        with self._lock:
+            self.received.append(notification)
+        return "", 204
+
+    def _batch(self):
+        """Record each event of a batch as if it had been sent on its own."""
+        body, wire_bytes = self._read_body(compressed_allowed=True)
+        if body is None:
+            return {"error": "Content-Encoding not supported here"}, 415
+
+        events = json.loads(body)
+        with self._lock:
+            for event in events:
+                self.received.append(
+                    ReceivedNotification(
+                        workflow_id=event["workflowId"],
+                        event=event["event"].lower(),
+                        content_encoding=request.headers.get("Content-Encoding"),
+                        wire_bytes=wire_bytes // max(len(events), 1),
+                        body={
+                            k: v
+                            for k, v in event.items()
+                            if k not in ("workflowId", "event")
+                        }
+                        or None,
+                    )
+                )
+        return {"applied": len(events), "notFound": []}
+
+    @contextmanager
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+        """Serve in a background thread; yields the base URL to use as
+        SARA_SERVER_URL."""
+        server = make_server(host, port, self.flask_app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://{host}:{server.server_port}"
+        finally:
+            server.shutdown()
+            thread.join()
+
+
+if __name__ == "__main__":
+    SaraMock().flask_app.run(host="127.0.0.1", port=8100)
@@ -0,0 +1,125 @@
+"""NDJSON lifecycle events for ``notifier batch``.
+
+Each non-blank line is one event::
+
+    {"workflowId": "<uuid>", "event": "started", "argoWorkflowName": "..."}
+    {"workflowId": "<uuid>", "event": "result", "resultJson": "{...}"}
+    {"workflowId": "<uuid>", "event": "exited", "exitStatus": "Failed",
+     "errorMessage": "..."}
+    {"workflowId": "<uuid>", "event": "progress", "percent": 42.5,
+     "stage": "..."}
+
+Events are converted to the body items of SARA's ``PUT /api/workflow/batch``,
+each with the ``idempotencyKey`` it would be sent with on its own. Of the
+progress events for a workflow in one request only the last is sent.
+"""
+
+import json
+from itertools import islice
+from typing import IO, Any, Iterable, Iterator
+from uuid import UUID
+
+from workflow_notifier.idempotency import idempotency_key
+from workflow_notifier.progress import progress_payload
+
+# The most events SARA accepts in one batch request.
+MAX_BATCH_SIZE = 1000
+
+_EVENT_TYPES = {
+    "started": "Started",
+    "result": "Result",
+    "exited": "Exited",
+    "progress": "Progress",
+}
+_EXIT_STATUSES = ("Succeeded", "Failed")
+
+
+def parse_event(line: str) -> dict[str, Any]:
+    """Validate one NDJSON event and return it in SARA's batch format."""
+    try:
+        event = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"not valid JSON: {exc}")
+    if not isinstance(event, dict):
+        raise ValueError("expected a JSON object")
+
+    try:
+        workflow_id = UUID(str(event.get("workflowId")))
+    except ValueError:
+        raise ValueError(f"invalid workflowId {event.get('workflowId')!r}")
+    event_type = _EVENT_TYPES.get(str(event.get("event")).lower())
+    if event_type is None:
+        raise ValueError(
+            f"invalid event {event.get('event')!r}; expected one of "
+            + ", ".join(_EVENT_TYPES)
+        )
+
+    parsed: dict[str, Any] = {"workflowId": str(workflow_id), "event": event_type}
+    if event_type == "Started":
+        if event.get("argoWorkflowName") is not None:
+            parsed["argoWorkflowName"] = str(event["argoWorkflowName"])
+    elif event_type == "Result":
+        result_json = event.get("resultJson")
+        if not isinstance(result_json, str):
+            raise ValueError("result events need resultJson as a string")
+        try:
+            json.loads(result_json)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"resultJson must be valid JSON: {exc}")
+        parsed["resultJson"] = result_json
+    elif event_type == "Progress":
+        percent = event.get("percent")
+        if percent is not None and (
+            isinstance(percent, bool) or not isinstance(percent, (int, float))
+        ):
+            raise ValueError("progress events need percent as a number")
+        stage = event.get("stage")
+        parsed.update(
+            progress_payload(percent, str(stage) if stage is not None else None)
+        )
+    else:
+        if event.get("exitStatus") not in _EXIT_STATUSES:
+            raise ValueError(
+                f"invalid exitStatus {event.get('exitStatus')!r}; expected one of "
+                + ", ".join(_EXIT_STATUSES)
+            )
+        parsed["exitStatus"] = event["exitStatus"]
+        if event.get("errorMessage") is not None:
+            parsed["errorMessage"] = str(event["errorMessage"])
+    if event_type != "Progress":
+        # Progress updates are not idempotent: each one replaces the last.
+        parsed["idempotencyKey"] = idempotency_key(
+            workflow_id, event_type, parsed.get("exitStatus")
+        )
+    return parsed
+
+
+def read_events(stream: IO[str]) -> Iterator[dict[str, Any]]:
+    """Parse the events in ``stream``; errors name the offending line."""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield parse_event(line)
+        except ValueError as exc:
+            raise ValueError(f"line {line_number}: {exc}")
+
+
+def chunked(events: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict]]:
+    iterator = iter(events)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def coalesce_progress(events: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Drop progress events superseded by a later one for the same workflow."""
+    last_progress = {
+        event["workflowId"]: index
+        for index, event in enumerate(events)
+        if event["event"] == "Progress"
+    }
+    return [
+        event
+        for index, event in enumerate(events)
+        if event["event"] != "Progress" or last_progress[event["workflowId"]] == index
+    ]
@@ -0,0 +1,105 @@
+"""Offloading of large results to blob storage.
+
+With ``RESULT_BLOB_OFFLOAD_MIN_BYTES`` set and the workflow's output location
+passed to ``result`` or ``run`` (``--output-blob-location``), a result of at
+least that many bytes is uploaded next to the workflow's output blob, as
+``<output blob directory>/<workflow id>.result.json``, and SARA is only sent
+its location::
+
+    {"resultBlobStorageLocation": {"storageAccount": "...",
+                                   "blobContainer": "...",
+                                   "blobName": "..."}}
+
+SARA accepts locations in the storage account and container of the workflow's
+output only, and downloads the blob when a result handler reads the result.
+
+The blob is written with a single Put Blob request, authenticated with the
+notifier's own identity for Azure Storage, so the identity needs write access
+to the output container. ``RESULT_BLOB_ENDPOINT`` points the upload at another
+Blob service, e.g. Azurite or ``mocks/blob_storage_mock.py``.
+"""
+
+import posixpath
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Optional, Union
+from urllib.parse import quote
+from uuid import UUID
+
+from workflow_notifier.config.settings import settings
+from workflow_notifier.transport import put_with_retry
+
+STORAGE_SCOPES = ["https://storage.azure.com/.default"]
+
+# Blob service REST API version sent with the upload.
+BLOB_API_VERSION = "2023-11-03"
+
+
+@dataclass(frozen=True)
+class BlobLocation:
+    storage_account: str
+    blob_container: str
+    blob_name: str
+
+    @classmethod
+    def parse(cls, value: str) -> "BlobLocation":
+        """Parse ``ACCOUNT/CONTAINER/BLOB``, the way SARA prints a location."""
+        parts = value.split("/", 2)
+        if len(parts) != 3 or not all(parts):
+            raise ValueError(f"expected ACCOUNT/CONTAINER/BLOB, got {value!r}")
+        return cls(*parts)
+
+    def __str__(self) -> str:
+        return f"{self.storage_account}/{self.blob_container}/{self.blob_name}"
+
+    def to_payload(self) -> dict[str, str]:
+        return {
+            "storageAccount": self.storage_account,
+            "blobContainer": self.blob_container,
+            "blobName": self.blob_name,
+        }
+
+
+def should_offload(size: int, output: Optional[BlobLocation]) -> bool:
+    return (
+        output is not None
+        and settings.RESULT_BLOB_OFFLOAD_MIN_BYTES is not None
+        and size >= settings.RESULT_BLOB_OFFLOAD_MIN_BYTES
+    )
+
+
+def result_location(output: BlobLocation, workflow_id: UUID) -> BlobLocation:
+    """Where the result of ``workflow_id`` is stored, given its output blob."""
+    name = posixpath.join(
+        posixpath.dirname(output.blob_name), f"{workflow_id}.result.json"
+    )
+    return BlobLocation(output.storage_account, output.blob_container, name)
+
+
+def blob_url(location: BlobLocation) -> str:
+    endpoint = settings.RESULT_BLOB_ENDPOINT.format(account=location.storage_account)
+    return f"{endpoint}/{location.blob_container}/{quote(location.blob_name)}"
+
+
+def upload_result(
+    location: BlobLocation,
+    access_token: str,
+    data: Callable[[], Union[bytes, IO[bytes]]],
+) -> None:
+    """
+    Upload a result JSON as a block blob, replacing any earlier upload.
+
+    ``data`` returns the body, called again if the request is retried. Put
+    Blob needs a Content-Length, so it is bytes or a file positioned at the
+    start of the result, never a generator.
+    """
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "x-ms-version": BLOB_API_VERSION,
+        "x-ms-blob-type": "BlockBlob",
+        "x-ms-blob-content-type": "application/json",
+    }
+
+    def request_kwargs() -> dict[str, Any]:
+        return {"data": data()}
+
+    put_with_retry(blob_url(location), headers, request_kwargs)
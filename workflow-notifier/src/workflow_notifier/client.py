@@ -0,0 +1,258 @@
+"""In-process API of the notifier.
+
+Analysis code written in Python can report its workflow's lifecycle through
+:class:`NotifierClient` (or :class:`AsyncNotifierClient` from asyncio code)
+instead of running the CLI as a subprocess for every event. The CLI commands
+are thin wrappers around the same client::
+
+    from workflow_notifier.client import NotifierClient
+
+    with NotifierClient() as client:
+        client.started(workflow_id)
+        client.result(workflow_id, json.dumps(result))
+        client.exited(workflow_id, "Succeeded")
+
+Notifications behave exactly as with the CLI: the same settings, retries,
+outbox, result schema, blob offload and metrics apply. What the process keeps
+between calls is the credential, the access tokens, which a client holds in
+memory until they are about to expire, and the client's pool of keep-alive
+connections to SARA, bounded by ``HTTP_POOL_MAXSIZE``.
+
+A client may be used for many workflows at once from any number of threads.
+Its methods raise ``ValueError`` for an invalid argument or result,
+``requests.exceptions.RequestException`` when SARA could not be notified, and
+:class:`~workflow_notifier.notifications.NotifierError` when no access token
+could be acquired; in the last case the cause is logged.
+"""
+
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from typing import IO, Any, Callable, Iterator, Optional, TypeVar, Union
+from uuid import UUID
+
+import requests
+
+from workflow_notifier.blob_offload import BlobLocation
+from workflow_notifier.config.settings import settings
+from workflow_notifier.instrumentation import (
+    command_scope,
+    current_command,
+    metric_attributes,
+    timed_stage,
+)
+from workflow_notifier.notifications import (
+    WorkflowExitStatus,
+    check_result_json,
+    check_result_stream,
+    memory_token_cache,
+    notify_exited,
+    notify_progress,
+    notify_result,
+    notify_result_stream,
+    notify_started,
+)
+from workflow_notifier.progress import (
+    claim_send_slot,
+    progress_counter,
+    progress_payload,
+)
+from workflow_notifier.token_cache import MemoryTokenCache
+from workflow_notifier.transport import new_session, use_session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class NotifierClient:
+    """
+    Reports workflow lifecycle events to SARA from the calling thread.
+
+    With ``validate_results=False`` results are sent as given, without being
+    parsed or checked against the result schema of WORKFLOW_TYPE. Requests are
+    sent with ``session`` if given, which the caller then closes, or else with
+    a session of the client's own.
+    """
+
+    def __init__(
+        self,
+        validate_results: bool = True,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        self.validate_results = validate_results
+        self._tokens = MemoryTokenCache(settings.TOKEN_CACHE_REFRESH_MARGIN_SECONDS)
+        self._owns_session = session is None
+        self._session = session if session is not None else new_session()
+
+    def __enter__(self) -> "NotifierClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the client's pooled connections, unless its session was passed
+        in; they are reopened when needed.
+        """
+        if self._owns_session:
+            self._session.close()
+
+    def started(
+        self, workflow_id: UUID, argo_workflow_name: Optional[str] = None
+    ) -> None:
+        """Notify SARA that the workflow has started executing."""
+        with self._scope("started"):
+            notify_started(workflow_id, argo_workflow_name)
+
+    def result(
+        self,
+        workflow_id: UUID,
+        result: Union[str, IO[str]],
+        output_blob_location: Optional[BlobLocation] = None,
+    ) -> None:
+        """
+        Forward the workflow's result to SARA verbatim.
+
+        ``result`` is the result JSON, or a seekable text file to stream it
+        from, e.g. one opened with ``open(path, encoding="utf-8")``. With
+        ``output_blob_location``, results above the offload threshold go to
+        blob storage instead.
+        """
+        with self._scope("result"):
+            if isinstance(result, str):
+                if self.validate_results:
+                    with timed_stage("validate"):
+                        check_result_json(result)
+                notify_result(workflow_id, result, output_blob_location)
+                return
+            if self.validate_results:
+                with timed_stage("validate"):
+                    check_result_stream(result)
+            notify_result_stream(workflow_id, result, output_blob_location)
+
+    def exited(
+        self,
+        workflow_id: UUID,
+        exit_status: Union[WorkflowExitStatus, str],
+        error_message: Optional[str] = None,
+    ) -> None:
+        """Notify SARA that the workflow has exited with the given status."""
+        with self._scope("exited"):
+            notify_exited(workflow_id, WorkflowExitStatus(exit_status), error_message)
+
+    def progress(
+        self,
+        workflow_id: UUID,
+        percent: Optional[float] = None,
+        stage: Optional[str] = None,
+    ) -> bool:
+        """
+        Report how far the workflow has come, and return whether the update
+        was sent. Like with the CLI, it is dropped if an update for the
+        workflow was sent within PROGRESS_MIN_INTERVAL_SECONDS.
+        """
+        payload = progress_payload(percent, stage)
+        with self._scope("progress"):
+            if not claim_send_slot(
+                settings.PROGRESS_STATE_DIR,
+                workflow_id,
+                settings.PROGRESS_MIN_INTERVAL_SECONDS,
+            ):
+                logger.info(
+                    f"Workflow {workflow_id} progress dropped; an update was sent "
+                    f"within the last {settings.PROGRESS_MIN_INTERVAL_SECONDS}s"
+                )
+                progress_counter.add(1, metric_attributes(outcome="coalesced"))
+                return False
+            notify_progress(workflow_id, payload)
+            return True
+
+    @contextmanager
+    def _scope(self, command: str) -> Iterator[None]:
+        """
+        Run a notification with this client's tokens and session, in the
+        scope of ``command`` unless the caller, e.g. a CLI command, has opened
+        one.
+        """
+        scope = nullcontext() if current_command() else command_scope(command)
+        with scope, memory_token_cache(self._tokens), use_session(self._session):
+            yield
+
+
+class AsyncNotifierClient:
+    """
+    A :class:`NotifierClient` for asyncio code.
+
+    Notifications are sent by a :class:`NotifierClient` on a pool of
+    ``max_concurrency`` threads, by default ``HTTP_POOL_MAXSIZE`` so that each
+    one has a pooled connection, and awaiting a method does not block the
+    event loop. The calling task's context, and so its trace, is carried over
+    to the thread.
+    """
+
+    def __init__(
+        self,
+        validate_results: bool = True,
+        max_concurrency: Optional[int] = None,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        self.client = NotifierClient(validate_results, session)
+        self._executor = ThreadPoolExecutor(
+            max_concurrency or settings.HTTP_POOL_MAXSIZE,
+            thread_name_prefix="notifier-client",
+        )
+
+    async def __aenter__(self) -> "AsyncNotifierClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Wait for notifications in flight, then close the connections."""
+        import asyncio
+
+        await asyncio.to_thread(self._executor.shutdown)
+        self.client.close()
+
+    async def started(
+        self, workflow_id: UUID, argo_workflow_name: Optional[str] = None
+    ) -> None:
+        await self._call(self.client.started, workflow_id, argo_workflow_name)
+
+    async def result(
+        self,
+        workflow_id: UUID,
+        result: Union[str, IO[str]],
+        output_blob_location: Optional[BlobLocation] = None,
+    ) -> None:
+        await self._call(self.client.result, workflow_id, result, output_blob_location)
+
+    async def exited(
+        self,
+        workflow_id: UUID,
+        exit_status: Union[WorkflowExitStatus, str],
+        error_message: Optional[str] = None,
+    ) -> None:
+        await self._call(self.client.exited, workflow_id, exit_status, error_message)
+
+    async def progress(
+        self,
+        workflow_id: UUID,
+        percent: Optional[float] = None,
+        stage: Optional[str] = None,
+    ) -> bool:
+        return await self._call(self.client.progress, workflow_id, percent, stage)
+
+    async def _call(self, method: Callable[..., T], *args: Any) -> T:
+        # Imported here so that asyncio is not loaded by the CLI.
+        import asyncio
+
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(context.run, method, *args)
+        )
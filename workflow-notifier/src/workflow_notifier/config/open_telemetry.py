@@ -1,48 +1,35 @@
 from __future__ import annotations
 
+import atexit
 import logging
-from typing import Dict
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
 from urllib.parse import urlparse
 
-from opentelemetry import metrics, trace
-from opentelemetry._logs import set_logger_provider
-from opentelemetry.exporter.otlp.proto.grpc._log_exporter import (
-    OTLPLogExporter as OTLPGrpcLogExporter,
-)
-from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import (
-    OTLPMetricExporter as OTLPGrpcMetricExporter,
-)
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
-    OTLPSpanExporter as OTLPGrpcSpanExporter,
-)
-from opentelemetry.exporter.otlp.proto.http._log_exporter import (
-    OTLPLogExporter as OTLPHttpLogExporter,
-)
-from opentelemetry.exporter.otlp.proto.http.metric_exporter import (
-    OTLPMetricExporter as OTLPHttpMetricExporter,
-)
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
-    OTLPSpanExporter as OTLPHttpSpanExporter,
-)
-from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
-from opentelemetry.sdk._logs.export import BatchLogRecordProcessor, LogRecordExporter
-from opentelemetry.sdk.metrics import Counter as SdkCounter
-from opentelemetry.sdk.metrics import Histogram as SdkHistogram
-from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics import ObservableCounter as SdkObservableCounter
-from opentelemetry.sdk.metrics.export import (
-    AggregationTemporality,
-    MetricExporter,
-    PeriodicExportingMetricReader,
-)
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
-
 from workflow_notifier.config.settings import settings
 
+if TYPE_CHECKING:
+    from opentelemetry.sdk._logs.export import LogRecordExporter
+    from opentelemetry.sdk.metrics.export import AggregationTemporality, MetricExporter
+    from opentelemetry.sdk.trace.export import SpanExporter
+
+# The OTel SDK and, in particular, the OTLP exporters are imported lazily inside
+# the functions below. Every Argo step runs the notifier as a fresh process, and
+# importing both the gRPC and the HTTP exporter stacks up front costs far more
+# than the notification itself. Only the exporters for the configured protocol
+# are ever imported.
+#
+# The SDK's own exit hooks shut the providers down one after another, each
+# waiting on exporter timeouts and retries, so a slow or unreachable collector
+# could add tens of seconds to every Argo step. The providers are created
+# without those hooks; shutdown_open_telemetry() flushes all three signals in
+# parallel instead and gives up at OTEL_SHUTDOWN_TIMEOUT_SECONDS.
+
 logger = logging.getLogger(__name__)
 
+_shutdown_hooks: List[Callable[[], object]] = []
+
 
 def _normalize_grpc_endpoint(endpoint: str) -> str:
     """
@@ -58,6 +45,11 @@ def _normalize_grpc_endpoint(endpoint: str) -> str:
 
 
 def _preferred_temporality() -> Dict[type, AggregationTemporality]:
+    from opentelemetry.sdk.metrics import Counter as SdkCounter
+    from opentelemetry.sdk.metrics import Histogram as SdkHistogram
+    from opentelemetry.sdk.metrics import ObservableCounter as SdkObservableCounter
+    from opentelemetry.sdk.metrics.export import AggregationTemporality
+
     pref = settings.OTEL_EXPORTER_OTLP_METRICS_TEMPORALITY_PREFERENCE.strip().upper()
 
     if pref == "DELTA":
@@ -92,11 +84,125 @@ def _preferred_temporality() -> Dict[type, AggregationTemporality]:
     }
 
 
+def _http_exporters(
+    endpoint: str, preferred_temporality: Dict[type, AggregationTemporality]
+) -> Tuple[SpanExporter, LogRecordExporter, MetricExporter]:
+    from opentelemetry.exporter.otlp.proto.http._log_exporter import OTLPLogExporter
+    from opentelemetry.exporter.otlp.proto.http.metric_exporter import (
+        OTLPMetricExporter,
+    )
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+    base = endpoint.rstrip("/")
+    timeout = settings.OTEL_SHUTDOWN_TIMEOUT_SECONDS
+    return (
+        OTLPSpanExporter(endpoint=f"{base}/v1/traces", timeout=timeout),
+        OTLPLogExporter(endpoint=f"{base}/v1/logs", timeout=timeout),  # type: ignore
+        OTLPMetricExporter(
+            endpoint=f"{base}/v1/metrics",
+            timeout=timeout,
+            preferred_temporality=preferred_temporality,
+        ),
+    )
+
+
+def _grpc_exporters(
+    endpoint: str, preferred_temporality: Dict[type, AggregationTemporality]
+) -> Tuple[SpanExporter, LogRecordExporter, MetricExporter]:
+    from opentelemetry.exporter.otlp.proto.grpc._log_exporter import OTLPLogExporter
+    from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import (
+        OTLPMetricExporter,
+    )
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+    grpc_endpoint = _normalize_grpc_endpoint(endpoint)
+    timeout = settings.OTEL_SHUTDOWN_TIMEOUT_SECONDS
+    return (
+        OTLPSpanExporter(endpoint=grpc_endpoint, insecure=True, timeout=timeout),
+        OTLPLogExporter(  # type: ignore
+            endpoint=grpc_endpoint, insecure=True, timeout=timeout
+        ),
+        OTLPMetricExporter(
+            endpoint=grpc_endpoint,
+            insecure=True,
+            timeout=timeout,
+            preferred_temporality=preferred_temporality,
+        ),
+    )
+
+
+def _file_exporters(
+    directory: str, preferred_temporality: Dict[type, AggregationTemporality]
+) -> Tuple[SpanExporter, LogRecordExporter, MetricExporter]:
+    from workflow_notifier.config.otlp_file import (
+        FileLogRecordExporter,
+        FileMetricExporter,
+        FileSpanExporter,
+    )
+
+    return (
+        FileSpanExporter(directory),
+        FileLogRecordExporter(directory),
+        FileMetricExporter(directory, preferred_temporality),
+    )
+
+
+def _run_with_deadline(
+    calls: Dict[str, Callable[[], object]], timeout_seconds: float
+) -> List[str]:
+    """
+    Run ``calls`` concurrently on daemon threads and wait at most
+    ``timeout_seconds`` for them. Returns the names of the calls that were
+    still running at the deadline; being daemons, they do not hold up exit.
+    """
+    threads = {
+        name: threading.Thread(target=call, name=f"otel-{name}", daemon=True)
+        for name, call in calls.items()
+    }
+    for thread in threads.values():
+        thread.start()
+    deadline = time.monotonic() + timeout_seconds
+    for thread in threads.values():
+        thread.join(max(0.0, deadline - time.monotonic()))
+    return [name for name, thread in threads.items() if thread.is_alive()]
+
+
+def shutdown_open_telemetry() -> None:
+    """Flush and shut down all signals, bounded by OTEL_SHUTDOWN_TIMEOUT_SECONDS."""
+    if not _shutdown_hooks:
+        return
+    timeout = settings.OTEL_SHUTDOWN_TIMEOUT_SECONDS
+    hooks = {hook.__qualname__: hook for hook in _shutdown_hooks}
+    _shutdown_hooks.clear()
+    unfinished = _run_with_deadline(hooks, timeout)
+    if unfinished:
+        logger.warning(
+            "Telemetry shutdown did not finish within %.1fs; dropping %s",
+            timeout,
+            ", ".join(unfinished),
+        )
+
+
 def setup_open_telemetry() -> None:
     service_name = settings.OTEL_SERVICE_NAME
     endpoint = settings.OTEL_EXPORTER_OTLP_ENDPOINT
     protocol = settings.OTEL_EXPORTER_OTLP_PROTOCOL.strip().lower()
 
+    if protocol not in ("http", "grpc", "file"):
+        raise ValueError(
+            f"Unknown OTLP protocol: {protocol!r} (expected 'grpc', 'http' or 'file')"
+        )
+
+    from opentelemetry import metrics, trace
+    from opentelemetry._logs import set_logger_provider
+    from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
+    from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
+    from opentelemetry.sdk.metrics import MeterProvider, TraceBasedExemplarFilter
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
     preferred_temporality = _preferred_temporality()
 
     resource = Resource.create({"service.name": service_name})
@@ -106,42 +212,47 @@ def setup_open_telemetry() -> None:
     metric_exporter: MetricExporter
 
     if protocol == "http":
-        base = endpoint.rstrip("/")
-        span_exporter = OTLPHttpSpanExporter(endpoint=f"{base}/v1/traces")
-        log_exporter = OTLPHttpLogExporter(endpoint=f"{base}/v1/logs")  # type: ignore
-        metric_exporter = OTLPHttpMetricExporter(
-            endpoint=f"{base}/v1/metrics",
-            preferred_temporality=preferred_temporality,
+        span_exporter, log_exporter, metric_exporter = _http_exporters(
+            endpoint, preferred_temporality
         )
-    elif protocol == "grpc":
-        grpc_endpoint = _normalize_grpc_endpoint(endpoint)
-        span_exporter = OTLPGrpcSpanExporter(endpoint=grpc_endpoint, insecure=True)
-        log_exporter = OTLPGrpcLogExporter(endpoint=grpc_endpoint, insecure=True)  # type: ignore
-        metric_exporter = OTLPGrpcMetricExporter(
-            endpoint=grpc_endpoint,
-            insecure=True,
-            preferred_temporality=preferred_temporality,
+    elif protocol == "file":
+        endpoint = settings.OTEL_FILE_EXPORT_DIRECTORY
+        span_exporter, log_exporter, metric_exporter = _file_exporters(
+            endpoint, preferred_temporality
         )
     else:
-        raise ValueError(
-            f"Unknown OTLP protocol: {protocol!r} (expected 'grpc' or 'http')"
+        span_exporter, log_exporter, metric_exporter = _grpc_exporters(
+            endpoint, preferred_temporality
         )
 
     # --- Traces ---
-    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider = TracerProvider(resource=resource, shutdown_on_exit=False)
     tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
     trace.set_tracer_provider(tracer_provider)
 
     # --- Logs ---
-    log_provider = LoggerProvider(resource=resource)
+    log_provider = LoggerProvider(resource=resource, shutdown_on_exit=False)
     log_provider.add_log_record_processor(BatchLogRecordProcessor(log_exporter))
     set_logger_provider(log_provider)
 
     # --- Metrics ---
     reader = PeriodicExportingMetricReader(metric_exporter)
-    meter_provider = MeterProvider(resource=resource, metric_readers=[reader])
+    # Measurements taken inside a sampled span keep its trace and span id as
+    # an exemplar, which links a slow data point to its trace without putting
+    # per-run ids into the metric attributes.
+    meter_provider = MeterProvider(
+        resource=resource,
+        metric_readers=[reader],
+        exemplar_filter=TraceBasedExemplarFilter(),
+        shutdown_on_exit=False,
+    )
     metrics.set_meter_provider(meter_provider)
 
+    _shutdown_hooks.extend(
+        [tracer_provider.shutdown, log_provider.shutdown, meter_provider.shutdown]
+    )
+    atexit.register(shutdown_open_telemetry)
+
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
 
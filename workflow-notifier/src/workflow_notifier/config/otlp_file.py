@@ -0,0 +1,124 @@
+"""OTLP exporters that append to local files instead of calling a collector.
+
+Used when ``OTEL_EXPORTER_OTLP_PROTOCOL=file``. Every export appends one
+OTLP/JSON export request per line to ``traces.jsonl``, ``logs.jsonl`` or
+``metrics.jsonl`` in ``OTEL_FILE_EXPORT_DIRECTORY``, the format read by the
+OpenTelemetry Collector's ``otlpjsonfile`` receiver, so the telemetry of many
+short-lived notifier processes can be shipped later by one collector.
+
+Each export is written with a single ``write`` on a file opened with
+``O_APPEND``, so concurrent notifier processes do not interleave lines.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+from typing import TYPE_CHECKING, Any, Sequence
+
+from google.protobuf.json_format import MessageToDict
+from opentelemetry.exporter.otlp.proto.common._log_encoder import encode_logs
+from opentelemetry.exporter.otlp.proto.common.metrics_encoder import encode_metrics
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk._logs.export import LogRecordExporter, LogRecordExportResult
+from opentelemetry.sdk.metrics.export import MetricExporter, MetricExportResult
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+if TYPE_CHECKING:
+    from google.protobuf.message import Message
+    from opentelemetry.sdk._logs import ReadableLogRecord
+    from opentelemetry.sdk.metrics.export import AggregationTemporality, MetricsData
+    from opentelemetry.sdk.trace import ReadableSpan
+
+# OTLP/JSON encodes these ids as hex strings rather than protobuf's base64.
+_HEX_ID_FIELDS = frozenset({"traceId", "spanId", "parentSpanId"})
+
+
+def _hex_ids(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: (
+                base64.b64decode(item).hex()
+                if key in _HEX_ID_FIELDS and isinstance(item, str)
+                else _hex_ids(item)
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_hex_ids(item) for item in value]
+    return value
+
+
+class _JsonLinesFile:
+    def __init__(self, directory: str, name: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, name)
+
+    def append(self, message: Message) -> None:
+        document = _hex_ids(MessageToDict(message, use_integers_for_enums=True))
+        line = (json.dumps(document, separators=(",", ":")) + "\n").encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+class FileSpanExporter(SpanExporter):
+    def __init__(self, directory: str) -> None:
+        self._file = _JsonLinesFile(directory, "traces.jsonl")
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        try:
+            self._file.append(encode_spans(spans))
+        except OSError:
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+class FileLogRecordExporter(LogRecordExporter):
+    def __init__(self, directory: str) -> None:
+        self._file = _JsonLinesFile(directory, "logs.jsonl")
+
+    def export(self, batch: Sequence[ReadableLogRecord]) -> LogRecordExportResult:
+        try:
+            self._file.append(encode_logs(batch))
+        except OSError:
+            return LogRecordExportResult.FAILURE
+        return LogRecordExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+class FileMetricExporter(MetricExporter):
+    def __init__(
+        self, directory: str, preferred_temporality: dict[type, AggregationTemporality]
+    ) -> None:
+        super().__init__(preferred_temporality=preferred_temporality)
+        self._file = _JsonLinesFile(directory, "metrics.jsonl")
+
+    def export(
+        self, metrics_data: MetricsData, timeout_millis: float = 10_000, **kwargs: Any
+    ) -> MetricExportResult:
+        try:
+            self._file.append(encode_metrics(metrics_data))
+        except OSError:
+            return MetricExportResult.FAILURE
+        return MetricExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: float = 10_000) -> bool:
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000, **kwargs: Any) -> None:
+        pass
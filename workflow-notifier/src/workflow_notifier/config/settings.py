@@ -26,9 +26,93 @@ class Settings(BaseSettings):
     # (e.g. ALLOWED_AUTH_METHODS=WorkloadIdentity,ClientSecret).
     ALLOWED_AUTH_METHODS: str = Field(default="WorkloadIdentity")
 
+    # Optional path of a file-backed access-token cache shared between notifier
+    # invocations, e.g. on a volume mounted into every step of a workflow pod.
+    # Unset disables the cache and every invocation acquires its own token.
+    TOKEN_CACHE_PATH: Optional[str] = Field(default=None)
+    # Cached tokens are refreshed when they expire within this many seconds.
+    TOKEN_CACHE_REFRESH_MARGIN_SECONDS: int = Field(default=300)
+
+    # Result bodies of at least RESULT_GZIP_MIN_BYTES are sent with
+    # Content-Encoding: gzip. SARA decompresses them on the /result route.
+    RESULT_GZIP_ENABLED: bool = Field(default=True)
+    RESULT_GZIP_MIN_BYTES: int = Field(default=64 * 1024)
+
+    # Results of at least RESULT_BLOB_OFFLOAD_MIN_BYTES are uploaded next to
+    # the workflow's output blob (`--output-blob-location`) and SARA is sent
+    # their location instead; unset sends every result inline. The upload goes
+    # to RESULT_BLOB_ENDPOINT with {account} replaced by the storage account,
+    # e.g. http://127.0.0.1:10000/{account} for Azurite.
+    RESULT_BLOB_OFFLOAD_MIN_BYTES: Optional[int] = Field(default=None)
+    RESULT_BLOB_ENDPOINT: str = Field(default="https://{account}.blob.core.windows.net")
+
+    # Results of `result` and `run` are validated against the schema for
+    # WORKFLOW_TYPE shipped with the package (schemas/<type>.schema.json), or
+    # the same file in RESULT_SCHEMA_DIR, which takes precedence. Compiled
+    # schemas are cached in RESULT_SCHEMA_CACHE_DIR across invocations.
+    RESULT_SCHEMA_VALIDATION: bool = Field(default=True)
+    RESULT_SCHEMA_DIR: Optional[str] = Field(default=None)
+    RESULT_SCHEMA_CACHE_DIR: str = Field(default="/tmp/workflow-notifier-schemas")
+
+    # HTTP requests to SARA. Failed PUTs (connection errors, timeouts, 429 and
+    # 502-504) are retried up to HTTP_MAX_RETRIES times with exponential
+    # backoff and full jitter; Retry-After is honoured up to the backoff max.
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = Field(default=5.0)
+    HTTP_READ_TIMEOUT_SECONDS: float = Field(default=30.0)
+    HTTP_MAX_RETRIES: int = Field(default=4)
+    HTTP_RETRY_BACKOFF_BASE_SECONDS: float = Field(default=0.5)
+    HTTP_RETRY_BACKOFF_MAX_SECONDS: float = Field(default=30.0)
+    HTTP_POOL_MAXSIZE: int = Field(default=10)
+
+    # Optional path of a SQLite outbox. When set, notifications that fail with
+    # a transient error are stored there (and the step succeeds) until
+    # `notifier flush` delivers them.
+    OUTBOX_PATH: Optional[str] = Field(default=None)
+    OUTBOX_FLUSH_BATCH_SIZE: int = Field(default=100)
+
+    # Events per request sent by `notifier batch` (SARA accepts at most 1000).
+    BATCH_CHUNK_SIZE: int = Field(default=100)
+
+    # `notifier serve`: Unix socket to listen on, number of concurrent
+    # deliveries, and how many accepted events may wait for delivery before
+    # clients are held back. Lines longer than SERVE_MAX_EVENT_BYTES are
+    # rejected.
+    SERVE_SOCKET_PATH: str = Field(default="/tmp/workflow-notifier.sock")
+    SERVE_CONCURRENCY: int = Field(default=8)
+    SERVE_QUEUE_SIZE: int = Field(default=1000)
+    SERVE_MAX_EVENT_BYTES: int = Field(default=16 * 1024 * 1024)
+
+    # `notifier progress` sends SARA at most one update per workflow every
+    # PROGRESS_MIN_INTERVAL_SECONDS and drops the ones in between. The time of
+    # the last update is shared between invocations through a file per
+    # workflow in PROGRESS_STATE_DIR; `notifier serve` keeps it in memory.
+    PROGRESS_MIN_INTERVAL_SECONDS: float = Field(default=30.0)
+    PROGRESS_STATE_DIR: str = Field(default="/tmp/workflow-notifier-progress")
+
+    # Kind of workflow the notifier reports for, i.e. SARA's workflow type
+    # (e.g. "cloe"). Added to every metric, so it must not be unique per run,
+    # and selects the schema results are validated against.
+    WORKFLOW_TYPE: str = Field(default="unspecified")
+
+    # Optional path of a redacted JSONL log of every request sent to SARA
+    # (sizes, hashes, status and latency; never payloads), for replaying the
+    # traffic shape locally with mocks/replay.py.
+    EVENT_LOG_PATH: Optional[str] = Field(default=None)
+
+    # Log a per-phase timing breakdown of every command (`notifier --profile`),
+    # and with NOTIFIER_PROFILE_OUTPUT also write cProfile stats to that path.
+    NOTIFIER_PROFILE: bool = Field(default=False)
+    NOTIFIER_PROFILE_OUTPUT: Optional[str] = Field(default=None)
+
     OTEL_SERVICE_NAME: str = Field(default="workflow-notifier")
     OTEL_EXPORTER_OTLP_ENDPOINT: str = Field(default="http://localhost:4317")
+    # "grpc", "http", or "file" to append OTLP/JSON to files in
+    # OTEL_FILE_EXPORT_DIRECTORY for a collector to ship later.
     OTEL_EXPORTER_OTLP_PROTOCOL: str = Field(default="grpc")
+    OTEL_FILE_EXPORT_DIRECTORY: str = Field(default="/tmp/workflow-notifier-otel")
+    # Upper bound on how long flushing telemetry may delay process exit, for
+    # all three signals together. It is also the exporters' request timeout.
+    OTEL_SHUTDOWN_TIMEOUT_SECONDS: float = Field(default=2.0)
 
     OTEL_EXPORTER_OTLP_METRICS_TEMPORALITY_PREFERENCE: str = Field(default="DELTA")
 
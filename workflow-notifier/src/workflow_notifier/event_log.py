@@ -0,0 +1,110 @@
+"""Compact, redacted log of the requests the notifier sends to SARA.
+
+With ``EVENT_LOG_PATH`` set, every PUT to SARA appends one JSON line::
+
+    {"ts": 1760000000.123, "command": "result", "event": "result",
+     "path": "/api/workflow/<id>/result", "workflowId": "<id>",
+     "workflowType": "cloe", "payloadBytes": 1834, "payloadSha256": "...",
+     "compressed": false, "status": 204, "outcome": "success",
+     "latencyMs": 41.7}
+
+Bodies are recorded by their size and SHA-256 only, before compression, so
+results, error messages and workflow names never reach the log, and neither
+do tokens or the SARA host. ``mocks/replay.py`` re-drives a log against a
+local SARA.
+
+Lines are written with a single ``write`` on a file opened with ``O_APPEND``,
+so concurrent notifier processes can share one log. Failing to write the log
+is reported and never fails the notification.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+from workflow_notifier.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_WORKFLOW_PATH = re.compile(r"/api/workflow/([0-9a-fA-F-]{36})/")
+
+
+class PayloadDigest:
+    """Size and SHA-256 of a request body, fed as it is produced."""
+
+    def __init__(self) -> None:
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def update(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        self._hash.update(chunk)
+
+    def wrap(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass ``chunks`` through, digesting them. Starts over, so a retried
+        request is digested once."""
+        self.size = 0
+        self._hash = hashlib.sha256()
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def enabled() -> bool:
+    return settings.EVENT_LOG_PATH is not None
+
+
+def record_request(
+    *,
+    command: str,
+    event: str,
+    url: str,
+    started_at: float,
+    seconds: float,
+    status: Optional[int],
+    outcome: str,
+    digest: Optional[PayloadDigest],
+    compressed: bool,
+) -> None:
+    """Append one request to the event log."""
+    path = urlsplit(url).path
+    match = _WORKFLOW_PATH.search(path)
+    entry = {
+        "ts": round(started_at, 3),
+        "command": command,
+        "event": event,
+        "path": path,
+        "workflowId": match.group(1) if match else None,
+        "workflowType": settings.WORKFLOW_TYPE,
+        "payloadBytes": digest.size if digest is not None else 0,
+        "payloadSha256": digest.hexdigest() if digest is not None else None,
+        "compressed": compressed,
+        "status": status,
+        "outcome": outcome,
+        "latencyMs": round(seconds * 1000, 1),
+    }
+    line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+    try:
+        fd = os.open(
+            settings.EVENT_LOG_PATH, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600
+        )
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError as exc:
+        logger.warning(f"Could not write event log {settings.EVENT_LOG_PATH}: {exc}")
+
+
+def read_event_log(path: str) -> list[dict]:
+    """Entries of an event log in the order they were started."""
+    with open(path, encoding="utf-8") as file:
+        entries = [json.loads(line) for line in file if line.strip()]
+    return sorted(entries, key=lambda entry: entry["ts"])
@@ -0,0 +1,22 @@
+"""Deterministic idempotency keys for lifecycle notifications.
+
+Every notification carries a key derived from the workflow id, the event and,
+for ``exited``, the exit status: in the ``Idempotency-Key`` header, or as
+``idempotencyKey`` of a batch item. An Argo retry of the notifier step, a
+retried request or an outbox flush of an event that did reach SARA therefore
+sends the same key again, and SARA applies a repeated ``exited`` only once
+instead of re-running the workflow's result handlers and the next steps of its
+analysis. SARA forgets the key when it retries the workflow itself.
+"""
+
+from typing import Optional
+from uuid import UUID, uuid5
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+
+def idempotency_key(
+    workflow_id: UUID, event: str, exit_status: Optional[str] = None
+) -> str:
+    name = event.lower() if exit_status is None else f"{event.lower()}:{exit_status}"
+    return str(uuid5(workflow_id, name))
@@ -0,0 +1,133 @@
+"""Metrics and spans of the notifier commands.
+
+Each command runs inside :func:`command_scope`, and the stages it waits on
+(token, validation, HTTP request) are wrapped in
+:func:`timed_stage`. Durations are recorded on the
+``notifier_stage_duration`` histogram with the command and stage as
+attributes, and logged at debug level.
+
+Commands and stages are also spans. A command's span continues the trace
+passed in by the Argo template in the ``TRACEPARENT`` (and ``TRACESTATE``)
+environment variables, so the notifier calls of a workflow appear in the trace
+of the analysis run that triggered it.
+
+Every data point carries the same bounded set of attributes from
+:func:`metric_attributes`: the command and the workflow type. Workflow ids and
+other per-run values are never used as attributes, since each distinct value
+starts a new time series in the metrics backend; a measurement taken inside a
+sampled span carries its trace id as an exemplar instead.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from opentelemetry import metrics, trace
+from opentelemetry.context import Context
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+from opentelemetry.util.types import AttributeValue
+
+from workflow_notifier.config.settings import settings
+from workflow_notifier.profiling import record_phase
+
+logger = logging.getLogger(__name__)
+
+# Seconds, from a cached token or a warm connection up to a retried request.
+_LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+# Bytes, from a few hundred bytes up to the largest results SARA accepts.
+_SIZE_BUCKETS = [2**exponent for exponent in range(8, 29, 2)]
+
+tracer = trace.get_tracer("workflow-notifier")
+meter = metrics.get_meter("workflow-notifier")
+stage_duration = meter.create_histogram(
+    "notifier_stage_duration",
+    unit="s",
+    description="Time spent in each stage of a notifier command",
+    explicit_bucket_boundaries_advisory=_LATENCY_BUCKETS,
+)
+notification_duration = meter.create_histogram(
+    "notification_duration",
+    unit="s",
+    description="Round trip of a notification to SARA, including retries",
+    explicit_bucket_boundaries_advisory=_LATENCY_BUCKETS,
+)
+token_duration = meter.create_histogram(
+    "notifier_token_duration",
+    unit="s",
+    description="Time spent acquiring an access token for SARA",
+    explicit_bucket_boundaries_advisory=_LATENCY_BUCKETS,
+)
+result_size = meter.create_histogram(
+    "notification_result_size",
+    unit="By",
+    description="Size of the result JSON sent to SARA, before compression",
+    explicit_bucket_boundaries_advisory=_SIZE_BUCKETS,
+)
+
+_current_command: ContextVar[str] = ContextVar("notifier_command", default="")
+
+
+def current_command() -> str:
+    """The command running in this context, or "" outside of one."""
+    return _current_command.get()
+
+
+def metric_attributes(**extra: AttributeValue) -> dict[str, AttributeValue]:
+    """Attributes for a data point recorded by the current command."""
+    return {
+        "command": _current_command.get(),
+        "workflow_type": settings.WORKFLOW_TYPE,
+        **extra,
+    }
+
+
+def _record_stage(stage: str, start: float) -> None:
+    elapsed = time.perf_counter() - start
+    command = _current_command.get()
+    stage_duration.record(elapsed, metric_attributes(stage=stage))
+    record_phase(stage, elapsed)
+    logger.debug(f"{command or 'notifier'}: {stage} took {elapsed * 1000:.1f} ms")
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        with tracer.start_as_current_span(stage):
+            yield
+    finally:
+        _record_stage(stage, start)
+
+
+def _parent_context() -> Optional[Context]:
+    """The trace context passed in by the Argo template, unless a span is
+    already active."""
+    traceparent = os.environ.get("TRACEPARENT")
+    if not traceparent or trace.get_current_span().get_span_context().is_valid:
+        return None
+    carrier = {"traceparent": traceparent}
+    tracestate = os.environ.get("TRACESTATE")
+    if tracestate:
+        carrier["tracestate"] = tracestate
+    return TraceContextTextMapPropagator().extract(carrier)
+
+
+@contextmanager
+def command_scope(command: str) -> Iterator[None]:
+    """Run ``command`` in its own span, attribute the stages timed inside to
+    it, and time the total."""
+    token = _current_command.set(command)
+    start = time.perf_counter()
+    try:
+        with tracer.start_as_current_span(
+            f"notifier {command}",
+            context=_parent_context(),
+            attributes={"workflow.type": settings.WORKFLOW_TYPE},
+        ):
+            yield
+    finally:
+        _record_stage("total", start)
+        _current_command.reset(token)
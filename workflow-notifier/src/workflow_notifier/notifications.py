@@ -0,0 +1,649 @@
+"""Sending notifications to SARA, shared by the CLI and the in-process client.
+
+This module acquires the access token, delivers each notification (through the
+outbox when one is configured), checks results against the result schema and
+offloads large results to blob storage. It does not depend on the CLI: failures
+are raised as ``requests.exceptions.RequestException``, ``ValueError`` or
+:class:`NotifierError`, and the CLI commands in :mod:`workflow_notifier.notifier`
+turn them into exit codes.
+"""
+
+import contextvars
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from enum import Enum
+from functools import lru_cache
+from typing import IO, TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+from uuid import UUID
+
+import requests
+from opentelemetry import metrics, trace
+
+from workflow_notifier import blob_offload, event_log
+from workflow_notifier.blob_offload import BlobLocation
+from workflow_notifier.config.settings import settings
+from workflow_notifier.idempotency import IDEMPOTENCY_KEY_HEADER, idempotency_key
+from workflow_notifier.instrumentation import (
+    current_command,
+    metric_attributes,
+    notification_duration,
+    result_size,
+    timed_stage,
+    token_duration,
+)
+from workflow_notifier.outbox import Outbox, OutboxEntry
+from workflow_notifier.progress import progress_counter, release_send_slot
+from workflow_notifier.result_payload import (
+    GZIP_LEVEL,
+    gzip_chunks,
+    iter_result_body,
+    stream_size,
+    validate_json_stream,
+)
+from workflow_notifier.result_schema import ResultSchemaError, current_result_schema
+from workflow_notifier.token_cache import (
+    CachedToken,
+    MemoryTokenCache,
+    TokenCache,
+    cache_key,
+)
+from workflow_notifier.transport import is_transient_error, put_with_retry
+
+if TYPE_CHECKING:
+    from azure.core.credentials import TokenCredential
+
+logger = logging.getLogger(__name__)
+
+# Default path where the azure-workload-identity mutating webhook projects the
+# service-account token in the pod.
+_DEFAULT_FEDERATED_TOKEN_FILE = "/var/run/secrets/azure/tokens/azure-identity-token"
+
+meter = metrics.get_meter("workflow-notifier")
+workflow_counter = meter.create_counter(
+    "workflow_execution_count",
+    description="Workflow execution status",
+)
+
+
+class NotifierError(Exception):
+    """No access token could be acquired to send a notification; the cause is
+    logged."""
+
+
+class WorkflowExitStatus(str, Enum):
+    Succeeded = "Succeeded"
+    Failed = "Failed"
+
+
+@lru_cache(maxsize=1)
+def _get_credential() -> "TokenCredential":
+    """
+    Build a TokenCredential.
+
+    The set of credential types to try is configured via
+    ``settings.allowed_auth_methods``, an ordered list whose entries may be
+    ``"WorkloadIdentity"`` and/or ``"ClientSecret"`` (case-insensitive). When
+    more than one method is configured, the order determines the order inside
+    the resulting ``ChainedTokenCredential``.
+
+    In cloud (AKS with Azure Workload Identity), the standard ``AZURE_CLIENT_ID``,
+    ``AZURE_TENANT_ID``, ``AZURE_FEDERATED_TOKEN_FILE`` and ``AZURE_AUTHORITY_HOST``
+    environment variables are injected by the azure-workload-identity mutating
+    webhook, and ``WorkloadIdentityCredential`` exchanges the projected service
+    account token for an Entra ID access token.
+
+    For local development, include ``"ClientSecret"`` in
+    ``ALLOWED_AUTH_METHODS`` and provide ``NOTIFIER_CLIENT_SECRET``.
+
+    ``azure.identity`` is imported here rather than at module level: it is one
+    of the most expensive imports of the CLI and is only needed once a token
+    actually has to be acquired.
+    """
+    token_file_path = os.environ.get(
+        "AZURE_FEDERATED_TOKEN_FILE", _DEFAULT_FEDERATED_TOKEN_FILE
+    )
+    client_secret = settings.NOTIFIER_CLIENT_SECRET
+
+    credentials: list[TokenCredential] = []
+    activated: list[str] = []
+
+    allowed_methods = settings.allowed_auth_methods or ["WorkloadIdentity"]
+
+    for method in allowed_methods:
+        normalized = method.strip().lower()
+        if normalized == "workloadidentity":
+            if os.path.exists(token_file_path):
+                from azure.identity import WorkloadIdentityCredential
+
+                credentials.append(
+                    WorkloadIdentityCredential(
+                        tenant_id=settings.TENANT_ID,
+                        client_id=settings.NOTIFIER_CLIENT_ID,
+                        token_file_path=token_file_path,
+                    )
+                )
+                activated.append("WorkloadIdentityCredential")
+            else:
+                logger.warning(
+                    "ALLOWED_AUTH_METHODS includes 'WorkloadIdentity' but no federated "
+                    f"token file found at '{token_file_path}'; skipping "
+                    "WorkloadIdentityCredential."
+                )
+        elif normalized == "clientsecret":
+            if client_secret and not client_secret.lower().startswith("fill in"):
+                from azure.identity import ClientSecretCredential
+
+                credentials.append(
+                    ClientSecretCredential(
+                        tenant_id=settings.TENANT_ID,
+                        client_id=settings.NOTIFIER_CLIENT_ID,
+                        client_secret=client_secret,
+                    )
+                )
+                activated.append("ClientSecretCredential")
+            else:
+                logger.warning(
+                    "ALLOWED_AUTH_METHODS includes 'ClientSecret' but "
+                    "NOTIFIER_CLIENT_SECRET is missing/placeholder; skipping "
+                    "ClientSecretCredential."
+                )
+        else:
+            logger.warning(
+                f"Unknown auth method '{method}' in ALLOWED_AUTH_METHODS; "
+                "expected 'WorkloadIdentity' or 'ClientSecret'."
+            )
+
+    if not credentials:
+        raise RuntimeError(
+            "No usable Azure credential could be constructed from "
+            "ALLOWED_AUTH_METHODS. Configure at least one of 'WorkloadIdentity' "
+            "(with a federated token file present) or 'ClientSecret' (with "
+            "NOTIFIER_CLIENT_SECRET set)."
+        )
+
+    if len(credentials) == 1:
+        logger.info(f"Using {activated[0]} only")
+        return credentials[0]
+
+    from azure.identity import ChainedTokenCredential
+
+    logger.info("Using ChainedTokenCredential: " + " -> ".join(activated))
+    return ChainedTokenCredential(*credentials)
+
+
+def _acquire_token(scopes: list[str]) -> CachedToken:
+    with timed_stage("credential"):
+        credential = _get_credential()
+    with timed_stage("get_token"):
+        token = credential.get_token(*scopes)
+    return CachedToken(token.token, token.expires_on)
+
+
+# In-memory token cache of the NotifierClient sending the current notification.
+_memory_token_cache: contextvars.ContextVar[Optional[MemoryTokenCache]] = (
+    contextvars.ContextVar("memory_token_cache", default=None)
+)
+
+
+@contextmanager
+def memory_token_cache(cache: MemoryTokenCache) -> Iterator[None]:
+    """Keep the tokens acquired inside the block in ``cache``."""
+    token = _memory_token_cache.set(cache)
+    try:
+        yield
+    finally:
+        _memory_token_cache.reset(token)
+
+
+def get_access_token(scopes: Optional[list[str]] = None) -> str:
+    """
+    Acquire an access token for the SARA API, or for ``scopes``, using
+    azure-identity.
+
+    When ``settings.TOKEN_CACHE_PATH`` is set, a token cached by an earlier
+    invocation is reused as long as it is not about to expire. Inside
+    :func:`memory_token_cache`, tokens are also kept in memory. Raises
+    :class:`NotifierError` if no token could be acquired.
+    """
+    scopes = scopes or settings.scopes
+    start = time.perf_counter()
+    source = "cache"
+    outcome = "failure"
+
+    def acquire() -> CachedToken:
+        nonlocal source
+        source = "credential"
+        return _acquire_token(scopes)
+
+    key = cache_key(
+        settings.TENANT_ID,
+        settings.NOTIFIER_CLIENT_ID,
+        settings.ALLOWED_AUTH_METHODS,
+        *scopes,
+    )
+
+    def acquire_shared() -> CachedToken:
+        if not settings.TOKEN_CACHE_PATH:
+            return acquire()
+        cache = TokenCache(
+            settings.TOKEN_CACHE_PATH,
+            settings.TOKEN_CACHE_REFRESH_MARGIN_SECONDS,
+        )
+        return cache.get_or_acquire(key, acquire)
+
+    try:
+        memory = _memory_token_cache.get()
+        if memory is not None:
+            token = memory.get_or_acquire(key, acquire_shared).token
+        else:
+            token = acquire_shared().token
+        outcome = "success"
+        return token
+    except Exception as e:
+        logger.error(f"Error acquiring token: {e}")
+        raise NotifierError(f"could not acquire an access token: {e}") from e
+    finally:
+        token_duration.record(
+            time.perf_counter() - start,
+            metric_attributes(source=source, outcome=outcome),
+        )
+
+
+# Token being acquired by access_token_prefetched, consumed by the next
+# request.
+_prefetched_token: "Optional[Future[str]]" = None
+
+
+@contextmanager
+def access_token_prefetched() -> Iterator[None]:
+    """
+    Acquire the access token on a background thread while the block runs.
+
+    The exchange with Entra ID is network-bound, so it can overlap with reading
+    and validating the payload or flushing metrics; the first request in the
+    block then only waits for whatever is left of it. The thread is a daemon so
+    that a command failing validation exits without waiting for the token.
+    """
+    global _prefetched_token
+    future: Future[str] = Future()
+
+    def fetch() -> None:
+        try:
+            with timed_stage("token"):
+                future.set_result(get_access_token())
+        except Exception as exc:
+            future.set_exception(exc)
+
+    context = contextvars.copy_context()
+    threading.Thread(
+        target=context.run, args=(fetch,), name="token-prefetch", daemon=True
+    ).start()
+    _prefetched_token = future
+    try:
+        yield
+    finally:
+        _prefetched_token = None
+
+
+def _take_access_token() -> str:
+    global _prefetched_token
+    future, _prefetched_token = _prefetched_token, None
+    with timed_stage("token_wait"):
+        return future.result() if future is not None else get_access_token()
+
+
+def send_authenticated_put(
+    url: str,
+    event: str,
+    payload: Optional[dict] = None,
+    body: Optional[Callable[[], Iterable[bytes]]] = None,
+    compress: bool = False,
+    idempotency_key: Optional[str] = None,
+) -> requests.Response:
+    """
+    Send an authenticated PUT request and raise on non-2xx responses.
+
+    Either ``payload`` is serialized as the JSON body, or ``body`` returns an
+    iterator over an already-encoded JSON body that is streamed with chunked
+    transfer encoding; it is called again if the request is retried. With
+    ``compress`` the body is sent with ``Content-Encoding: gzip``. ``event``
+    names the notification on the round-trip histogram and in the event log.
+    ``idempotency_key`` is sent in the ``Idempotency-Key`` header.
+    """
+    access_token = _take_access_token()
+    headers = {"Authorization": f"Bearer {access_token}"}
+    if idempotency_key is not None:
+        headers[IDEMPOTENCY_KEY_HEADER] = idempotency_key
+    # The uncompressed body is digested for the event log as it is sent.
+    digest = event_log.PayloadDigest() if event_log.enabled() else None
+    if body is None and not compress:
+        logger.info(f"Sending PUT request to {url} with payload: {payload}")
+        if digest is not None and payload is not None:
+            digest.update(json.dumps(payload).encode("utf-8"))
+        return _timed_put(url, event, headers, lambda: {"json": payload}, digest)
+
+    if body is not None:
+        logger.info(f"Sending PUT request to {url} with streamed payload")
+        make_body = body
+
+        def request_kwargs() -> dict:
+            chunks = make_body() if digest is None else digest.wrap(make_body())
+            return {"data": gzip_chunks(chunks) if compress else chunks}
+
+    else:
+        logger.info(f"Sending PUT request to {url} with compressed payload")
+        raw = json.dumps(payload).encode("utf-8")
+        if digest is not None:
+            digest.update(raw)
+        data = gzip.compress(raw, compresslevel=GZIP_LEVEL)
+
+        def request_kwargs() -> dict:
+            return {"data": data}
+
+    headers["Content-Type"] = "application/json"
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return _timed_put(url, event, headers, request_kwargs, digest, compress)
+
+
+def _timed_put(
+    url: str,
+    event: str,
+    headers: dict,
+    request_kwargs: Callable[[], dict],
+    digest: Optional[event_log.PayloadDigest] = None,
+    compressed: bool = False,
+) -> requests.Response:
+    started_at = time.time()
+    start = time.perf_counter()
+    outcome = "failure"
+    status = None
+    try:
+        with timed_stage("request"):
+            response = put_with_retry(url, headers, request_kwargs)
+        outcome = "success"
+        status = response.status_code
+        return response
+    except requests.exceptions.RequestException as exc:
+        if exc.response is not None:
+            status = exc.response.status_code
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        notification_duration.record(
+            elapsed, metric_attributes(event=event, outcome=outcome)
+        )
+        if event_log.enabled():
+            event_log.record_request(
+                command=current_command(),
+                event=event,
+                url=url,
+                started_at=started_at,
+                seconds=elapsed,
+                status=status,
+                outcome=outcome,
+                digest=digest,
+                compressed=compressed,
+            )
+
+
+def get_outbox() -> Optional[Outbox]:
+    return Outbox(settings.OUTBOX_PATH) if settings.OUTBOX_PATH else None
+
+
+def _deliver(
+    workflow_id: UUID,
+    event: str,
+    payload: Optional[dict] = None,
+    body: Optional[Callable[[], Iterable[bytes]]] = None,
+    compress: bool = False,
+) -> None:
+    """
+    Send a notification for ``workflow_id``, or queue it in the outbox.
+
+    With an outbox configured, a notification is queued instead of sent while
+    earlier notifications for the same workflow are still queued, and when
+    sending fails with a transient error. Other failures raise as before.
+    """
+    trace.get_current_span().set_attribute("workflow.id", str(workflow_id))
+    outbox = get_outbox()
+    if outbox is not None and outbox.has_pending(str(workflow_id)):
+        logger.warning(
+            f"Workflow {workflow_id} has queued notifications; queueing {event}"
+        )
+        outbox.enqueue(str(workflow_id), event, _outbox_body(payload, body))
+        return
+
+    try:
+        send_authenticated_put(
+            _workflow_url(workflow_id, event),
+            event,
+            payload=payload,
+            body=body,
+            compress=compress,
+            idempotency_key=_event_key(workflow_id, event, payload),
+        )
+    except requests.exceptions.RequestException as exc:
+        if outbox is None or not is_transient_error(exc):
+            raise
+        logger.error(
+            f"Could not deliver {event} for workflow {workflow_id} ({exc}); "
+            "queued in outbox"
+        )
+        outbox.enqueue(str(workflow_id), event, _outbox_body(payload, body))
+
+
+def _outbox_body(
+    payload: Optional[dict], body: Optional[Callable[[], Iterable[bytes]]]
+) -> Optional[str]:
+    if body is not None:
+        return b"".join(body()).decode("utf-8")
+    return json.dumps(payload) if payload is not None else None
+
+
+def _event_key(workflow_id: UUID, event: str, payload: Optional[dict]) -> str:
+    exit_status = payload.get("exitStatus") if payload is not None else None
+    return idempotency_key(workflow_id, event, exit_status)
+
+
+def send_outbox_entry(entry: OutboxEntry) -> None:
+    workflow_id = UUID(entry.workflow_id)
+    url = _workflow_url(workflow_id, entry.event)
+    if entry.body is None:
+        send_authenticated_put(
+            url, entry.event, idempotency_key=_event_key(workflow_id, entry.event, None)
+        )
+        return
+    encoded = entry.body.encode("utf-8")
+    # Only exited keys depend on the body, and exited bodies are small.
+    payload = json.loads(encoded) if entry.event == "exited" else None
+    send_authenticated_put(
+        url,
+        entry.event,
+        body=lambda: iter([encoded]),
+        compress=entry.event == "result" and should_compress(len(encoded)),
+        idempotency_key=_event_key(workflow_id, entry.event, payload),
+    )
+
+
+def should_compress(size: int) -> bool:
+    return settings.RESULT_GZIP_ENABLED and size >= settings.RESULT_GZIP_MIN_BYTES
+
+
+def _workflow_url(workflow_id: UUID, suffix: str) -> str:
+    return f"{settings.workflow_base_url}/{workflow_id}/{suffix}"
+
+
+def check_result_json(value: str) -> None:
+    """Raise ``ValueError`` unless ``value`` is JSON matching the result schema
+    of WORKFLOW_TYPE, if there is one."""
+    schema = current_result_schema()
+    try:
+        if schema is None:
+            json.loads(value)
+        else:
+            schema.validate_json(value)
+    except ResultSchemaError as exc:
+        raise _schema_mismatch(exc)
+    except (json.JSONDecodeError, TypeError) as exc:
+        raise ValueError(f"result must be valid JSON: {exc}")
+
+
+def check_result_stream(stream: IO[str]) -> None:
+    """Like ``check_result_json`` for a result file, which is rewound
+    afterwards."""
+    schema = current_result_schema()
+    try:
+        if schema is None:
+            validate_json_stream(stream)
+        else:
+            schema.validate_stream(stream)
+    except ResultSchemaError as exc:
+        raise _schema_mismatch(exc)
+    except ValueError as exc:
+        raise ValueError(f"result must be valid JSON: {exc}")
+
+
+def _schema_mismatch(exc: ResultSchemaError) -> ValueError:
+    return ValueError(
+        f"result does not match the {settings.WORKFLOW_TYPE} schema: {exc}"
+    )
+
+
+def notify_started(workflow_id: UUID, argo_workflow_name: Optional[str]) -> None:
+    logger.info(f"Workflow {workflow_id} reporting started")
+    payload = (
+        {"argoWorkflowName": argo_workflow_name}
+        if argo_workflow_name is not None
+        else None
+    )
+    _deliver(workflow_id, "started", payload=payload)
+
+
+def notify_result(
+    workflow_id: UUID,
+    result_json: str,
+    output_location: Optional[BlobLocation] = None,
+) -> None:
+    logger.info(f"Workflow {workflow_id} reporting result ({len(result_json)} bytes)")
+    if blob_offload.should_offload(len(result_json), output_location):
+        encoded = result_json.encode("utf-8")
+        if _offload_result(workflow_id, output_location, lambda: encoded):
+            return
+    compress = should_compress(len(result_json))
+    _record_result_size(len(result_json), compress)
+    _deliver(
+        workflow_id, "result", payload={"resultJson": result_json}, compress=compress
+    )
+
+
+def notify_result_stream(
+    workflow_id: UUID,
+    stream: IO[str],
+    output_location: Optional[BlobLocation] = None,
+) -> None:
+    size = stream_size(stream)
+    logger.info(f"Workflow {workflow_id} reporting streamed result ({size} bytes)")
+    if blob_offload.should_offload(size, output_location):
+
+        def data() -> IO[bytes]:
+            stream.seek(0)
+            return stream.buffer  # type: ignore[attr-defined]
+
+        if _offload_result(workflow_id, output_location, data):
+            return
+
+    def body() -> Iterable[bytes]:
+        stream.seek(0)
+        return iter_result_body(stream)
+
+    compress = should_compress(size)
+    _record_result_size(size, compress)
+    _deliver(workflow_id, "result", body=body, compress=compress)
+
+
+def _offload_result(
+    workflow_id: UUID,
+    output_location: BlobLocation,
+    data: Callable[[], "bytes | IO[bytes]"],
+) -> bool:
+    """
+    Upload the result next to the workflow's output and send SARA its
+    location. Returns False, and the result is to be sent inline, if the
+    upload failed.
+    """
+    location = blob_offload.result_location(output_location, workflow_id)
+    try:
+        access_token = get_access_token(blob_offload.STORAGE_SCOPES)
+    except NotifierError:
+        logger.warning(
+            f"No storage token to upload the result of workflow {workflow_id}; "
+            "sending it inline"
+        )
+        return False
+    try:
+        with timed_stage("blob_upload"):
+            blob_offload.upload_result(location, access_token, data)
+    except requests.exceptions.RequestException as exc:
+        logger.warning(
+            f"Could not upload the result of workflow {workflow_id} to {location} "
+            f"({exc}); sending it inline"
+        )
+        return False
+
+    logger.info(f"Workflow {workflow_id} result uploaded to {location}")
+    _deliver(
+        workflow_id,
+        "result",
+        payload={"resultBlobStorageLocation": location.to_payload()},
+    )
+    return True
+
+
+def _record_result_size(size: int, compress: bool) -> None:
+    result_size.record(
+        size, metric_attributes(content_encoding="gzip" if compress else "identity")
+    )
+
+
+def notify_exited(
+    workflow_id: UUID,
+    exit_status: WorkflowExitStatus,
+    error_message: Optional[str],
+) -> None:
+    payload: dict = {"exitStatus": exit_status.value}
+    if error_message is not None:
+        payload["errorMessage"] = error_message
+
+    logger.info(
+        f"Workflow {workflow_id} reporting exit: status={exit_status.value}"
+        + (f", errorMessage={error_message!r}" if error_message else "")
+    )
+
+    workflow_counter.add(1, metric_attributes(status=exit_status.value))
+
+    # Metrics are exported by the bounded telemetry shutdown at process exit
+    # (see config.open_telemetry), not flushed on the critical path here.
+    _deliver(workflow_id, "exited", payload=payload)
+    release_send_slot(settings.PROGRESS_STATE_DIR, workflow_id)
+
+
+def notify_progress(workflow_id: UUID, payload: dict) -> None:
+    logger.info(f"Workflow {workflow_id} reporting progress: {payload}")
+    trace.get_current_span().set_attribute("workflow.id", str(workflow_id))
+    # Sent without an idempotency key and never queued in the outbox: each
+    # update replaces the last, so a late one is only stale.
+    try:
+        send_authenticated_put(
+            _workflow_url(workflow_id, "progress"), "progress", payload=payload
+        )
+    except requests.exceptions.RequestException:
+        progress_counter.add(1, metric_attributes(outcome="failed"))
+        raise
+    progress_counter.add(1, metric_attributes(outcome="sent"))
@@ -1,160 +1,85 @@
 import json
 import logging
-import os
-from enum import Enum
-from functools import lru_cache
-from typing import Optional
+import time
+from contextlib import nullcontext
+from functools import partial
+from pathlib import Path
+from typing import IO, List, Optional
 from uuid import UUID
 
 import requests
 import typer
-from azure.core.credentials import TokenCredential
-from azure.identity import (
-    ChainedTokenCredential,
-    ClientSecretCredential,
-    WorkloadIdentityCredential,
-)
-from opentelemetry import metrics
 
+from workflow_notifier.batch import (
+    MAX_BATCH_SIZE,
+    chunked,
+    coalesce_progress,
+    read_events,
+)
+from workflow_notifier.blob_offload import BlobLocation
+from workflow_notifier.client import NotifierClient
 from workflow_notifier.config.settings import settings
+from workflow_notifier.instrumentation import (
+    command_scope,
+    metric_attributes,
+    stage_duration,
+    timed_stage,
+)
+from workflow_notifier.notifications import (
+    NotifierError,
+    WorkflowExitStatus,
+    access_token_prefetched,
+    get_access_token,
+    get_outbox,
+    memory_token_cache,
+    notify_exited,
+    notify_progress,
+    notify_result,
+    notify_started,
+    send_authenticated_put,
+    send_outbox_entry,
+    should_compress,
+    workflow_counter,
+)
+from workflow_notifier.profiling import finish_profile, start_profile
+from workflow_notifier.result_payload import spool_stdin
+from workflow_notifier.result_schema import SchemaError
+from workflow_notifier.runner import run_command
+from workflow_notifier.token_cache import MemoryTokenCache
 
 logger = logging.getLogger(__name__)
 
-# Default path where the azure-workload-identity mutating webhook projects the
-# service-account token in the pod.
-_DEFAULT_FEDERATED_TOKEN_FILE = "/var/run/secrets/azure/tokens/azure-identity-token"
-
-meter = metrics.get_meter("workflow-notifier")
-workflow_counter = meter.create_counter(
-    "workflow_execution_count",
-    description="Workflow execution status",
-)
-
 app = typer.Typer()
 
 
-class WorkflowExitStatus(str, Enum):
-    Succeeded = "Succeeded"
-    Failed = "Failed"
-
-
-@lru_cache(maxsize=1)
-def _get_credential() -> TokenCredential:
-    """
-    Build a TokenCredential.
-
-    The set of credential types to try is configured via
-    ``settings.allowed_auth_methods``, an ordered list whose entries may be
-    ``"WorkloadIdentity"`` and/or ``"ClientSecret"`` (case-insensitive). When
-    more than one method is configured, the order determines the order inside
-    the resulting ``ChainedTokenCredential``.
-
-    In cloud (AKS with Azure Workload Identity), the standard ``AZURE_CLIENT_ID``,
-    ``AZURE_TENANT_ID``, ``AZURE_FEDERATED_TOKEN_FILE`` and ``AZURE_AUTHORITY_HOST``
-    environment variables are injected by the azure-workload-identity mutating
-    webhook, and ``WorkloadIdentityCredential`` exchanges the projected service
-    account token for an Entra ID access token.
-
-    For local development, include ``"ClientSecret"`` in
-    ``ALLOWED_AUTH_METHODS`` and provide ``NOTIFIER_CLIENT_SECRET``.
-    """
-    token_file_path = os.environ.get(
-        "AZURE_FEDERATED_TOKEN_FILE", _DEFAULT_FEDERATED_TOKEN_FILE
-    )
-    client_secret = settings.NOTIFIER_CLIENT_SECRET
-
-    credentials: list[TokenCredential] = []
-    activated: list[str] = []
-
-    allowed_methods = settings.allowed_auth_methods or ["WorkloadIdentity"]
-
-    for method in allowed_methods:
-        normalized = method.strip().lower()
-        if normalized == "workloadidentity":
-            if os.path.exists(token_file_path):
-                credentials.append(
-                    WorkloadIdentityCredential(
-                        tenant_id=settings.TENANT_ID,
-                        client_id=settings.NOTIFIER_CLIENT_ID,
-                        token_file_path=token_file_path,
-                    )
-                )
-                activated.append("WorkloadIdentityCredential")
-            else:
-                logger.warning(
-                    "ALLOWED_AUTH_METHODS includes 'WorkloadIdentity' but no federated "
-                    f"token file found at '{token_file_path}'; skipping "
-                    "WorkloadIdentityCredential."
-                )
-        elif normalized == "clientsecret":
-            if client_secret and not client_secret.lower().startswith("fill in"):
-                credentials.append(
-                    ClientSecretCredential(
-                        tenant_id=settings.TENANT_ID,
-                        client_id=settings.NOTIFIER_CLIENT_ID,
-                        client_secret=client_secret,
-                    )
-                )
-                activated.append("ClientSecretCredential")
-            else:
-                logger.warning(
-                    "ALLOWED_AUTH_METHODS includes 'ClientSecret' but "
-                    "NOTIFIER_CLIENT_SECRET is missing/placeholder; skipping "
-                    "ClientSecretCredential."
-                )
-        else:
-            logger.warning(
-                f"Unknown auth method '{method}' in ALLOWED_AUTH_METHODS; "
-                "expected 'WorkloadIdentity' or 'ClientSecret'."
-            )
-
-    if not credentials:
-        raise RuntimeError(
-            "No usable Azure credential could be constructed from "
-            "ALLOWED_AUTH_METHODS. Configure at least one of 'WorkloadIdentity' "
-            "(with a federated token file present) or 'ClientSecret' (with "
-            "NOTIFIER_CLIENT_SECRET set)."
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: Optional[bool] = typer.Option(
+        None,
+        "--profile/--no-profile",
+        help="Log a per-phase timing breakdown of the command as one JSON line. "
+        "Defaults to NOTIFIER_PROFILE.",
+    ),
+    profile_output: Optional[Path] = typer.Option(
+        None,
+        help="Also run the command under cProfile and write the stats to this "
+        "path. Implies --profile. Defaults to NOTIFIER_PROFILE_OUTPUT.",
+    ),
+) -> None:
+    """Report Argo workflow lifecycle events to SARA."""
+    output = profile_output or settings.NOTIFIER_PROFILE_OUTPUT
+    enabled = profile if profile is not None else settings.NOTIFIER_PROFILE
+    if not (enabled or output):
+        return
+    command = ctx.invoked_subcommand or ""
+    command_profile = start_profile(command, str(output) if output else None)
+    startup = command_profile.phases.get("startup")
+    if startup is not None:
+        stage_duration.record(
+            startup, metric_attributes(command=command, stage="startup")
         )
-
-    if len(credentials) == 1:
-        logger.info(f"Using {activated[0]} only")
-        return credentials[0]
-
-    logger.info("Using ChainedTokenCredential: " + " -> ".join(activated))
-    return ChainedTokenCredential(*credentials)
-
-
-def get_access_token() -> str:
-    """Acquire an access token for the SARA API using azure-identity."""
-    credential = _get_credential()
-    try:
-        token = credential.get_token(*settings.scopes)
-    except Exception as e:
-        logger.error(f"Error acquiring token: {e}")
-        raise typer.Exit(1)
-    return token.token
-
-
-def _send_authenticated_put(url: str, payload: Optional[dict]) -> None:
-    """Send an authenticated PUT request and raise on non-2xx responses."""
-    access_token = get_access_token()
-    logger.info(f"Sending PUT request to {url} with payload: {payload}")
-    headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.put(url, json=payload, headers=headers)
-    response.raise_for_status()
-
-
-def _workflow_url(workflow_id: UUID, suffix: str) -> str:
-    return f"{settings.workflow_base_url}/{workflow_id}/{suffix}"
-
-
-def _validate_result_json(value: str) -> str:
-    """Typer callback: ensure result_json is parseable JSON; return verbatim."""
-    try:
-        json.loads(value)
-    except (json.JSONDecodeError, TypeError) as exc:
-        raise typer.BadParameter(f"result_json must be valid JSON: {exc}")
-    return value
+    ctx.call_on_close(lambda: finish_profile(command_profile))
 
 
 @app.command()
@@ -167,16 +92,10 @@ def started(
     ),
 ) -> None:
     """Notify SARA that the workflow has started executing."""
-    url = _workflow_url(workflow_id, "started")
-    logger.info(f"Workflow {workflow_id} reporting started")
-    payload = (
-        {"argoWorkflowName": argo_workflow_name}
-        if argo_workflow_name is not None
-        else None
-    )
     try:
-        _send_authenticated_put(url, payload=payload)
-    except requests.exceptions.RequestException as exc:
+        with NotifierClient() as client:
+            client.started(workflow_id, argo_workflow_name)
+    except (requests.exceptions.RequestException, NotifierError) as exc:
         logger.error(f"Error notifying workflow {workflow_id} start: {exc}")
         raise typer.Exit(1)
 
@@ -184,16 +103,69 @@ def started(
 @app.command()
 def result(
     workflow_id: UUID = typer.Argument(...),
-    result_json: str = typer.Argument(..., callback=_validate_result_json),
+    result_json: Optional[str] = typer.Argument(
+        None,
+        help="The result JSON. Omit when using --from-file or --from-stdin.",
+    ),
+    from_file: Optional[Path] = typer.Option(
+        None,
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        help="Read the result JSON from this file instead of the command line.",
+    ),
+    from_stdin: bool = typer.Option(
+        False,
+        "--from-stdin",
+        help="Read the result JSON from stdin instead of the command line.",
+    ),
+    output_blob_location: Optional[BlobLocation] = typer.Option(
+        None,
+        parser=BlobLocation.parse,
+        metavar="ACCOUNT/CONTAINER/BLOB",
+        help="The workflow's output blob. Results of at least "
+        "RESULT_BLOB_OFFLOAD_MIN_BYTES are uploaded next to it and SARA is "
+        "sent their location instead.",
+    ),
 ) -> None:
-    """Forward the workflow's result payload to SARA verbatim as a JSON string."""
-    url = _workflow_url(workflow_id, "result")
-    logger.info(f"Workflow {workflow_id} reporting result ({len(result_json)} bytes)")
-    try:
-        _send_authenticated_put(url, payload={"resultJson": result_json})
-    except requests.exceptions.RequestException as exc:
-        logger.error(f"Error notifying workflow {workflow_id} result: {exc}")
-        raise typer.Exit(1)
+    """
+    Forward the workflow's result payload to SARA verbatim as a JSON string.
+
+    Large results should be passed with --from-file or --from-stdin: they are
+    not limited by the maximum argument length and are streamed to SARA
+    without being loaded into memory as Python objects. With
+    --output-blob-location, results above the offload threshold go to blob
+    storage instead.
+    """
+    sources = [result_json is not None, from_file is not None, from_stdin]
+    if sum(sources) != 1:
+        raise typer.BadParameter(
+            "Provide exactly one of RESULT_JSON, --from-file or --from-stdin."
+        )
+
+    # The token is acquired while the payload is read and validated.
+    with (
+        command_scope("result"),
+        access_token_prefetched(),
+        NotifierClient() as client,
+    ):
+        try:
+            if result_json is not None:
+                client.result(workflow_id, result_json, output_blob_location)
+                return
+
+            stream = (
+                open(from_file, encoding="utf-8")
+                if from_file is not None
+                else spool_stdin()
+            )
+            with stream:
+                client.result(workflow_id, stream, output_blob_location)
+        except (requests.exceptions.RequestException, NotifierError) as exc:
+            logger.error(f"Error notifying workflow {workflow_id} result: {exc}")
+            raise typer.Exit(1)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc))
 
 
 @app.command()
@@ -206,30 +178,313 @@ def exited(
     ),
 ) -> None:
     """Notify SARA that the workflow has exited with the given status."""
-    url = _workflow_url(workflow_id, "exited")
-    payload: dict = {"exitStatus": exit_status.value}
-    if error_message is not None:
-        payload["errorMessage"] = error_message
-
-    logger.info(
-        f"Workflow {workflow_id} reporting exit: status={exit_status.value}"
-        + (f", errorMessage={error_message!r}" if error_message else "")
-    )
+    try:
+        with NotifierClient() as client:
+            client.exited(workflow_id, exit_status, error_message)
+    except (requests.exceptions.RequestException, NotifierError) as exc:
+        logger.error(f"Error notifying workflow {workflow_id} exit: {exc}")
+        raise typer.Exit(1)
+
 
+@app.command()
+def progress(
+    workflow_id: UUID = typer.Argument(...),
+    percent: Optional[float] = typer.Argument(
+        None, min=0, max=100, help="How far the workflow has come, 0 to 100."
+    ),
+    stage: Optional[str] = typer.Option(
+        None, help="What the workflow is doing, e.g. 'Anonymizing frames'."
+    ),
+) -> None:
+    """
+    Report how far the workflow has come.
+
+    Updates are sent at most once per PROGRESS_MIN_INTERVAL_SECONDS for each
+    workflow and the ones in between are dropped, so this may be called as
+    often as convenient. An update that cannot be delivered is logged and
+    does not fail the step.
+    """
     try:
-        workflow_counter.add(
-            1,
-            {
-                "status": exit_status.value,
-                "workflow_id": str(workflow_id),
-            },
+        with NotifierClient() as client:
+            client.progress(workflow_id, percent, stage)
+    except requests.exceptions.RequestException as exc:
+        logger.warning(f"Error reporting workflow {workflow_id} progress: {exc}")
+    except NotifierError:
+        raise typer.Exit(1)
+    except ValueError as exc:
+        logger.error(f"Invalid progress update: {exc}")
+        raise typer.Exit(2)
+
+
+@app.command()
+def run(
+    workflow_id: UUID = typer.Argument(...),
+    command: List[str] = typer.Argument(
+        ...,
+        help="The analysis command and its arguments. Separate it from the "
+        "notifier's own options with `--`.",
+    ),
+    argo_workflow_name: Optional[str] = typer.Option(
+        None,
+        help="Name of the Argo Workflow resource, forwarded with `started`.",
+    ),
+    result_file: Optional[Path] = typer.Option(
+        None,
+        help="Read the result JSON from this file once the command has exited. "
+        "Without it the command's stdout is used as the result.",
+    ),
+    report_result: bool = typer.Option(
+        True,
+        "--report-result/--no-report-result",
+        help="Whether the command produces a result to forward to SARA.",
+    ),
+    output_blob_location: Optional[BlobLocation] = typer.Option(
+        None,
+        parser=BlobLocation.parse,
+        metavar="ACCOUNT/CONTAINER/BLOB",
+        help="The workflow's output blob; see `result --output-blob-location`.",
+    ),
+) -> None:
+    """
+    Run the analysis command and report started, result and exited for it.
+
+    One notifier process covers the whole workflow, so the credential, token
+    and pooled HTTP connection are set up once instead of once per event. The
+    process exits with the command's exit code, or 1 if a notification could
+    not be delivered.
+    """
+    with command_scope("run"), NotifierClient() as client:
+        notification_failed = False
+
+        # A notification that cannot be sent, for lack of a token or of SARA,
+        # must not keep the analysis from running or being reported.
+        try:
+            client.started(workflow_id, argo_workflow_name)
+        except (requests.exceptions.RequestException, NotifierError) as exc:
+            logger.error(f"Error notifying workflow {workflow_id} start: {exc}")
+            notification_failed = True
+
+        capture_stdout = report_result and result_file is None
+        with timed_stage("command"):
+            outcome = run_command(command, capture_stdout=capture_stdout)
+
+        exit_status = WorkflowExitStatus.Succeeded
+        error_message: Optional[str] = None
+        if outcome.returncode != 0:
+            exit_status = WorkflowExitStatus.Failed
+            error_message = outcome.stderr_tail or outcome.describe_exit()
+        elif report_result:
+            try:
+                if result_file is not None:
+                    with _open_result_file(result_file) as stream:
+                        client.result(workflow_id, stream, output_blob_location)
+                else:
+                    result_json = outcome.stdout.decode("utf-8", errors="replace")
+                    if not result_json.strip():
+                        raise ValueError("command produced no result")
+                    client.result(workflow_id, result_json, output_blob_location)
+            except ValueError as exc:
+                exit_status = WorkflowExitStatus.Failed
+                error_message = f"Invalid result: {exc}"
+            except SchemaError as exc:
+                logger.error(f"Could not check workflow {workflow_id} result: {exc}")
+                exit_status = WorkflowExitStatus.Failed
+                error_message = str(exc)
+            except (requests.exceptions.RequestException, NotifierError) as exc:
+                logger.error(f"Error notifying workflow {workflow_id} result: {exc}")
+                notification_failed = True
+
+        try:
+            client.exited(workflow_id, exit_status, error_message)
+        except (requests.exceptions.RequestException, NotifierError) as exc:
+            logger.error(f"Error notifying workflow {workflow_id} exit: {exc}")
+            notification_failed = True
+
+        if outcome.returncode != 0:
+            raise typer.Exit(outcome.exit_code)
+        if notification_failed or exit_status is WorkflowExitStatus.Failed:
+            raise typer.Exit(1)
+
+
+@app.command()
+def flush(
+    batch_size: Optional[int] = typer.Option(
+        None,
+        min=1,
+        help="Notifications sent per batch. Defaults to OUTBOX_FLUSH_BATCH_SIZE.",
+    ),
+    watch: Optional[float] = typer.Option(
+        None,
+        min=0.1,
+        help="Keep running and drain the outbox every WATCH seconds.",
+    ),
+) -> None:
+    """
+    Deliver notifications queued in the outbox (OUTBOX_PATH), oldest first.
+
+    Without --watch the outbox is drained once; the command exits with 1 if
+    SARA was still unavailable and notifications remain queued.
+    """
+    outbox = get_outbox()
+    if outbox is None:
+        raise typer.BadParameter("OUTBOX_PATH is not set.")
+    size = batch_size or settings.OUTBOX_FLUSH_BATCH_SIZE
+
+    while True:
+        with command_scope("flush"):
+            try:
+                drained = outbox.drain(send_outbox_entry, size)
+            except NotifierError:
+                raise typer.Exit(1)
+        logger.info(
+            f"Outbox flush delivered {drained.delivered}, dropped {drained.dropped}"
+            + ("" if drained.completed else "; SARA unavailable, retrying later")
         )
+        if watch is None:
+            if not drained.completed:
+                raise typer.Exit(1)
+            return
+        time.sleep(watch)
 
-        meter_provider = metrics.get_meter_provider()
-        if hasattr(meter_provider, "force_flush"):
-            meter_provider.force_flush()
 
-        _send_authenticated_put(url, payload=payload)
-    except requests.exceptions.RequestException as exc:
-        logger.error(f"Error notifying workflow {workflow_id} exit: {exc}")
+@app.command()
+def batch(
+    events_file: Optional[Path] = typer.Argument(
+        None,
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        help="NDJSON file with one event per line. Read from stdin when omitted.",
+    ),
+    chunk_size: Optional[int] = typer.Option(
+        None,
+        min=1,
+        max=MAX_BATCH_SIZE,
+        help="Events per request. Defaults to BATCH_CHUNK_SIZE.",
+    ),
+) -> None:
+    """
+    Send many started/result/exited/progress events through SARA's batch
+    endpoint.
+
+    Every line is validated before anything is sent. SARA applies each chunk
+    with one database commit; the command exits with 1 if a chunk could not be
+    delivered or referenced an unknown workflow.
+    """
+    stream = (
+        open(events_file, encoding="utf-8")
+        if events_file is not None
+        else spool_stdin()
+    )
+    size = chunk_size or settings.BATCH_CHUNK_SIZE
+    with command_scope("batch"), stream:
+        try:
+            count = sum(1 for _ in read_events(stream))
+        except ValueError as exc:
+            raise typer.BadParameter(f"invalid event on {exc}")
+        stream.seek(0)
+
+        logger.info(f"Sending {count} workflow events in chunks of {size}")
+        not_found: list[str] = []
+        try:
+            for chunk in chunked(read_events(stream), size):
+                not_found.extend(_send_batch(chunk))
+        except (requests.exceptions.RequestException, NotifierError) as exc:
+            logger.error(f"Error sending workflow event batch: {exc}")
+            raise typer.Exit(1)
+
+    if not_found:
+        logger.error(f"Events for unknown workflows were skipped: {not_found}")
         raise typer.Exit(1)
+
+
+def _send_batch(events: list[dict]) -> list[str]:
+    """Send one chunk of batch events and return the unknown workflow ids."""
+    events = coalesce_progress(events)
+    for event in events:
+        if event["event"] == "Exited":
+            workflow_counter.add(1, metric_attributes(status=event["exitStatus"]))
+    encoded = json.dumps(events).encode("utf-8")
+    response = send_authenticated_put(
+        f"{settings.workflow_base_url}/batch",
+        "batch",
+        body=lambda: iter([encoded]),
+        compress=should_compress(len(encoded)),
+    )
+    return response.json().get("notFound", [])
+
+
+@app.command()
+def serve(
+    socket_path: Optional[str] = typer.Option(
+        None, help="Unix socket to listen on. Defaults to SERVE_SOCKET_PATH."
+    ),
+    concurrency: Optional[int] = typer.Option(
+        None, min=1, help="Concurrent deliveries. Defaults to SERVE_CONCURRENCY."
+    ),
+    queue_size: Optional[int] = typer.Option(
+        None,
+        min=1,
+        help="Events accepted ahead of delivery. Defaults to SERVE_QUEUE_SIZE.",
+    ),
+) -> None:
+    """
+    Run resident, delivering NDJSON events received on a Unix socket.
+
+    Events use the format of `batch`, one per line; each line is answered with
+    {"ok": true} once queued. Progress events are sent at most once per
+    PROGRESS_MIN_INTERVAL_SECONDS for each workflow. The credential, token and
+    HTTP connections are kept warm between events. SIGTERM stops accepting
+    events and exits once the queued ones have been delivered.
+    """
+    # Imported here so that asyncio is not loaded by the one-shot commands.
+    import asyncio
+
+    from workflow_notifier.server import NotificationServer
+
+    server = NotificationServer(
+        socket_path or settings.SERVE_SOCKET_PATH,
+        partial(
+            _deliver_event,
+            token_cache=MemoryTokenCache(settings.TOKEN_CACHE_REFRESH_MARGIN_SECONDS),
+        ),
+        concurrency=concurrency or settings.SERVE_CONCURRENCY,
+        queue_size=queue_size or settings.SERVE_QUEUE_SIZE,
+        max_event_bytes=settings.SERVE_MAX_EVENT_BYTES,
+        progress_interval=settings.PROGRESS_MIN_INTERVAL_SECONDS,
+    )
+    try:
+        get_access_token()
+    except NotifierError:
+        logger.warning("Could not acquire an access token at startup")
+    asyncio.run(server.run())
+
+
+def _deliver_event(event: dict, token_cache: Optional[MemoryTokenCache] = None) -> None:
+    """Deliver one event in the format produced by ``batch.parse_event``,
+    keeping the access tokens in ``token_cache``."""
+    workflow_id = UUID(event["workflowId"])
+    cached = memory_token_cache(token_cache) if token_cache else nullcontext()
+    with command_scope("serve"), cached:
+        if event["event"] == "Started":
+            notify_started(workflow_id, event.get("argoWorkflowName"))
+        elif event["event"] == "Result":
+            notify_result(workflow_id, event["resultJson"])
+        elif event["event"] == "Progress":
+            notify_progress(
+                workflow_id,
+                {k: event[k] for k in ("percent", "stage") if k in event},
+            )
+        else:
+            notify_exited(
+                workflow_id,
+                WorkflowExitStatus(event["exitStatus"]),
+                event.get("errorMessage"),
+            )
+
+
+def _open_result_file(path: Path) -> IO[str]:
+    try:
+        return open(path, encoding="utf-8")
+    except OSError as exc:
+        raise ValueError(f"could not read result file {path}: {exc}")
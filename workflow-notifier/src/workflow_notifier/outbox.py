@@ -0,0 +1,216 @@
+"""Durable outbox for notifications that could not be delivered to SARA.
+
+When ``OUTBOX_PATH`` is set and a notification fails with a transient error
+(SARA unreachable or answering 5xx/429 after all retries), the request body is
+stored in a SQLite database at that path instead of failing the Argo step.
+``notifier flush`` later sends the stored notifications in the order they
+were queued.
+
+Per workflow, the stored events keep their order: once a workflow has a queued
+notification, its later notifications are queued behind it rather than sent
+directly. A notification supersedes an older queued one for the same workflow
+and event (a second ``result`` replaces the first) in its place in the queue,
+so only the latest is delivered, still ahead of the workflow's later events.
+An entry superseded while ``flush`` is sending it stays queued, and the newer
+notification is sent next.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+import requests
+
+from workflow_notifier.transport import is_transient_error
+
+logger = logging.getLogger(__name__)
+
+# Processes appending to the same outbox wait this long for each other.
+_BUSY_TIMEOUT_SECONDS = 30.0
+
+# Responses meaning SARA does not accept the notifier's token. They say nothing
+# about the notification, so it stays queued until the identity is fixed.
+_AUTH_STATUS_CODES = frozenset({401, 403})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    workflow_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    body TEXT,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_workflow ON outbox (workflow_id, event);
+"""
+
+
+@dataclass
+class OutboxEntry:
+    seq: int
+    workflow_id: str
+    event: str
+    body: Optional[str]
+    attempts: int
+
+
+@dataclass
+class DrainResult:
+    delivered: int
+    dropped: int
+    # False when draining stopped because SARA is still unavailable.
+    completed: bool
+
+
+class Outbox:
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(
+            sqlite3.connect(
+                self.path, timeout=_BUSY_TIMEOUT_SECONDS, isolation_level=None
+            )
+        ) as connection:
+            connection.executescript(_SCHEMA)
+            yield connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def enqueue(self, workflow_id: str, event: str, body: Optional[str]) -> None:
+        """
+        Queue a notification. A queued one for the same event is replaced in
+        place, keeping its position ahead of the workflow's later events.
+        """
+        with self._transaction() as connection:
+            replaced = connection.execute(
+                "UPDATE outbox SET body = ?, attempts = 0, last_error = NULL "
+                "WHERE workflow_id = ? AND event = ?",
+                (body, workflow_id, event),
+            ).rowcount
+            if not replaced:
+                connection.execute(
+                    "INSERT INTO outbox (workflow_id, event, body, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (workflow_id, event, body, time.time()),
+                )
+
+    def has_pending(self, workflow_id: str) -> bool:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT 1 FROM outbox WHERE workflow_id = ? LIMIT 1", (workflow_id,)
+            ).fetchone()
+        return row is not None
+
+    def pending_count(self) -> int:
+        with self._connect() as connection:
+            (count,) = connection.execute("SELECT COUNT(*) FROM outbox").fetchone()
+        return count
+
+    def _oldest(self, limit: int) -> list[OutboxEntry]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT seq, workflow_id, event, body, attempts FROM outbox "
+                "ORDER BY seq LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [OutboxEntry(*row) for row in rows]
+
+    def _remove(self, entry: OutboxEntry) -> bool:
+        """
+        Remove a sent or dropped entry, and return False instead if it was
+        superseded by :meth:`enqueue` in the meantime.
+        """
+        with self._transaction() as connection:
+            removed = connection.execute(
+                "DELETE FROM outbox WHERE seq = ? AND body IS ?",
+                (entry.seq, entry.body),
+            ).rowcount
+        return removed > 0
+
+    def _record_failure(self, seq: int, error: str) -> None:
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE outbox SET attempts = attempts + 1, last_error = ? "
+                "WHERE seq = ?",
+                (error, seq),
+            )
+
+    def drain(
+        self, send: Callable[[OutboxEntry], None], batch_size: int
+    ) -> DrainResult:
+        """
+        Send queued notifications oldest first, ``batch_size`` at a time.
+
+        Draining stops at the first transient failure, leaving that entry and
+        everything queued after it in place, so a workflow's events are never
+        delivered out of order. It also stops when SARA refuses the notifier's
+        token (401/403), since every other entry would be refused as well.
+        Entries SARA rejects permanently (e.g. 404 for an unknown workflow) are
+        logged and dropped. When an entry is superseded while it is being sent,
+        the rest of its workflow's entries wait for the next batch, which starts
+        with the newer notification.
+        """
+        delivered = dropped = 0
+        while True:
+            entries = self._oldest(batch_size)
+            if not entries:
+                return DrainResult(delivered, dropped, completed=True)
+
+            superseded: set[str] = set()
+            for entry in entries:
+                if entry.workflow_id in superseded:
+                    continue
+                try:
+                    send(entry)
+                    delivered += 1
+                except requests.exceptions.RequestException as exc:
+                    if is_transient_error(exc):
+                        logger.warning(
+                            f"SARA still unavailable ({exc}); "
+                            f"{entry.event} for workflow {entry.workflow_id} "
+                            "stays queued"
+                        )
+                        self._record_failure(entry.seq, str(exc))
+                        return DrainResult(delivered, dropped, completed=False)
+                    if _is_auth_error(exc):
+                        logger.error(
+                            f"SARA refused the notifier's token ({exc}); "
+                            "queued notifications are kept"
+                        )
+                        self._record_failure(entry.seq, str(exc))
+                        return DrainResult(delivered, dropped, completed=False)
+                    logger.error(
+                        f"Dropping queued {entry.event} for workflow "
+                        f"{entry.workflow_id} after {entry.attempts + 1} "
+                        f"attempts: {exc}"
+                    )
+                    dropped += 1
+                if not self._remove(entry):
+                    logger.info(
+                        f"Queued {entry.event} for workflow {entry.workflow_id} "
+                        "was superseded while it was sent; sending the new one"
+                    )
+                    superseded.add(entry.workflow_id)
+
+
+def _is_auth_error(exc: requests.exceptions.RequestException) -> bool:
+    return exc.response is not None and exc.response.status_code in _AUTH_STATUS_CODES
@@ -0,0 +1,112 @@
+"""Per-phase timing breakdown of one notifier command.
+
+Enabled with ``notifier --profile`` (or ``NOTIFIER_PROFILE=true``). While a
+profile is active every stage timed by
+:func:`workflow_notifier.instrumentation.timed_stage` is also added to it, and
+when the command finishes the breakdown is logged as one JSON line,
+``notifier profile {...}``, that can be collected from the logs of many Argo
+steps and compared. Besides the command's own stages it contains:
+
+- ``startup``: from process start until the command began, i.e. interpreter
+  start-up, imports and telemetry setup (Linux only)
+- ``telemetry_shutdown``: exporting the process' telemetry, which then happens
+  at the end of the command instead of at exit
+
+With ``--profile-output PATH`` the command also runs under cProfile and the
+stats are written to PATH, for ``python -m pstats`` or snakeviz.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CommandProfile:
+    def __init__(self, command: str, output_path: Optional[str] = None) -> None:
+        self.command = command
+        self.output_path = output_path
+        self.phases: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._profiler = cProfile.Profile() if output_path else None
+
+    def add(self, phase: str, seconds: float) -> None:
+        # Stages may finish on other threads, e.g. the token prefetch.
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def start(self) -> None:
+        if self._profiler is not None:
+            self._profiler.enable()
+
+    def stop(self) -> None:
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.output_path)
+
+    def report(self) -> dict:
+        with self._lock:
+            phases = dict(self.phases)
+        return {
+            "command": self.command,
+            "phases_ms": {
+                phase: round(seconds * 1000, 1) for phase, seconds in phases.items()
+            },
+            "cprofile": self.output_path,
+        }
+
+
+_active: Optional[CommandProfile] = None
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    """Add a timed stage to the active profile, if there is one."""
+    profile = _active
+    if profile is not None:
+        profile.add(phase, seconds)
+
+
+def start_profile(command: str, output_path: Optional[str] = None) -> CommandProfile:
+    global _active
+    profile = CommandProfile(command, output_path)
+    startup = seconds_since_process_start()
+    if startup is not None:
+        profile.add("startup", startup)
+    _active = profile
+    profile.start()
+    return profile
+
+
+def finish_profile(profile: CommandProfile) -> None:
+    """Stop ``profile``, shut telemetry down inside it and log the breakdown."""
+    global _active
+    # Imported here: the OTel setup is only imported by main.py otherwise.
+    from workflow_notifier.config.open_telemetry import shutdown_open_telemetry
+
+    start = time.perf_counter()
+    shutdown_open_telemetry()
+    profile.add("telemetry_shutdown", time.perf_counter() - start)
+    profile.stop()
+    _active = None
+    logger.info(f"notifier profile {json.dumps(profile.report())}")
+
+
+def seconds_since_process_start() -> Optional[float]:
+    """Age of the current process, from ``/proc`` (10 ms resolution)."""
+    try:
+        with open("/proc/self/stat") as stat_file:
+            stat = stat_file.read()
+        with open("/proc/uptime") as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+    except (OSError, ValueError):
+        return None
+    # Field 22 is the start time in clock ticks after boot. The fields are
+    # counted after the command name, which is in parentheses and may contain
+    # spaces.
+    start_ticks = int(stat.rsplit(")", 1)[1].split()[19])
+    return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
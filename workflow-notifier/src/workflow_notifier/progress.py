@@ -0,0 +1,153 @@
+"""Coalescing of ``progress`` heartbeats.
+
+A long-running workflow may report progress as often as it likes, e.g. once
+per processed frame, but SARA is sent at most one update per workflow every
+``PROGRESS_MIN_INTERVAL_SECONDS``. Intermediate values are dropped: only the
+latest percent and stage matter, and a newer update makes older ones stale.
+
+``notifier progress`` runs as a new process per update, so the time of the
+last update sent for a workflow is kept in a small file per workflow in
+``PROGRESS_STATE_DIR``, guarded by ``flock``. An update arriving within the
+interval is dropped at once rather than held back, so the command never
+blocks the workflow; the next update, or ``exited``, supersedes it. Any I/O
+problem with the state directory degrades to sending the update.
+
+``notifier serve`` coalesces in memory with :class:`ProgressThrottle` instead:
+the first update of an interval is sent straight away, and the latest one
+received during the rest of the interval is sent when the interval is over.
+"""
+
+import fcntl
+import logging
+import os
+import time
+from typing import Any, Callable, Generic, Optional, TypeVar
+from uuid import UUID
+
+from opentelemetry import metrics
+
+logger = logging.getLogger(__name__)
+
+meter = metrics.get_meter("workflow-notifier")
+progress_counter = meter.create_counter(
+    "notification_progress_count",
+    description="Progress updates reported by workflows, by outcome",
+)
+
+T = TypeVar("T")
+
+
+def progress_payload(percent: Optional[float], stage: Optional[str]) -> dict:
+    """The body of ``PUT /api/workflow/<id>/progress``."""
+    if percent is None and stage is None:
+        raise ValueError("a progress update needs a percent or a stage")
+    if percent is not None and not 0 <= percent <= 100:
+        raise ValueError(f"percent must be between 0 and 100, got {percent}")
+    payload: dict[str, Any] = {}
+    if percent is not None:
+        payload["percent"] = percent
+    if stage is not None:
+        payload["stage"] = stage
+    return payload
+
+
+class ProgressThrottle(Generic[T]):
+    """
+    Holds the latest progress update per workflow and releases at most one per
+    interval. Not thread-safe; ``notifier serve`` only uses it from its event
+    loop.
+    """
+
+    def __init__(
+        self, interval: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.interval = interval
+        self._clock = clock
+        self._last_sent: dict[str, float] = {}
+        self._pending: dict[str, T] = {}
+
+    def offer(self, workflow_id: str, update: T) -> Optional[float]:
+        """
+        Store ``update`` as the workflow's latest progress.
+
+        Returns the seconds after which :meth:`take` should be called to send
+        it (0 when it may be sent now), or None when a call is already due for
+        this workflow, which will send ``update`` in place of the one it
+        replaced.
+        """
+        already_due = workflow_id in self._pending
+        self._pending[workflow_id] = update
+        if already_due:
+            return None
+        last_sent = self._last_sent.get(workflow_id)
+        if last_sent is None:
+            return 0.0
+        return max(0.0, last_sent + self.interval - self._clock())
+
+    def take(self, workflow_id: str) -> Optional[T]:
+        """The update to send now, or None if it was discarded meanwhile."""
+        update = self._pending.pop(workflow_id, None)
+        if update is not None:
+            self._last_sent[workflow_id] = self._clock()
+        return update
+
+    def discard(self, workflow_id: str) -> None:
+        """Forget the workflow, e.g. once it has exited; a pending update is
+        dropped."""
+        self._pending.pop(workflow_id, None)
+        self._last_sent.pop(workflow_id, None)
+
+    def pending(self) -> list[str]:
+        """Workflows with an update waiting to be taken."""
+        return list(self._pending)
+
+
+def _state_path(state_dir: str, workflow_id: UUID) -> str:
+    return os.path.join(state_dir, f"{workflow_id}.progress")
+
+
+def claim_send_slot(
+    state_dir: str,
+    workflow_id: UUID,
+    interval: float,
+    clock: Callable[[], float] = time.time,
+) -> bool:
+    """
+    Whether a progress update for ``workflow_id`` may be sent now, i.e. none
+    was sent by any process within ``interval``. If so, the current time is
+    recorded as the time of the last update.
+    """
+    try:
+        os.makedirs(state_dir, exist_ok=True)
+        fd = os.open(_state_path(state_dir, workflow_id), os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError as exc:
+        logger.warning(f"Progress state unavailable ({exc}); sending update")
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            last_sent: Optional[float] = float(os.read(fd, 64))
+        except ValueError:
+            last_sent = None
+        now = clock()
+        if last_sent is not None and 0 <= now - last_sent < interval:
+            return False
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.ftruncate(fd, 0)
+        os.write(fd, repr(now).encode("ascii"))
+        return True
+    except OSError as exc:
+        logger.warning(f"Progress state unavailable ({exc}); sending update")
+        return True
+    finally:
+        os.close(fd)
+
+
+def release_send_slot(state_dir: str, workflow_id: UUID) -> None:
+    """Remove the workflow's state once it has exited."""
+    try:
+        os.unlink(_state_path(state_dir, workflow_id))
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logger.warning(f"Could not remove progress state of {workflow_id}: {exc}")
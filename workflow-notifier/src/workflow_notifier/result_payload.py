@@ -0,0 +1,230 @@
+"""Helpers for forwarding large result payloads without holding copies of them.
+
+SARA expects the result wrapped as a JSON string, ``{"resultJson": "<json>"}``.
+For results read from a file or stdin the wrapped body is produced chunk by
+chunk while the request is being sent, instead of parsing the payload into
+Python objects and serializing it again.
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zlib
+from typing import IO, Iterable, Iterator
+
+CHUNK_SIZE = 64 * 1024
+
+# zlib level 6 gets within a few percent of level 9 on JSON at a fraction of
+# the CPU time.
+GZIP_LEVEL = 6
+
+_BODY_PREFIX = b'{"resultJson": "'
+_BODY_SUFFIX = b'"}'
+
+
+_WS = "[ \\t\\n\\r]*"
+# Unrolled so that an unterminated string cannot backtrack catastrophically.
+_STRING_BODY = r'[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*'
+_NUMBER = r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?"
+# json.loads also accepts NaN and Infinity, so the stream is held to the same.
+_LITERAL = rf"{_NUMBER}|true|false|null|NaN|-?Infinity"
+_SCALAR = rf'"{_STRING_BODY}"|{_LITERAL}'
+
+_WS_RE = re.compile(_WS)
+_LITERAL_RE = re.compile(_LITERAL)
+_STRING_REST_RE = re.compile(rf'{_STRING_BODY}(")?')
+_PARTIAL_ESCAPE_RE = re.compile(r"\\(?:u[0-9a-fA-F]{0,3})?")
+_MEMBER = rf'"{_STRING_BODY}"{_WS}:{_WS}(?:{_SCALAR})'
+# Arrays and objects holding only scalars, e.g. one reading of a sensor.
+_FLAT_ARRAY = rf"\[{_WS}(?:(?:{_SCALAR})(?:{_WS},{_WS}(?:{_SCALAR}))*{_WS})?\]"
+_FLAT_OBJECT = rf"\{{{_WS}(?:{_MEMBER}(?:{_WS},{_WS}{_MEMBER})*{_WS})?\}}"
+_ITEM = rf"{_SCALAR}|{_FLAT_ARRAY}|{_FLAT_OBJECT}"
+# Runs of scalar or flat array items or object members after a value, matched
+# in one go so that e.g. a per-pixel temperature array or a list of readings
+# costs one regex match per chunk rather than a Python step per token.
+_ARRAY_RUN_RE = re.compile(rf"(?:{_WS},{_WS}(?:{_ITEM}))+")
+_OBJECT_RUN_RE = re.compile(rf'(?:{_WS},{_WS}"{_STRING_BODY}"{_WS}:{_WS}(?:{_ITEM}))+')
+# Characters no number or literal contains. Outside of strings a chunk is only
+# scanned up to the last of them, so a token is never judged by a part of it.
+_DELIMITERS = ',:[]{}" \t\n\r'
+
+(
+    _VALUE,
+    _FIRST_VALUE,
+    _KEY,
+    _FIRST_KEY,
+    _COLON,
+    _AFTER_VALUE,
+    _STRING_VALUE,
+    _STRING_KEY,
+    _DONE,
+) = range(9)
+_STRINGS = (_STRING_VALUE, _STRING_KEY)
+
+
+class _JsonChecker:
+    """Incremental JSON syntax check over text fed in chunks."""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._offset = 0
+        self._stack: list[str] = []
+        self._state = _VALUE
+
+    def feed(self, chunk: str) -> None:
+        buffer = self._buffer + chunk
+        limit = max(buffer.rfind(c) for c in _DELIMITERS) + 1
+        pos = self._scan(buffer, limit, final=False)
+        self._offset += pos
+        self._buffer = buffer[pos:]
+
+    def close(self) -> None:
+        pos = self._scan(self._buffer, len(self._buffer), final=True)
+        if self._state in _STRINGS:
+            raise self._error("Unterminated string", pos)
+        if self._state != _DONE:
+            raise self._error("Expecting value", pos)
+
+    def _error(self, message: str, pos: int) -> ValueError:
+        return ValueError(f"{message}: char {self._offset + pos}")
+
+    def _scan(self, buffer: str, limit: int, final: bool) -> int:
+        """Check ``buffer`` up to ``limit`` (strings up to its end) and return
+        how far it got; the rest is kept for the next chunk."""
+        stack = self._stack
+        state = self._state
+        pos = 0
+        while pos < limit or (state in _STRINGS and pos < len(buffer)):
+            if state in _STRINGS:
+                match = _STRING_REST_RE.match(buffer, pos)
+                pos = match.end()
+                if match.group(1) is None:
+                    partial = _PARTIAL_ESCAPE_RE.fullmatch(buffer, pos)
+                    if pos < len(buffer) and (final or partial is None):
+                        raise self._error("Invalid character or escape in string", pos)
+                    break
+                if state == _STRING_KEY:
+                    state = _COLON
+                else:
+                    state = _AFTER_VALUE if stack else _DONE
+                continue
+
+            pos = _WS_RE.match(buffer, pos, limit).end()
+            if pos == limit:
+                break
+            char = buffer[pos]
+
+            if state == _AFTER_VALUE:
+                top = stack[-1]
+                if char == ",":
+                    run = (_ARRAY_RUN_RE if top == "[" else _OBJECT_RUN_RE).match(
+                        buffer, pos, limit
+                    )
+                    if run is not None:
+                        pos = run.end()
+                        continue
+                    pos += 1
+                    state = _VALUE if top == "[" else _KEY
+                elif char == ("]" if top == "[" else "}"):
+                    stack.pop()
+                    pos += 1
+                    state = _AFTER_VALUE if stack else _DONE
+                else:
+                    raise self._error("Expecting ',' delimiter", pos)
+            elif state == _VALUE or state == _FIRST_VALUE:
+                pos += 1
+                if char == "]" and state == _FIRST_VALUE:
+                    stack.pop()
+                    state = _AFTER_VALUE if stack else _DONE
+                elif char == "{":
+                    stack.append("{")
+                    state = _FIRST_KEY
+                elif char == "[":
+                    stack.append("[")
+                    state = _FIRST_VALUE
+                elif char == '"':
+                    state = _STRING_VALUE
+                else:
+                    match = _LITERAL_RE.match(buffer, pos - 1, limit)
+                    if match is None:
+                        raise self._error("Expecting value", pos - 1)
+                    pos = match.end()
+                    state = _AFTER_VALUE if stack else _DONE
+            elif state == _KEY or state == _FIRST_KEY:
+                if char == "}" and state == _FIRST_KEY:
+                    stack.pop()
+                    state = _AFTER_VALUE if stack else _DONE
+                elif char == '"':
+                    state = _STRING_KEY
+                else:
+                    raise self._error(
+                        "Expecting property name enclosed in double quotes", pos
+                    )
+                pos += 1
+            elif state == _COLON:
+                if char != ":":
+                    raise self._error("Expecting ':' delimiter", pos)
+                pos += 1
+                state = _VALUE
+            else:
+                raise self._error("Extra data", pos)
+        self._state = state
+        return pos
+
+
+def validate_json_stream(stream: IO[str]) -> None:
+    """
+    Raise ``ValueError`` unless ``stream`` holds exactly one JSON document.
+
+    The stream is checked in chunks of ``CHUNK_SIZE`` without building the
+    document, so memory stays flat whatever the size of the result. The
+    stream is rewound afterwards so it can be sent.
+    """
+    checker = _JsonChecker()
+    try:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), ""):
+            checker.feed(chunk)
+        checker.close()
+    finally:
+        stream.seek(0)
+
+
+def iter_result_body(stream: IO[str]) -> Iterator[bytes]:
+    """Yield the ``{"resultJson": ...}`` request body for the JSON in ``stream``."""
+    yield _BODY_PREFIX
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), ""):
+        # encode_basestring_ascii quotes the chunk; strip the quotes since the
+        # chunks are concatenated into one JSON string.
+        yield json.encoder.encode_basestring_ascii(chunk)[1:-1].encode("ascii")
+    yield _BODY_SUFFIX
+
+
+def spool_stdin() -> IO[str]:
+    """
+    Copy stdin into a temporary file so it can be validated and then sent.
+
+    stdin is not seekable; spooling to disk keeps memory flat regardless of the
+    payload size.
+    """
+    spool = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+    shutil.copyfileobj(sys.stdin, spool, CHUNK_SIZE)
+    spool.seek(0)
+    return spool
+
+
+def stream_size(stream: IO[str]) -> int:
+    """Size in bytes of the file behind ``stream``."""
+    return os.fstat(stream.fileno()).st_size
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Gzip-compress a stream of byte chunks on the fly."""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,377 @@
+"""Validation of result payloads against per-workflow-type schemas.
+
+A result SARA cannot use (e.g. a fencilla result without ``isBreak``) would
+otherwise be uploaded and stored, and only fail in the workflow type's result
+handler after the workflow has exited. ``result`` and ``run`` therefore check
+the payload against ``schemas/<WORKFLOW_TYPE>.schema.json`` shipped with the
+package, or the same file in ``RESULT_SCHEMA_DIR``, and fail the step with the
+path of the first offending value. Workflow types without a schema are only
+checked for being valid JSON. A property is only ``required`` where the API's
+result class declares it non-nullable.
+
+Schemas are JSON Schema, restricted to the keywords SARA's result formats
+need: ``type``, ``properties``, ``required``, ``additionalProperties``
+(a boolean), ``items``, ``enum``, ``minimum``, ``maximum``, ``minLength``,
+``maxLength``, ``minItems``, ``maxItems`` and local ``$ref``s into ``$defs``.
+Other keywords are refused when the schema is compiled rather than silently
+ignored. Property names match case-insensitively, like the API's
+deserialization of results.
+
+A schema is compiled once into plain tuples and dicts, with its ``$ref``s
+resolved, and cached in ``RESULT_SCHEMA_CACHE_DIR`` with ``marshal``, keyed by
+a hash of the schema file, so later invocations load the compiled form
+instead of compiling again. When a schema puts no bounds on numbers, results
+are parsed with every number replaced by one shared placeholder, so checking
+e.g. a per-pixel temperature array does not build a float object per pixel.
+The result is still parsed whole, so unlike the syntax-only check of
+:func:`~workflow_notifier.result_payload.validate_json_stream` a result file
+checked against a schema is held in memory as Python objects while it is
+checked.
+"""
+
+import hashlib
+import json
+import logging
+import marshal
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Any, Optional
+
+from workflow_notifier.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_DIR = Path(__file__).parent / "schemas"
+
+# Bumped whenever the compiled form changes, so older cache files are ignored.
+_COMPILED_FORMAT = 1
+
+_TYPES = ("object", "array", "string", "number", "integer", "boolean", "null")
+_ANNOTATIONS = {
+    "$schema",
+    "$id",
+    "$comment",
+    "$defs",
+    "title",
+    "description",
+    "default",
+    "examples",
+}
+_BOUNDS = ("minimum", "maximum", "minLength", "maxLength", "minItems", "maxItems")
+
+
+class SchemaError(Exception):
+    """A schema file that cannot be compiled."""
+
+
+class ResultSchemaError(ValueError):
+    """A result that does not match its workflow type's schema."""
+
+    def __init__(self, path: str, message: str) -> None:
+        super().__init__(f"{path}: {message}")
+        self.path = path
+
+
+class _Number:
+    """Stands in for every number of a result whose schema has no numeric
+    constraints."""
+
+    def __repr__(self) -> str:
+        return "<number>"
+
+
+_NUMBER = _Number()
+
+
+def _number(_text: str) -> _Number:
+    return _NUMBER
+
+
+def compile_schema(schema: dict[str, Any]) -> dict[str, Any]:
+    """
+    Compile a JSON schema into the form :class:`ResultSchema` validates with.
+
+    Each node is a dict of ``types``, ``properties`` (keyed by lower-cased
+    name, with the declared name), ``required``, ``additional``, ``items``,
+    ``enum`` and the bounds that were given.
+    """
+    definitions = schema.get("$defs", {})
+    needs_numbers = False
+
+    def compile_node(node: Any, location: str, resolving: tuple[str, ...]) -> dict:
+        nonlocal needs_numbers
+        if not isinstance(node, dict):
+            raise SchemaError(f"{location}: expected a schema object")
+        if "$ref" in node:
+            ref = node["$ref"]
+            prefix = "#/$defs/"
+            if not isinstance(ref, str) or not ref.startswith(prefix):
+                raise SchemaError(f"{location}: only {prefix}... refs are supported")
+            name = ref[len(prefix) :]
+            if name not in definitions:
+                raise SchemaError(f"{location}: unknown $ref {ref}")
+            if name in resolving:
+                raise SchemaError(f"{location}: recursive $ref {ref}")
+            return compile_node(definitions[name], ref, resolving + (name,))
+
+        unknown = (
+            set(node)
+            - _ANNOTATIONS
+            - set(_BOUNDS)
+            - {
+                "type",
+                "properties",
+                "required",
+                "additionalProperties",
+                "items",
+                "enum",
+            }
+        )
+        if unknown:
+            raise SchemaError(f"{location}: unsupported keywords {sorted(unknown)}")
+
+        compiled: dict[str, Any] = {}
+        if "type" in node:
+            types = node["type"] if isinstance(node["type"], list) else [node["type"]]
+            if not types or any(t not in _TYPES for t in types):
+                raise SchemaError(f"{location}: invalid type {node['type']!r}")
+            compiled["types"] = tuple(types)
+            needs_numbers = needs_numbers or "integer" in types
+        if "properties" in node:
+            compiled["properties"] = {
+                name.lower(): (
+                    name,
+                    compile_node(child, f"{location}.{name}", resolving),
+                )
+                for name, child in node["properties"].items()
+            }
+        if "required" in node:
+            compiled["required"] = tuple(node["required"])
+        if "additionalProperties" in node:
+            if not isinstance(node["additionalProperties"], bool):
+                raise SchemaError(
+                    f"{location}: additionalProperties must be true or false"
+                )
+            compiled["additional"] = node["additionalProperties"]
+        if "items" in node:
+            compiled["items"] = compile_node(node["items"], f"{location}[]", resolving)
+        if "enum" in node:
+            compiled["enum"] = tuple(node["enum"])
+            needs_numbers = needs_numbers or any(
+                isinstance(v, (int, float)) and not isinstance(v, bool)
+                for v in node["enum"]
+            )
+        for bound in _BOUNDS:
+            if bound in node:
+                if isinstance(node[bound], bool) or not isinstance(
+                    node[bound], (int, float)
+                ):
+                    raise SchemaError(f"{location}: {bound} must be a number")
+                compiled[bound] = node[bound]
+        needs_numbers = needs_numbers or "minimum" in node or "maximum" in node
+        return compiled
+
+    root = compile_node(schema, "$", ())
+    return {"format": _COMPILED_FORMAT, "root": root, "numbers": needs_numbers}
+
+
+def _json_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float, _Number)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def _has_type(value: Any, types: tuple[str, ...]) -> bool:
+    kind = _json_type(value)
+    if kind in types:
+        return True
+    if kind == "number" and "integer" in types:
+        return isinstance(value, int) or (
+            isinstance(value, float) and value.is_integer()
+        )
+    return False
+
+
+def _child(path: str, key: str) -> str:
+    return f"{path}.{key}" if key.isidentifier() else f"{path}[{json.dumps(key)}]"
+
+
+def _check(node: dict[str, Any], value: Any, path: str) -> None:
+    types = node.get("types")
+    if types is not None and not _has_type(value, types):
+        raise ResultSchemaError(
+            path, f"expected {' or '.join(types)}, got {_json_type(value)}"
+        )
+    if "enum" in node and value not in node["enum"]:
+        raise ResultSchemaError(
+            path, f"must be one of {', '.join(json.dumps(v) for v in node['enum'])}"
+        )
+
+    if isinstance(value, dict):
+        _check_object(node, value, path)
+    elif isinstance(value, list):
+        _check_array(node, value, path)
+    elif isinstance(value, str):
+        if "minLength" in node and len(value) < node["minLength"]:
+            raise ResultSchemaError(
+                path, f"must be at least {node['minLength']} characters"
+            )
+        if "maxLength" in node and len(value) > node["maxLength"]:
+            raise ResultSchemaError(
+                path, f"must be at most {node['maxLength']} characters"
+            )
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        if "minimum" in node and value < node["minimum"]:
+            raise ResultSchemaError(
+                path, f"must be at least {node['minimum']}, got {value}"
+            )
+        if "maximum" in node and value > node["maximum"]:
+            raise ResultSchemaError(
+                path, f"must be at most {node['maximum']}, got {value}"
+            )
+
+
+def _check_object(node: dict[str, Any], value: dict[str, Any], path: str) -> None:
+    properties = node.get("properties", {})
+    required = node.get("required", ())
+    if not properties and not required and node.get("additional", True):
+        return
+    present = {key.lower() for key in value}
+    for name in required:
+        if name.lower() not in present:
+            raise ResultSchemaError(_child(path, name), "required property is missing")
+    for key, child in value.items():
+        declared = properties.get(key.lower())
+        if declared is not None:
+            _check(declared[1], child, _child(path, key))
+        elif not node.get("additional", True):
+            raise ResultSchemaError(_child(path, key), "unexpected property")
+
+
+def _check_array(node: dict[str, Any], value: list[Any], path: str) -> None:
+    if "minItems" in node and len(value) < node["minItems"]:
+        raise ResultSchemaError(path, f"must have at least {node['minItems']} items")
+    if "maxItems" in node and len(value) > node["maxItems"]:
+        raise ResultSchemaError(path, f"must have at most {node['maxItems']} items")
+    items = node.get("items")
+    if items is None:
+        return
+    if set(items) == {"types"}:
+        # Only a type to check: find the first offender without a call per
+        # item in the common case that there is none.
+        if all(_has_type(item, items["types"]) for item in value):
+            return
+    for index, item in enumerate(value):
+        _check(items, item, f"{path}[{index}]")
+
+
+class ResultSchema:
+    def __init__(self, workflow_type: str, compiled: dict[str, Any]) -> None:
+        self.workflow_type = workflow_type
+        self._root = compiled["root"]
+        self._needs_numbers = compiled["numbers"]
+
+    def validate(self, value: Any) -> None:
+        """Raise :class:`ResultSchemaError` unless ``value`` matches."""
+        _check(self._root, value, "$")
+
+    def validate_json(self, text: str) -> None:
+        """Parse ``text`` and validate it; invalid JSON raises ``ValueError``."""
+        self.validate(json.loads(text, **self._parse_options()))
+
+    def validate_stream(self, stream: IO[str]) -> None:
+        """Like :meth:`validate_json` for a file, which is rewound afterwards so
+        it can be sent. The file is parsed whole, not incrementally."""
+        try:
+            self.validate(json.load(stream, **self._parse_options()))
+        finally:
+            stream.seek(0)
+
+    def _parse_options(self) -> dict[str, Any]:
+        if self._needs_numbers:
+            return {}
+        return {
+            "parse_float": _number,
+            "parse_int": _number,
+            "parse_constant": _number,
+        }
+
+
+def _schema_path(workflow_type: str) -> Optional[Path]:
+    directories = [SCHEMA_DIR]
+    if settings.RESULT_SCHEMA_DIR is not None:
+        directories.insert(0, Path(settings.RESULT_SCHEMA_DIR))
+    for directory in directories:
+        path = directory / f"{workflow_type}.schema.json"
+        if path.is_file():
+            return path
+    return None
+
+
+def _load_compiled(path: Path) -> dict[str, Any]:
+    source = path.read_bytes()
+    digest = hashlib.sha256(source + str(_COMPILED_FORMAT).encode()).hexdigest()
+    cache_path = Path(settings.RESULT_SCHEMA_CACHE_DIR) / f"{digest}.marshal"
+    try:
+        with open(cache_path, "rb") as cache_file:
+            compiled = marshal.load(cache_file)
+        if isinstance(compiled, dict) and compiled.get("format") == _COMPILED_FORMAT:
+            return compiled
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    try:
+        compiled = compile_schema(json.loads(source))
+    except json.JSONDecodeError as exc:
+        raise SchemaError(f"{path}: not valid JSON: {exc}")
+    try:
+        os.makedirs(cache_path.parent, exist_ok=True)
+        # Written aside and renamed, so a concurrent reader never sees a
+        # partial file.
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp_file:
+            marshal.dump(compiled, tmp_file)
+        os.replace(tmp_path, cache_path)
+    except OSError as exc:
+        logger.warning(f"Could not cache compiled schema {path} ({exc})")
+    return compiled
+
+
+@lru_cache(maxsize=None)
+def result_schema(workflow_type: str) -> Optional[ResultSchema]:
+    """The schema results of ``workflow_type`` are validated against, if any."""
+    path = _schema_path(workflow_type)
+    if path is None:
+        return None
+    return ResultSchema(workflow_type, _load_compiled(path))
+
+
+def current_result_schema() -> Optional[ResultSchema]:
+    """
+    The schema for ``WORKFLOW_TYPE``, unless validation is turned off.
+
+    A shipped schema that cannot be loaded raises :class:`SchemaError`; the
+    tests compile every one of them. A broken schema from RESULT_SCHEMA_DIR is
+    logged instead and None returned, so that it does not keep results from
+    being reported.
+    """
+    if not settings.RESULT_SCHEMA_VALIDATION:
+        return None
+    try:
+        return result_schema(settings.WORKFLOW_TYPE)
+    except (SchemaError, OSError) as exc:
+        path = _schema_path(settings.WORKFLOW_TYPE)
+        if path is None or path.parent == SCHEMA_DIR:
+            raise SchemaError(f"Shipped result schema unusable: {exc}") from exc
+        logger.error(f"Result schema unusable, only checking JSON syntax: {exc}")
+        return None
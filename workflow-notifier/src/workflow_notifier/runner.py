@@ -0,0 +1,106 @@
+"""Child-process execution for the ``run`` command."""
+
+import logging
+import signal
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass
+from typing import IO, Optional
+
+logger = logging.getLogger(__name__)
+
+# Only the end of the command's stderr is kept for SARA's errorMessage; the
+# full stream is still passed through to the step's log.
+STDERR_TAIL_BYTES = 4096
+
+# Exit code used when the command cannot be started, matching the shell.
+COMMAND_NOT_FOUND_EXIT_CODE = 127
+
+
+@dataclass
+class CommandOutcome:
+    returncode: int
+    stdout: bytes
+    stderr_tail: str
+
+    @property
+    def exit_code(self) -> int:
+        """The exit code a shell would report: 128 + N for a command killed
+        by signal N, whose ``returncode`` is -N."""
+        return 128 - self.returncode if self.returncode < 0 else self.returncode
+
+    def describe_exit(self) -> str:
+        if self.returncode < 0:
+            try:
+                name = signal.Signals(-self.returncode).name
+            except ValueError:
+                name = f"signal {-self.returncode}"
+            return f"Command was killed by {name}"
+        return f"Command exited with status {self.returncode}"
+
+
+def run_command(command: list[str], capture_stdout: bool) -> CommandOutcome:
+    """
+    Run ``command`` to completion, streaming its stderr through to ours.
+
+    SIGTERM and SIGINT received while the command runs are forwarded to it, so
+    that Argo stopping the step stops the analysis rather than only the
+    notifier.
+    """
+    logger.info(f"Running command: {command}")
+    try:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE if capture_stdout else None,
+            stderr=subprocess.PIPE,
+        )
+    except OSError as exc:
+        logger.error(f"Could not start command {command}: {exc}")
+        return CommandOutcome(COMMAND_NOT_FOUND_EXIT_CODE, b"", str(exc))
+
+    tail = bytearray()
+    pump = threading.Thread(
+        target=_pump_stderr, args=(process.stderr, tail), daemon=True
+    )
+    pump.start()
+
+    previous_handlers = {
+        signum: signal.signal(signum, lambda s, _frame: process.send_signal(s))
+        for signum in (signal.SIGTERM, signal.SIGINT)
+        if threading.current_thread() is threading.main_thread()
+    }
+    try:
+        stdout = process.stdout.read() if process.stdout is not None else b""
+        returncode = process.wait()
+        pump.join()
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+
+    outcome = CommandOutcome(
+        returncode=returncode,
+        stdout=stdout,
+        stderr_tail=bytes(tail).decode("utf-8", errors="replace").strip(),
+    )
+    logger.info(outcome.describe_exit())
+    return outcome
+
+
+def _pump_stderr(stream: Optional[IO[bytes]], tail: bytearray) -> None:
+    if stream is None:
+        return
+    for chunk in iter(lambda: stream.read1(8192), b""):  # type: ignore[attr-defined]
+        _write_stderr(chunk)
+        tail.extend(chunk)
+        del tail[:-STDERR_TAIL_BYTES]
+
+
+def _write_stderr(chunk: bytes) -> None:
+    buffer = getattr(sys.stderr, "buffer", None)
+    if buffer is not None:
+        buffer.write(chunk)
+        buffer.flush()
+    else:
+        sys.stderr.write(chunk.decode("utf-8", errors="replace"))
+        sys.stderr.flush()
@@ -0,0 +1,218 @@
+"""Resident notifier accepting lifecycle events on a Unix domain socket.
+
+``notifier serve`` keeps one process per node or workflow pod, so the
+credential, access token and pooled HTTP connections stay warm, and an Argo
+step only has to write a line to the socket instead of starting Python.
+
+Clients write NDJSON events in the format of ``notifier batch`` and read one
+JSON reply per line: ``{"ok": true}`` once the event is queued, or
+``{"ok": false, "error": "..."}`` if it was rejected. Events are delivered by a
+fixed number of workers. When the queue is full the reply is held back until
+there is room again, so producers are slowed down instead of the daemon
+buffering without bound. Events for the same workflow are delivered one at a
+time in the order they were received.
+
+Progress events are coalesced per workflow (see ``workflow_notifier.progress``):
+the first is queued at once, later ones are held until the progress interval
+has passed, and one held back is replaced by a newer one or dropped when the
+workflow's exited event arrives. Held updates are queued when the daemon stops.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+from collections import Counter
+from typing import Any, Callable, Iterable, Optional
+
+from opentelemetry import metrics
+
+from workflow_notifier.batch import parse_event
+from workflow_notifier.progress import ProgressThrottle
+
+logger = logging.getLogger(__name__)
+
+meter = metrics.get_meter("workflow-notifier")
+event_counter = meter.create_counter(
+    "notification_daemon_event_count",
+    description="Events handled by the notifier daemon, by outcome",
+)
+
+
+class NotificationServer:
+    def __init__(
+        self,
+        socket_path: str,
+        deliver: Callable[[dict[str, Any]], None],
+        concurrency: int,
+        queue_size: int,
+        max_event_bytes: int,
+        progress_interval: float,
+    ) -> None:
+        self.socket_path = socket_path
+        self._deliver = deliver
+        self._concurrency = concurrency
+        self._queue_size = queue_size
+        self._max_event_bytes = max_event_bytes
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._workflow_locks: dict[str, asyncio.Lock] = {}
+        self._workflow_pending: Counter[str] = Counter()
+        self._progress: ProgressThrottle[dict[str, Any]] = ProgressThrottle(
+            progress_interval
+        )
+        self._progress_puts: set[asyncio.Task] = set()
+
+    async def run(self) -> None:
+        """Serve until :meth:`stop` is called or SIGTERM/SIGINT is received,
+        then deliver the events that are still queued."""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(self._queue_size)
+
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                self._loop.add_signal_handler(signum, self._stopping.set)
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(
+            self._handle_client, path=self.socket_path, limit=self._max_event_bytes
+        )
+        os.chmod(self.socket_path, 0o660)
+        workers = [
+            asyncio.create_task(self._worker()) for _ in range(self._concurrency)
+        ]
+        logger.info(
+            f"Notifier listening on {self.socket_path} with {self._concurrency} "
+            f"workers and room for {self._queue_size} queued events"
+        )
+
+        try:
+            await self._stopping.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            for workflow_id in self._progress.pending():
+                self._release_progress(workflow_id)
+            await asyncio.gather(*self._progress_puts)
+            logger.info(f"Delivering {self._queue.qsize()} queued events")
+            await self._queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            logger.info("Notifier stopped")
+
+    def stop(self) -> None:
+        """Ask :meth:`run` to finish; safe to call from any thread."""
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await self._reply(
+                        writer, ok=False, error="event exceeds the maximum size"
+                    )
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    event = parse_event(line.decode("utf-8"))
+                except (ValueError, UnicodeDecodeError) as exc:
+                    event_counter.add(1, {"outcome": "rejected"})
+                    await self._reply(writer, ok=False, error=str(exc))
+                    continue
+                if event["event"] == "Progress":
+                    self._offer_progress(event)
+                    await self._reply(writer, ok=True)
+                    continue
+                if event["event"] == "Exited":
+                    self._progress.discard(event["workflowId"])
+                # Blocks while the queue is full, which is the backpressure.
+                await self._queue.put(event)
+                event_counter.add(1, {"outcome": "queued"})
+                await self._reply(writer, ok=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _offer_progress(self, event: dict[str, Any]) -> None:
+        workflow_id = event["workflowId"]
+        delay = self._progress.offer(workflow_id, event)
+        if delay is None:
+            # Replaced an update that was still waiting for its interval.
+            event_counter.add(1, {"outcome": "coalesced"})
+        else:
+            assert self._loop is not None
+            self._loop.call_later(delay, self._release_progress, workflow_id)
+
+    def _release_progress(self, workflow_id: str) -> None:
+        event = self._progress.take(workflow_id)
+        if event is None:
+            return
+        # Not awaited here, so a full queue holds back the update but not the
+        # event loop.
+        task = asyncio.ensure_future(self._queue.put(event))
+        self._progress_puts.add(task)
+        task.add_done_callback(self._progress_puts.discard)
+        event_counter.add(1, {"outcome": "queued"})
+
+    @staticmethod
+    async def _reply(writer: asyncio.StreamWriter, ok: bool, error: str = "") -> None:
+        reply: dict[str, Any] = {"ok": ok}
+        if error:
+            reply["error"] = error
+        writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    async def _worker(self) -> None:
+        while True:
+            event = await self._queue.get()
+            workflow_id = event["workflowId"]
+            # Taken without awaiting in between, so a workflow's events acquire
+            # its lock in queue order.
+            lock = self._workflow_locks.setdefault(workflow_id, asyncio.Lock())
+            self._workflow_pending[workflow_id] += 1
+            try:
+                async with lock:
+                    await asyncio.to_thread(self._deliver, event)
+                event_counter.add(1, {"outcome": "delivered"})
+            except Exception as exc:
+                event_counter.add(1, {"outcome": "failed"})
+                logger.error(
+                    f"Could not deliver {event['event']} for workflow "
+                    f"{workflow_id}: {exc}"
+                )
+            finally:
+                self._workflow_pending[workflow_id] -= 1
+                if not self._workflow_pending[workflow_id]:
+                    del self._workflow_pending[workflow_id]
+                    del self._workflow_locks[workflow_id]
+                self._queue.task_done()
+
+
+def send_events(socket_path: str, events: Iterable[dict[str, Any]]) -> list[dict]:
+    """Send events to a running ``notifier serve`` and return its replies."""
+    replies = []
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as stream:
+            for event in events:
+                stream.write(json.dumps(event).encode("utf-8") + b"\n")
+                stream.flush()
+                replies.append(json.loads(stream.readline()))
+    return replies
@@ -0,0 +1,175 @@
+"""File-backed access-token cache shared between notifier invocations.
+
+Every Argo step runs the notifier as a new process, so the in-process caching
+done by ``azure-identity`` never gets a second hit and each lifecycle event
+performs a full token exchange against Entra ID. When ``TOKEN_CACHE_PATH``
+points at a location shared by those processes (an ``emptyDir`` mounted into
+the workflow pod, or a node-local ``hostPath``), the first process stores the
+token and later ones reuse it until it is about to expire.
+
+The cache file is guarded by an exclusive ``flock`` on a sibling ``.lock``
+file. The lock is held while a missing or stale token is acquired, so
+processes racing on a cold cache perform a single exchange between them.
+Any I/O problem with the cache degrades to acquiring a token directly.
+
+A long-lived :class:`~workflow_notifier.client.NotifierClient` keeps its tokens
+in a :class:`MemoryTokenCache` in front of the file, so that notifications sent
+from one process do not lock and read the file every time.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# How long to wait for another process holding the cache lock before giving up
+# on the cache and acquiring a token directly.
+_LOCK_TIMEOUT_SECONDS = 10.0
+_LOCK_POLL_INTERVAL_SECONDS = 0.05
+
+
+class CachedToken(NamedTuple):
+    token: str
+    expires_on: int
+
+
+def cache_key(*parts: str) -> str:
+    """Derive an opaque cache key from the identity and scope a token is for."""
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    def __init__(self, path: str, refresh_margin_seconds: int) -> None:
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.refresh_margin_seconds = refresh_margin_seconds
+
+    def get_or_acquire(
+        self, key: str, acquire: Callable[[], CachedToken]
+    ) -> CachedToken:
+        """
+        Return a cached token for ``key`` that is valid for at least the refresh
+        margin, otherwise call ``acquire`` and store its result.
+
+        Exceptions raised by ``acquire`` propagate unchanged; failures to read,
+        lock or write the cache only cost the cache hit.
+        """
+        try:
+            with self._locked():
+                cached = self._read().get(key)
+                if cached is not None and self._is_fresh(cached):
+                    logger.info("Using cached access token")
+                    return cached
+
+                token = acquire()
+                self._write(key, token)
+                return token
+        except _CacheUnavailable as exc:
+            logger.warning(f"Token cache unavailable ({exc}); acquiring directly")
+            return acquire()
+
+    def _is_fresh(self, token: CachedToken) -> bool:
+        return token.expires_on - self.refresh_margin_seconds > time.time()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError as exc:
+            raise _CacheUnavailable(exc) from exc
+
+        try:
+            deadline = time.monotonic() + _LOCK_TIMEOUT_SECONDS
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise _CacheUnavailable(
+                            f"timed out waiting for lock on {self.lock_path}"
+                        )
+                    time.sleep(_LOCK_POLL_INTERVAL_SECONDS)
+                except OSError as exc:
+                    raise _CacheUnavailable(exc) from exc
+            yield
+        finally:
+            os.close(fd)
+
+    def _read(self) -> dict[str, CachedToken]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                raw = json.load(f)
+            return {
+                key: CachedToken(entry["token"], int(entry["expires_on"]))
+                for key, entry in raw.items()
+            }
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+            logger.warning(f"Ignoring unreadable token cache {self.path}: {exc}")
+            return {}
+
+    def _write(self, key: str, token: CachedToken) -> None:
+        now = time.time()
+        entries = {k: v for k, v in self._read().items() if v.expires_on > now}
+        entries[key] = token
+        directory = os.path.dirname(self.path) or "."
+        tmp_path: Optional[str] = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".token-cache-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        k: {"token": v.token, "expires_on": v.expires_on}
+                        for k, v in entries.items()
+                    },
+                    f,
+                )
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            logger.warning(f"Could not write token cache {self.path}: {exc}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+
+class MemoryTokenCache:
+    """
+    Tokens held in memory by one process. Thread-safe: the lock is held while a
+    missing or stale token is acquired, so threads racing on a cold cache
+    perform a single exchange between them.
+    """
+
+    def __init__(self, refresh_margin_seconds: int) -> None:
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._tokens: dict[str, CachedToken] = {}
+        self._lock = threading.Lock()
+
+    def get_or_acquire(
+        self, key: str, acquire: Callable[[], CachedToken]
+    ) -> CachedToken:
+        """Like :meth:`TokenCache.get_or_acquire`."""
+        with self._lock:
+            cached = self._tokens.get(key)
+            if (
+                cached is not None
+                and cached.expires_on - self.refresh_margin_seconds > time.time()
+            ):
+                return cached
+            token = acquire()
+            self._tokens[key] = token
+            return token
+
+
+class _CacheUnavailable(Exception):
+    pass
@@ -0,0 +1,211 @@
+"""HTTP transport to SARA: a pooled session and bounded retry for PUTs.
+
+The notification endpoints are idempotent PUTs, so a request that failed with
+a connection error, a timeout or one of ``RETRYABLE_STATUS_CODES`` (typically
+SARA pods restarting during a rollout) is sent again after an exponential
+backoff with full jitter, or after the delay requested by ``Retry-After``.
+
+Every attempt is a client span, and its W3C trace context is sent along in the
+``traceparent`` header so SARA's request spans join the notifier's trace.
+"""
+
+import contextvars
+import logging
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Optional
+
+import requests
+from opentelemetry import metrics, trace
+from opentelemetry.trace import SpanKind, StatusCode
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+from requests.adapters import HTTPAdapter
+
+from workflow_notifier.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+meter = metrics.get_meter("workflow-notifier")
+attempt_counter = meter.create_counter(
+    "notification_http_attempt_count",
+    description="HTTP requests sent to SARA, by response status or error",
+)
+retry_counter = meter.create_counter(
+    "notification_http_retry_count",
+    description="HTTP requests to SARA that were retried, by reason",
+)
+
+tracer = trace.get_tracer("workflow-notifier")
+_propagator = TraceContextTextMapPropagator()
+
+# Replaced in tests so retries do not actually wait.
+_sleep = time.sleep
+
+
+def new_session() -> requests.Session:
+    """
+    HTTP session with a pool of ``HTTP_POOL_MAXSIZE`` keep-alive connections.
+
+    Retries are done by :func:`put_with_retry` rather than by urllib3, so the
+    adapter itself never retries.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """
+    Shared HTTP session, so that notifications sent from one process (e.g. by
+    ``flush``) reuse pooled keep-alive connections to SARA.
+    """
+    return new_session()
+
+
+# Session of the NotifierClient sending the current notification.
+_current_session: contextvars.ContextVar[Optional[requests.Session]] = (
+    contextvars.ContextVar("current_session", default=None)
+)
+
+
+@contextmanager
+def use_session(session: requests.Session) -> Iterator[None]:
+    """Send the requests made inside the block with ``session``."""
+    token = _current_session.set(session)
+    try:
+        yield
+    finally:
+        _current_session.reset(token)
+
+
+def current_session() -> requests.Session:
+    """The session set by :func:`use_session`, or else the shared one."""
+    return _current_session.get() or get_session()
+
+
+def put_with_retry(
+    url: str,
+    headers: dict[str, str],
+    request_kwargs: Callable[[], dict[str, Any]],
+) -> requests.Response:
+    """
+    Send a PUT request, retrying transient failures, and raise on non-2xx.
+
+    ``request_kwargs`` is called once per attempt to build the body arguments
+    passed to ``requests``, so streamed bodies can be recreated for a retry.
+    """
+    attempts = settings.HTTP_MAX_RETRIES + 1
+    timeout = (
+        settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        settings.HTTP_READ_TIMEOUT_SECONDS,
+    )
+
+    for attempt in range(1, attempts + 1):
+        try:
+            response = _put_attempt(url, headers, timeout, request_kwargs(), attempt)
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            reason = type(exc).__name__
+            attempt_counter.add(1, {"status": reason})
+            if attempt == attempts:
+                raise
+            delay = _backoff(attempt)
+            logger.warning(f"PUT {url} failed ({exc}); retrying in {delay:.2f}s")
+        else:
+            attempt_counter.add(1, {"status": str(response.status_code)})
+            if (
+                response.status_code not in RETRYABLE_STATUS_CODES
+                or attempt == attempts
+            ):
+                response.raise_for_status()
+                return response
+            reason = f"status_{response.status_code}"
+            retry_after = _retry_after_seconds(response)
+            delay = retry_after if retry_after is not None else _backoff(attempt)
+            response.close()
+            logger.warning(
+                f"PUT {url} returned {response.status_code}; "
+                f"retrying in {delay:.2f}s"
+            )
+
+        retry_counter.add(1, {"reason": reason})
+        _sleep(delay)
+
+    raise AssertionError("unreachable")
+
+
+def _put_attempt(
+    url: str,
+    headers: dict[str, str],
+    timeout: tuple[float, float],
+    kwargs: dict[str, Any],
+    attempt: int,
+) -> requests.Response:
+    """Send one PUT in a client span, with the span's trace context injected."""
+    attributes: dict[str, Any] = {"http.request.method": "PUT", "url.full": url}
+    if attempt > 1:
+        attributes["http.request.resend_count"] = attempt - 1
+    with tracer.start_as_current_span(
+        "PUT", kind=SpanKind.CLIENT, attributes=attributes
+    ) as span:
+        carrier = dict(headers)
+        _propagator.inject(carrier)
+        try:
+            response = current_session().put(
+                url, headers=carrier, timeout=timeout, **kwargs
+            )
+        except requests.RequestException as exc:
+            span.set_attribute("error.type", type(exc).__name__)
+            raise
+        span.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code >= 400:
+            span.set_attribute("error.type", str(response.status_code))
+            span.set_status(StatusCode.ERROR)
+        return response
+
+
+def is_transient_error(exc: requests.exceptions.RequestException) -> bool:
+    """Whether a failed request may succeed later without any change."""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = exc.response
+    return response is not None and (
+        response.status_code in RETRYABLE_STATUS_CODES or response.status_code >= 500
+    )
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given 1-based attempt."""
+    ceiling = min(
+        settings.HTTP_RETRY_BACKOFF_MAX_SECONDS,
+        settings.HTTP_RETRY_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1),
+    )
+    return random.uniform(0, ceiling)
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Parse ``Retry-After`` (seconds or HTTP date), capped at the backoff max."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), settings.HTTP_RETRY_BACKOFF_MAX_SECONDS)
@@ -3,9 +3,45 @@ fail when no `.env` is present (matches CI behaviour).
 """
 
 import os
+from typing import Iterator
 
 os.environ.setdefault("SARA_SERVER_URL", "http://sara-test.local")
 os.environ.setdefault("TENANT_ID", "test-tenant")
 os.environ.setdefault("NOTIFIER_CLIENT_ID", "test-client-id")
 os.environ.setdefault("NOTIFIER_CLIENT_SECRET", "test-client-secret")
 os.environ.setdefault("SARA_APP_REG_SCOPE", "api://test/.default")
+
+from pathlib import Path  # noqa: E402
+from unittest.mock import MagicMock, patch  # noqa: E402
+
+import pytest  # noqa: E402
+import requests_mock  # noqa: E402
+
+from mocks.sara_mock import SaraMock  # noqa: E402
+from workflow_notifier.config.settings import settings  # noqa: E402
+
+
+@pytest.fixture
+def fake_token() -> Iterator[MagicMock]:
+    """Bypass Entra ID: every access token is ``fake-token``. Modules sending
+    notifications use it with ``pytestmark = pytest.mark.usefixtures(...)``."""
+    with patch(
+        "workflow_notifier.notifications.get_access_token", return_value="fake-token"
+    ) as get_token:
+        yield get_token
+
+
+@pytest.fixture
+def sara(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[SaraMock]:
+    """A running SaraMock that SARA_SERVER_URL points at."""
+    monkeypatch.setattr(settings, "PROGRESS_STATE_DIR", str(tmp_path / "progress"))
+    mock = SaraMock()
+    with mock.serve() as base_url:
+        monkeypatch.setattr(settings, "SARA_SERVER_URL", base_url)
+        yield mock
+
+
+@pytest.fixture
+def mock_http() -> Iterator[requests_mock.Mocker]:
+    with requests_mock.Mocker() as m:
+        yield m
@@ -0,0 +1,286 @@
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from mocks.argo_workflow_mock import (
+    CallbackReport,
+    LogNormal,
+    Scenario,
+    Scheduler,
+    Simulation,
+    WorkflowRegistry,
+    WorkflowType,
+    create_app,
+    load_workflow_types,
+)
+from mocks.result_generators import GENERATORS
+from mocks.sara_mock import SaraMock
+from workflow_notifier.config.settings import settings
+
+
+def test_scheduler_runs_callbacks_in_due_order():
+    scheduler = Scheduler(workers=1)
+    calls: list[str] = []
+    done = threading.Event()
+
+    scheduler.call_later(0.2, lambda: (calls.append("late"), done.set()))
+    scheduler.call_later(0.1, calls.append, "middle")
+    scheduler.call_later(0.0, calls.append, "early")
+    assert done.wait(timeout=5)
+    scheduler.shutdown()
+
+    assert calls == ["early", "middle", "late"]
+
+
+def _mock_threads() -> int:
+    return sum(t.name.startswith("argo-mock") for t in threading.enumerate())
+
+
+def test_thousands_of_workflows_use_a_bounded_number_of_threads(monkeypatch):
+    sara = SaraMock()
+    workflow_type = WorkflowType(
+        "rain-drop", lambda rng: {"rain": True}, LogNormal(median=0.05, sigma=0.5)
+    )
+    workflow_ids = [uuid4() for _ in range(1000)]
+
+    with (
+        patch("workflow_notifier.notifications.get_access_token", return_value="token"),
+        sara.serve() as base_url,
+    ):
+        monkeypatch.setattr(settings, "SARA_SERVER_URL", base_url)
+        scheduler = Scheduler(workers=8)
+        simulation = Simulation(scheduler, seed=1)
+        for workflow_id in workflow_ids:
+            simulation.start(workflow_type, workflow_id)
+        peak_threads = _mock_threads()
+
+        deadline = time.monotonic() + 120
+        while simulation.stats()["completed"] < len(workflow_ids):
+            assert time.monotonic() < deadline, simulation.stats()
+            peak_threads = max(peak_threads, _mock_threads())
+            time.sleep(0.05)
+        scheduler.shutdown()
+
+    # The workers plus the timer thread.
+    assert peak_threads <= 8 + 1
+    assert simulation.stats()["notificationFailures"] == 0
+    events = {(n.workflow_id, n.event) for n in sara.received}
+    assert len(events) == 3 * len(workflow_ids)
+    by_workflow = {}
+    for notification in sara.received:
+        by_workflow.setdefault(notification.workflow_id, []).append(notification.event)
+    assert all(e == ["started", "result", "exited"] for e in by_workflow.values())
+
+
+def test_trigger_routes_start_simulated_workflows():
+    started = []
+
+    class RecordingSimulation:
+        def start(self, workflow_type, workflow_id):
+            started.append((workflow_type.name, workflow_id))
+
+    client = create_app(RecordingSimulation(), WorkflowRegistry()).test_client()
+    workflow_id = uuid4()
+
+    response = client.post("/trigger-fencilla", json={"workflowId": str(workflow_id)})
+    missing = client.post("/trigger-fencilla", json={})
+    unknown = client.post("/trigger-unknown", json={"workflowId": str(workflow_id)})
+
+    assert response.status_code == 200
+    assert missing.status_code == 400
+    assert unknown.status_code == 404
+    assert started == [("fencilla", workflow_id)]
+
+
+_mtime_bump = itertools.count(step=10**9)
+
+
+def _write_registry(path: Path, body: str) -> None:
+    path.write_text(body)
+    # Make each write visible even on filesystems with coarse timestamps.
+    mtime = time.time_ns() + next(_mtime_bump)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_registry_reloads_when_the_file_changes(tmp_path: Path):
+    path = tmp_path / "workflow_types.toml"
+    _write_registry(path, '[rain-drop]\ngenerator = "rain"\n')
+    registry = WorkflowRegistry(path)
+    assert registry.get("/trigger-rain-drop").name == "rain-drop"
+
+    _write_registry(
+        path,
+        '[new-analysis]\ngenerator = "records"\ntrigger_path = "/trigger-new"\n'
+        "failure_rate = 0.5\nlatency = { median = 0.1, sigma = 0.2 }\n"
+        "params = { count = 3 }\n",
+    )
+    new_analysis = registry.get("/trigger-new")
+
+    assert registry.get("/trigger-rain-drop") is None
+    assert new_analysis.failure_rate == 0.5
+    assert new_analysis.latency == LogNormal(median=0.1, sigma=0.2)
+    assert len(new_analysis.result(random.Random(0))["records"]) == 3
+
+    _write_registry(path, '[broken]\ngenerator = "records"\nparams = { nope = 1 }\n')
+    assert registry.get("/trigger-new") is new_analysis
+
+
+def test_registry_rejects_unknown_generators(tmp_path: Path):
+    path = tmp_path / "workflow_types.toml"
+    path.write_text('[cloe]\ngenerator = "oil"\n')
+
+    with pytest.raises(ValueError, match="unknown generator 'oil'"):
+        load_workflow_types(path)
+
+
+def test_generators_scale_to_large_payloads():
+    result = GENERATORS["thermal"](random.Random(0), width=640, height=512)
+
+    assert len(json.dumps(result)) > 1024 * 1024
+    celsius = result["thermalImage"]["celsius"]
+    assert result["temperature"] == max(max(row) for row in celsius)
+
+
+def test_default_registry_covers_sara_trigger_urls():
+    workflow_types = WorkflowRegistry().workflow_types()
+
+    assert {t.trigger_path for t in workflow_types} >= {
+        "/trigger-anonymizer",
+        "/trigger-rain-drop",
+        "/trigger-fencilla",
+        "/trigger-constant-level-oiler-estimator",
+        "/trigger-thermal-reading",
+        "/trigger-utilities",
+    }
+
+
+def _run(simulation: Simulation, workflow_type: WorkflowType, count: int) -> None:
+    for _ in range(count):
+        simulation.start(workflow_type, uuid4())
+    deadline = time.monotonic() + 60
+    while simulation.stats()["completed"] < count:
+        assert time.monotonic() < deadline, simulation.stats()
+        time.sleep(0.02)
+
+
+def test_fault_scenario_shapes_the_callbacks_sara_receives(monkeypatch):
+    sara = SaraMock()
+    workflow_type = WorkflowType(
+        "rain-drop", lambda rng: {"rain": True}, LogNormal(median=0.01)
+    )
+    scenario = Scenario(
+        failure_rate=0.2,
+        timeout_rate=0.1,
+        timeout_seconds=0.01,
+        drop_rate=0.05,
+        duplicate_rate=0.05,
+        reorder_rate=0.2,
+        result_bytes=LogNormal(median=4096),
+    )
+
+    with (
+        patch("workflow_notifier.notifications.get_access_token", return_value="token"),
+        sara.serve() as base_url,
+    ):
+        monkeypatch.setattr(settings, "SARA_SERVER_URL", base_url)
+        scheduler = Scheduler(workers=8)
+        simulation = Simulation(scheduler, seed=3, scenario=scenario)
+        _run(simulation, workflow_type, 300)
+        scheduler.shutdown()
+
+    stats = simulation.stats()
+    faults = stats["faults"]
+    assert all(faults[f] > 0 for f in ("failed", "timedOut", "dropped", "reordered"))
+    assert faults["duplicated"] > 0
+    sent = sum(summary["count"] for summary in stats["callbacks"].values())
+    assert (
+        sent
+        == len(sara.received)
+        == 3 * 300
+        - faults["failed"]
+        - faults["timedOut"]
+        - faults["dropped"]
+        + faults["duplicated"]
+    )
+
+    failed = [
+        n.body["errorMessage"]
+        for n in sara.received
+        if n.event == "exited" and n.body["exitStatus"] == "Failed"
+    ]
+    assert "Simulated failure" in failed
+    assert "Simulated timeout after 0.01s" in failed
+    by_workflow: dict[str, list[str]] = {}
+    for notification in sara.received:
+        by_workflow.setdefault(notification.workflow_id, []).append(notification.event)
+    assert any(
+        [e for e in events if e != "started"][:2] == ["exited", "result"]
+        for events in by_workflow.values()
+    )
+    results = [n for n in sara.received if n.event == "result"]
+    assert all(len(n.body["resultJson"]) == 4096 for n in results)
+
+
+def test_callback_report_summarises_latency_and_errors():
+    report = CallbackReport()
+    for millis in range(1, 101):
+        report.record("result", millis / 1000, "ok" if millis % 10 else "http_409")
+
+    summary = report.summary()["result"]
+
+    assert summary["count"] == 100
+    assert summary["errors"] == 10
+    assert summary["errorRate"] == 0.1
+    assert summary["p50Ms"] == 51.0
+    assert summary["p99Ms"] == summary["maxMs"] == 100.0
+    assert summary["outcomes"] == {"ok": 90, "http_409": 10}
+
+
+def test_failed_callbacks_are_reported_by_status(monkeypatch):
+    sara = SaraMock()
+    workflow_type = WorkflowType("rain-drop", lambda rng: {}, LogNormal(median=0.0))
+
+    with (
+        patch("workflow_notifier.notifications.get_access_token", return_value="token"),
+        sara.serve() as base_url,
+    ):
+        monkeypatch.setattr(settings, "SARA_SERVER_URL", base_url + "/missing")
+        scheduler = Scheduler(workers=2)
+        simulation = Simulation(scheduler, seed=1)
+        _run(simulation, workflow_type, 2)
+        scheduler.shutdown()
+
+    callbacks = simulation.stats()["callbacks"]
+    assert callbacks["started"]["outcomes"] == {"http_404": 2}
+    assert callbacks["exited"]["errorRate"] == 1.0
+
+
+def test_bursts_start_workflows_on_interval_boundaries():
+    started_at: list[float] = []
+
+    class RecordingScheduler:
+        pending = 0
+        max_lag_seconds = 0.0
+
+        def call_later(self, delay, callback, *args):
+            started_at.append(time.time() + delay)
+
+    simulation = Simulation(
+        RecordingScheduler(), seed=1, scenario=Scenario(burst_interval_seconds=5.0)
+    )
+    workflow_type = WorkflowType(
+        "rain-drop", lambda rng: {}, LogNormal(median=2.0, sigma=1.0)
+    )
+    for _ in range(50):
+        simulation.start(workflow_type, uuid4())
+
+    assert all(abs(t / 5.0 - round(t / 5.0)) < 1e-3 for t in started_at)
+    assert len({round(t / 5.0) for t in started_at}) < 50
@@ -0,0 +1,125 @@
+import json
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+import requests_mock
+from typer.testing import CliRunner
+
+from workflow_notifier.config.settings import settings
+from workflow_notifier.idempotency import idempotency_key
+from workflow_notifier.notifier import app
+
+runner = CliRunner()
+BATCH_URL = f"{settings.workflow_base_url}/batch"
+
+
+pytestmark = pytest.mark.usefixtures("fake_token")
+
+
+def _mock_batch(mock_http: requests_mock.Mocker, not_found=()) -> list[list[dict]]:
+    batches: list[list[dict]] = []
+
+    def callback(request, context):
+        batches.append(json.loads(b"".join(request.body)))
+        return {"applied": len(batches[-1]), "notFound": list(not_found)}
+
+    mock_http.put(BATCH_URL, json=callback)
+    return batches
+
+
+def _write_events(path: Path, events: list[dict]) -> Path:
+    path.write_text("\n".join(json.dumps(e) for e in events) + "\n")
+    return path
+
+
+def test_events_are_sent_in_chunks(mock_http, tmp_path: Path):
+    batches = _mock_batch(mock_http)
+    ids = [str(uuid4()) for _ in range(5)]
+    events_file = _write_events(
+        tmp_path / "events.ndjson",
+        [{"workflowId": i, "event": "started"} for i in ids],
+    )
+
+    result = runner.invoke(app, ["batch", str(events_file), "--chunk-size", "2"])
+
+    assert result.exit_code == 0
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert [e["workflowId"] for b in batches for e in b] == ids
+
+
+def test_events_are_converted_to_sara_format(mock_http):
+    batches = _mock_batch(mock_http)
+    workflow_id = str(uuid4())
+    lines = [
+        {"workflowId": workflow_id, "event": "started", "argoWorkflowName": "wf-1"},
+        {"workflowId": workflow_id, "event": "result", "resultJson": '{"rain": 1}'},
+        {
+            "workflowId": workflow_id,
+            "event": "exited",
+            "exitStatus": "Failed",
+            "errorMessage": "boom",
+        },
+    ]
+
+    result = runner.invoke(
+        app, ["batch"], input="\n".join(json.dumps(line) for line in lines)
+    )
+
+    assert result.exit_code == 0
+    keys = [
+        idempotency_key(UUID(workflow_id), "started"),
+        idempotency_key(UUID(workflow_id), "result"),
+        idempotency_key(UUID(workflow_id), "exited", "Failed"),
+    ]
+    assert batches == [
+        [
+            {
+                "workflowId": workflow_id,
+                "event": "Started",
+                "argoWorkflowName": "wf-1",
+                "idempotencyKey": keys[0],
+            },
+            {
+                "workflowId": workflow_id,
+                "event": "Result",
+                "resultJson": '{"rain": 1}',
+                "idempotencyKey": keys[1],
+            },
+            {
+                "workflowId": workflow_id,
+                "event": "Exited",
+                "exitStatus": "Failed",
+                "errorMessage": "boom",
+                "idempotencyKey": keys[2],
+            },
+        ]
+    ]
+
+
+def test_invalid_line_rejects_whole_batch(mock_http, tmp_path: Path):
+    events_file = _write_events(
+        tmp_path / "events.ndjson",
+        [
+            {"workflowId": str(uuid4()), "event": "started"},
+            {"workflowId": str(uuid4()), "event": "exited"},
+        ],
+    )
+
+    result = runner.invoke(app, ["batch", str(events_file)])
+
+    assert result.exit_code == 2
+    assert "line 2" in result.output
+    assert not mock_http.called
+
+
+def test_unknown_workflows_fail_the_command(mock_http, tmp_path: Path):
+    unknown = str(uuid4())
+    _mock_batch(mock_http, not_found=[unknown])
+    events_file = _write_events(
+        tmp_path / "events.ndjson", [{"workflowId": unknown, "event": "started"}]
+    )
+
+    result = runner.invoke(app, ["batch", str(events_file)])
+
+    assert result.exit_code == 1
@@ -0,0 +1,46 @@
+from benchmarks.run import find_regressions, find_slowdowns, run_benchmarks
+
+
+def test_inproc_benchmark_reports_summary():
+    results = run_benchmarks(["inproc"], iterations=2, scenario_names=["exited"])
+
+    summary = results["inproc"]["exited"]
+    assert set(summary) == {"p50_ms", "p95_ms", "p99_ms", "wire_bytes"}
+    assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+    assert summary["wire_bytes"] == len('{"exitStatus": "Succeeded"}')
+
+
+def test_regressions_beyond_tolerance_are_reported():
+    baseline = {
+        "cold": {"exited": {"p50_ms": 100.0, "p99_ms": 100.0, "wire_bytes": 27}}
+    }
+    results = {
+        "cold": {
+            "exited": {"p50_ms": 120.0, "p99_ms": 500.0, "wire_bytes": 40},
+            "started": {"p50_ms": 999.0, "wire_bytes": 0},
+        }
+    }
+
+    regressions = find_regressions(results, baseline, tolerance=0.25)
+
+    assert regressions == ["cold/exited wire_bytes: 40 > 33.8 (baseline 27)"]
+
+
+def test_only_slowdowns_beyond_tolerance_and_floor_are_reported():
+    baseline = {
+        "inproc": {
+            "exited": {"p50_ms": 5.0, "p95_ms": 6.0},
+            "result_large": {"p50_ms": 280.0, "p95_ms": 300.0},
+        }
+    }
+    results = {
+        "inproc": {
+            "exited": {"p50_ms": 9.0, "p95_ms": 25.0, "wire_bytes": 27},
+            "result_large": {"p50_ms": 400.0, "p95_ms": 500.0, "wire_bytes": 9},
+        }
+    }
+
+    slowdowns = find_slowdowns(results, baseline, tolerance=0.5, floor_ms=20)
+
+    assert slowdowns == ["inproc/result_large p95_ms: 500.0 > 450.0 (baseline 300.0)"]
+    assert find_regressions(results, baseline, tolerance=0.25) == []
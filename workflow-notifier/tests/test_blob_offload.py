@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from typer.testing import CliRunner
+
+from mocks.blob_storage_mock import BlobStorageMock
+from mocks.sara_mock import SaraMock
+from workflow_notifier.blob_offload import BlobLocation, result_location
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifier import app
+
+runner = CliRunner()
+
+OUTPUT = "saradevstore/results/inspections/42/image.jpg"
+
+
+pytestmark = pytest.mark.usefixtures("fake_token")
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    mock = BlobStorageMock()
+    with mock.serve() as base_url:
+        monkeypatch.setattr(settings, "RESULT_BLOB_ENDPOINT", base_url + "/{account}")
+        monkeypatch.setattr(settings, "RESULT_BLOB_OFFLOAD_MIN_BYTES", 1024)
+        yield mock
+
+
+def _large_result() -> str:
+    return json.dumps({"temperatures": [20.5] * 1000})
+
+
+def test_large_result_from_file_is_uploaded_and_referenced(
+    sara: SaraMock, storage: BlobStorageMock, tmp_path: Path
+):
+    workflow_id = uuid4()
+    payload = _large_result()
+    result_file = tmp_path / "result.json"
+    result_file.write_text(payload)
+
+    result = runner.invoke(
+        app,
+        [
+            "result",
+            str(workflow_id),
+            "--from-file",
+            str(result_file),
+            "--output-blob-location",
+            OUTPUT,
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    blob_name = f"inspections/42/{workflow_id}.result.json"
+    assert storage.blobs[f"saradevstore/results/{blob_name}"] == payload.encode()
+    [received] = sara.received
+    assert received.body == {
+        "resultBlobStorageLocation": {
+            "storageAccount": "saradevstore",
+            "blobContainer": "results",
+            "blobName": blob_name,
+        }
+    }
+
+
+def test_large_inline_result_is_uploaded(
+    sara: SaraMock, storage: BlobStorageMock, fake_token
+):
+    workflow_id = uuid4()
+    payload = _large_result()
+
+    result = runner.invoke(
+        app,
+        ["result", str(workflow_id), payload, "--output-blob-location", OUTPUT],
+    )
+
+    assert result.exit_code == 0, result.output
+    location = result_location(BlobLocation.parse(OUTPUT), workflow_id)
+    assert storage.blobs[str(location)] == payload.encode()
+    fake_token.assert_any_call(["https://storage.azure.com/.default"])
+    assert "resultBlobStorageLocation" in sara.received[0].body
+
+
+def test_small_result_is_sent_inline(sara: SaraMock, storage: BlobStorageMock):
+    payload = '{"isBreak": false}'
+
+    result = runner.invoke(
+        app, ["result", str(uuid4()), payload, "--output-blob-location", OUTPUT]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert storage.blobs == {}
+    assert sara.received[0].body == {"resultJson": payload}
+
+
+def test_result_without_output_location_is_sent_inline(
+    sara: SaraMock, storage: BlobStorageMock
+):
+    payload = _large_result()
+
+    result = runner.invoke(app, ["result", str(uuid4()), payload])
+
+    assert result.exit_code == 0, result.output
+    assert storage.blobs == {}
+    assert sara.received[0].body == {"resultJson": payload}
+
+
+def test_failed_upload_falls_back_to_inline(sara: SaraMock, monkeypatch):
+    # Nothing listens on port 9, so the upload fails to connect.
+    monkeypatch.setattr(
+        settings, "RESULT_BLOB_ENDPOINT", "http://127.0.0.1:9/{account}"
+    )
+    monkeypatch.setattr(settings, "RESULT_BLOB_OFFLOAD_MIN_BYTES", 1024)
+    monkeypatch.setattr(settings, "HTTP_MAX_RETRIES", 0)
+    payload = _large_result()
+
+    result = runner.invoke(
+        app, ["result", str(uuid4()), payload, "--output-blob-location", OUTPUT]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert sara.received[0].body == {"resultJson": payload}
+
+
+def test_malformed_output_location_is_rejected():
+    result = runner.invoke(
+        app, ["result", str(uuid4()), "{}", "--output-blob-location", "account/only"]
+    )
+
+    assert result.exit_code == 2
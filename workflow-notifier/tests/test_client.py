@@ -0,0 +1,146 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+import requests
+
+from mocks.sara_mock import SaraMock
+from workflow_notifier.client import AsyncNotifierClient, NotifierClient
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifications import NotifierError, get_access_token
+
+
+@pytest.fixture
+def credential(monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_CACHE_PATH", None)
+    credential = MagicMock()
+    credential.get_token.return_value = MagicMock(
+        token="from-entra", expires_on=int(time.time()) + 3600
+    )
+    with patch(
+        "workflow_notifier.notifications._get_credential", return_value=credential
+    ):
+        yield credential
+
+
+def test_client_reports_lifecycle_with_one_token(sara: SaraMock, credential):
+    workflow_id = uuid4()
+
+    with NotifierClient() as client:
+        client.started(workflow_id, "argo-abc")
+        client.result(workflow_id, '{"rain": true}')
+        client.exited(workflow_id, "Succeeded")
+
+    assert [r.event for r in sara.received] == ["started", "result", "exited"]
+    assert sara.received[1].body == {"resultJson": '{"rain": true}'}
+    credential.get_token.assert_called_once()
+
+
+def test_client_is_safe_to_share_between_threads(sara: SaraMock, credential):
+    client = NotifierClient()
+    workflow_ids = [uuid4() for _ in range(20)]
+
+    def report(workflow_id) -> None:
+        client.started(workflow_id)
+        client.exited(workflow_id, "Succeeded")
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(report, workflow_ids))
+
+    assert len(sara.received) == 2 * len(workflow_ids)
+    credential.get_token.assert_called_once()
+
+
+def test_tokens_are_kept_per_client(sara: SaraMock, credential):
+    NotifierClient().started(uuid4())
+    NotifierClient().started(uuid4())
+    get_access_token()
+
+    assert credential.get_token.call_count == 3
+
+
+def test_invalid_result_raises_before_sending(sara: SaraMock, credential, monkeypatch):
+    monkeypatch.setattr(settings, "WORKFLOW_TYPE", "fencilla")
+
+    with pytest.raises(ValueError, match=r"\$.isBreak: required property"):
+        NotifierClient().result(uuid4(), '{"confidence": 0.9}')
+
+    assert sara.received == []
+
+
+def test_unvalidated_client_sends_result_as_given(
+    sara: SaraMock, credential, monkeypatch
+):
+    monkeypatch.setattr(settings, "WORKFLOW_TYPE", "cloe")
+
+    NotifierClient(validate_results=False).result(uuid4(), '{"padding": ""}')
+
+    assert len(sara.received) == 1
+
+
+def test_client_streams_result_from_file(sara: SaraMock, credential, tmp_path: Path):
+    result_file = tmp_path / "result.json"
+    result_file.write_text(json.dumps({"rain": True}))
+
+    with open(result_file, encoding="utf-8") as stream:
+        NotifierClient().result(uuid4(), stream)
+
+    assert json.loads(sara.received[0].body["resultJson"]) == {"rain": True}
+
+
+def test_client_progress_reports_whether_the_update_was_sent(
+    sara: SaraMock, credential
+):
+    workflow_id = uuid4()
+    client = NotifierClient()
+
+    assert client.progress(workflow_id, 10, "Frames")
+    assert not client.progress(workflow_id, 20)
+    assert [r.body for r in sara.received] == [{"percent": 10, "stage": "Frames"}]
+
+
+def test_async_client_reports_workflows_concurrently(sara: SaraMock, credential):
+    workflow_ids = [uuid4() for _ in range(10)]
+
+    async def report() -> None:
+        async with AsyncNotifierClient(max_concurrency=4) as client:
+
+            async def lifecycle(workflow_id) -> None:
+                await client.started(workflow_id)
+                await client.result(workflow_id, '{"rain": false}')
+                await client.exited(workflow_id, "Failed", "Out of memory")
+
+            await asyncio.gather(*(lifecycle(w) for w in workflow_ids))
+
+    asyncio.run(report())
+
+    assert len(sara.received) == 3 * len(workflow_ids)
+    for workflow_id in workflow_ids:
+        events = [r.event for r in sara.received if r.workflow_id == str(workflow_id)]
+        assert events == ["started", "result", "exited"]
+    credential.get_token.assert_called_once()
+
+
+def test_client_closes_only_a_session_it_owns(sara: SaraMock, credential):
+    session = requests.Session()
+    session.close = MagicMock()
+
+    with NotifierClient(session=session) as client:
+        client.started(uuid4())
+
+    session.close.assert_not_called()
+    assert len(sara.received) == 1
+
+
+def test_client_raises_notifier_error_without_a_token(sara: SaraMock, credential):
+    credential.get_token.side_effect = RuntimeError("Entra ID unavailable")
+
+    with pytest.raises(NotifierError, match="Entra ID unavailable"):
+        NotifierClient().started(uuid4())
+
+    assert sara.received == []
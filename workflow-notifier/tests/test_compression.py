@@ -0,0 +1,93 @@
+import json
+import random
+import time
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from typer.testing import CliRunner
+
+from mocks.sara_mock import SaraMock
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifier import app
+
+runner = CliRunner()
+
+
+pytestmark = pytest.mark.usefixtures("fake_token")
+
+
+def _thermal_result(pixels: int) -> str:
+    rng = random.Random(0)
+    return json.dumps(
+        {
+            "unit": "celsius",
+            "temperatures": [round(rng.uniform(18, 95), 2) for _ in range(pixels)],
+        }
+    )
+
+
+def _send_result(workflow_id: str, result_file: Path) -> float:
+    start = time.perf_counter()
+    result = runner.invoke(
+        app, ["result", workflow_id, "--from-file", str(result_file)]
+    )
+    elapsed = time.perf_counter() - start
+    assert result.exit_code == 0, result.output
+    return elapsed
+
+
+def test_large_result_round_trips_gzip_compressed(sara: SaraMock, tmp_path: Path):
+    workflow_id = str(uuid4())
+    payload = _thermal_result(50_000)
+    result_file = tmp_path / "result.json"
+    result_file.write_text(payload)
+
+    _send_result(workflow_id, result_file)
+
+    [received] = sara.received
+    assert received.content_encoding == "gzip"
+    assert received.body == {"resultJson": payload}
+
+
+def test_small_result_is_sent_uncompressed(sara: SaraMock):
+    payload = '{"isBreak": false, "confidence": 0.5}'
+
+    result = runner.invoke(app, ["result", str(uuid4()), payload])
+
+    assert result.exit_code == 0
+    [received] = sara.received
+    assert received.content_encoding is None
+    assert received.body == {"resultJson": payload}
+
+
+def test_compression_can_be_disabled(sara: SaraMock, tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_GZIP_ENABLED", False)
+    result_file = tmp_path / "result.json"
+    result_file.write_text(_thermal_result(50_000))
+
+    _send_result(str(uuid4()), result_file)
+
+    assert sara.received[0].content_encoding is None
+
+
+def test_gzip_reduces_wire_size(
+    sara: SaraMock, tmp_path: Path, monkeypatch, record_property
+):
+    result_file = tmp_path / "result.json"
+    result_file.write_text(_thermal_result(200_000))
+    size = result_file.stat().st_size
+
+    monkeypatch.setattr(settings, "RESULT_GZIP_ENABLED", False)
+    plain_seconds = _send_result(str(uuid4()), result_file)
+    monkeypatch.setattr(settings, "RESULT_GZIP_ENABLED", True)
+    gzip_seconds = _send_result(str(uuid4()), result_file)
+
+    plain, compressed = sara.received
+    assert plain.body == compressed.body
+    ratio = compressed.wire_bytes / plain.wire_bytes
+    record_property("result_bytes", size)
+    record_property("plain_mb_per_s", round(size / plain_seconds / 1e6, 1))
+    record_property("gzip_mb_per_s", round(size / gzip_seconds / 1e6, 1))
+    record_property("gzip_ratio", round(ratio, 2))
+    assert ratio < 0.5
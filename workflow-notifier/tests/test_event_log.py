@@ -0,0 +1,103 @@
+import hashlib
+import json
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+import requests_mock
+from typer.testing import CliRunner
+
+from mocks.sara_mock import SaraMock
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifier import app
+
+runner = CliRunner()
+WORKFLOW_ID = uuid4()
+
+
+pytestmark = pytest.mark.usefixtures("fake_token")
+
+
+@pytest.fixture
+def event_log(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "events.jsonl"
+    monkeypatch.setattr(settings, "EVENT_LOG_PATH", str(path))
+    return path
+
+
+def _entries(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_requests_are_logged_by_size_and_hash_only(event_log: Path):
+    result_json = '{"secret": "do not log me"}'
+    with requests_mock.Mocker() as mock_http:
+        mock_http.put(requests_mock.ANY, status_code=204)
+        result = runner.invoke(app, ["result", str(WORKFLOW_ID), result_json])
+        body = mock_http.last_request.body
+
+    assert result.exit_code == 0
+    (entry,) = _entries(event_log)
+    assert entry["command"] == "result"
+    assert entry["event"] == "result"
+    assert entry["path"] == f"/api/workflow/{WORKFLOW_ID}/result"
+    assert entry["workflowId"] == str(WORKFLOW_ID)
+    assert entry["payloadBytes"] == len(body)
+    assert entry["payloadSha256"] == hashlib.sha256(body).hexdigest()
+    assert entry["compressed"] is False
+    assert entry["status"] == 204
+    assert entry["outcome"] == "success"
+    assert entry["latencyMs"] >= 0
+    assert "do not log me" not in event_log.read_text()
+    assert "fake-token" not in event_log.read_text()
+
+
+def test_compressed_and_streamed_results_log_the_uncompressed_body(
+    event_log: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(settings, "RESULT_GZIP_MIN_BYTES", 16)
+    result_json = json.dumps({"readings": list(range(100))})
+    result_file = tmp_path / "result.json"
+    result_file.write_text(result_json)
+    sara = SaraMock()
+    with sara.serve() as base_url:
+        monkeypatch.setattr(settings, "SARA_SERVER_URL", base_url)
+        for args in (
+            ["result", str(WORKFLOW_ID), result_json],
+            ["result", str(WORKFLOW_ID), "--from-file", str(result_file)],
+        ):
+            assert runner.invoke(app, args).exit_code == 0
+
+    body = json.dumps({"resultJson": result_json}).encode("utf-8")
+    for entry, received in zip(_entries(event_log), sara.received, strict=True):
+        assert entry["compressed"] is True
+        assert received.content_encoding == "gzip"
+        assert entry["payloadBytes"] == len(body) > received.wire_bytes
+        assert entry["payloadSha256"] == hashlib.sha256(body).hexdigest()
+
+
+def test_failed_requests_are_logged_with_their_status(event_log: Path):
+    with (
+        requests_mock.Mocker() as mock_http,
+        patch("workflow_notifier.transport._sleep"),
+    ):
+        mock_http.put(requests_mock.ANY, status_code=404)
+        result = runner.invoke(app, ["exited", str(WORKFLOW_ID), "Failed", "boom"])
+
+    assert result.exit_code == 1
+    (entry,) = _entries(event_log)
+    assert entry["event"] == "exited"
+    assert entry["status"] == 404
+    assert entry["outcome"] == "failure"
+    assert "boom" not in event_log.read_text()
+
+
+def test_no_event_log_by_default(tmp_path: Path):
+    with requests_mock.Mocker() as mock_http:
+        mock_http.put(requests_mock.ANY, status_code=204)
+        result = runner.invoke(app, ["started", str(WORKFLOW_ID)])
+
+    assert result.exit_code == 0
+    assert settings.EVENT_LOG_PATH is None
+    assert list(tmp_path.iterdir()) == []
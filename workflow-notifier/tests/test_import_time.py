@@ -0,0 +1,68 @@
+"""Cold-start guards for the notifier CLI.
+
+Every Argo step starts the notifier as a new process, so anything imported at
+module level is paid on every workflow event. These tests run a fresh
+interpreter with ``-X importtime`` and fail when the heavy, optional stacks
+(azure-identity, the OTLP exporters) sneak back into the import path, or when
+the total import time of the CLI module exceeds the budget.
+"""
+
+import os
+import subprocess
+import sys
+
+# Cumulative import time budget (microseconds) for workflow_notifier.notifier.
+# Generous on purpose: it is meant to catch an exporter or credential stack
+# being imported eagerly again, not to benchmark the CI runner.
+IMPORT_BUDGET_US = int(os.environ.get("NOTIFIER_IMPORT_BUDGET_US", 1_000_000))
+
+
+def _import_times(code: str) -> dict[str, int]:
+    """Run ``code`` in a fresh interpreter and return cumulative import times."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[12:].split("|"))
+        times[name] = int(cumulative)
+    return times
+
+
+def _imported(times: dict[str, int], prefix: str) -> list[str]:
+    return [name for name in times if name == prefix or name.startswith(prefix + ".")]
+
+
+def test_notifier_import_skips_credentials_and_exporters():
+    times = _import_times("import workflow_notifier.notifier")
+
+    assert _imported(times, "azure.identity") == []
+    assert _imported(times, "opentelemetry.exporter") == []
+    assert _imported(times, "grpc") == []
+
+
+def test_notifier_import_within_budget():
+    times = _import_times("import workflow_notifier.notifier")
+
+    assert times["workflow_notifier.notifier"] < IMPORT_BUDGET_US
+
+
+def test_http_protocol_imports_only_http_exporters():
+    code = (
+        "import os; os.environ['OTEL_EXPORTER_OTLP_PROTOCOL'] = 'http'\n"
+        "from workflow_notifier.config.open_telemetry import setup_open_telemetry\n"
+        "setup_open_telemetry()\n"
+        # Skip the exporters' shutdown flush; there is no collector to reach.
+        "os._exit(0)"
+    )
+    times = _import_times(code)
+
+    assert _imported(times, "opentelemetry.exporter.otlp.proto.http") != []
+    assert _imported(times, "opentelemetry.exporter.otlp.proto.grpc") == []
+    assert _imported(times, "grpc") == []
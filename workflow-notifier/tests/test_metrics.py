@@ -0,0 +1,119 @@
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+import requests_mock
+from opentelemetry import metrics
+from opentelemetry.sdk.metrics import Counter, Histogram, MeterProvider
+from opentelemetry.sdk.metrics.export import (
+    AggregationTemporality,
+    InMemoryMetricReader,
+)
+from typer.testing import CliRunner
+
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifications import get_access_token
+from workflow_notifier.notifier import app
+
+runner = CliRunner()
+ALLOWED_ATTRIBUTES = {
+    "command",
+    "workflow_type",
+    "status",
+    "stage",
+    "event",
+    "outcome",
+    "source",
+    "content_encoding",
+}
+
+
+@pytest.fixture(scope="module")
+def reader() -> InMemoryMetricReader:
+    # The instruments are created against the global provider when the notifier
+    # is imported; setting it here makes them record into the reader. It can
+    # only be set once per process, so the other test modules share it. With
+    # delta temporality every read only returns what was recorded since the
+    # previous one.
+    reader = InMemoryMetricReader(
+        preferred_temporality={
+            Counter: AggregationTemporality.DELTA,
+            Histogram: AggregationTemporality.DELTA,
+        }
+    )
+    metrics.set_meter_provider(MeterProvider(metric_readers=[reader]))
+    return reader
+
+
+def _points(reader: InMemoryMetricReader) -> dict[str, list]:
+    points: dict[str, list] = {}
+    data = reader.get_metrics_data()
+    for resource_metrics in data.resource_metrics if data else []:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                points.setdefault(metric.name, []).extend(metric.data.data_points)
+    return points
+
+
+def test_notifications_record_bounded_attributes(
+    reader: InMemoryMetricReader, monkeypatch
+):
+    monkeypatch.setattr(settings, "WORKFLOW_TYPE", "gas-leak")
+    _points(reader)
+    workflow_ids = [uuid4() for _ in range(5)]
+
+    with (
+        requests_mock.Mocker() as mock_http,
+        patch("workflow_notifier.notifications.get_access_token", return_value="token"),
+    ):
+        mock_http.put(requests_mock.ANY, status_code=204)
+        for workflow_id in workflow_ids:
+            runner.invoke(app, ["result", str(workflow_id), '{"rain": true}'])
+            runner.invoke(app, ["exited", str(workflow_id), "Succeeded"])
+
+    points = _points(reader)
+    (executions,) = points["workflow_execution_count"]
+    assert dict(executions.attributes) == {
+        "command": "exited",
+        "workflow_type": "gas-leak",
+        "status": "Succeeded",
+    }
+    assert executions.value == len(workflow_ids)
+
+    durations = {p.attributes["event"]: p for p in points["notification_duration"]}
+    assert durations["result"].count == len(workflow_ids)
+    assert durations["exited"].attributes["outcome"] == "success"
+
+    (size,) = points["notification_result_size"]
+    assert size.sum == len('{"rain": true}') * len(workflow_ids)
+    assert size.attributes["content_encoding"] == "identity"
+
+    for name, data_points in points.items():
+        for point in data_points:
+            assert set(point.attributes) <= ALLOWED_ATTRIBUTES, name
+
+
+def test_token_duration_distinguishes_cache_hits(
+    reader: InMemoryMetricReader, tmp_path: Path, monkeypatch
+):
+    monkeypatch.setattr(settings, "TOKEN_CACHE_PATH", str(tmp_path / "tokens.json"))
+    _points(reader)
+    credential = MagicMock()
+    credential.get_token.return_value = MagicMock(
+        token="from-entra", expires_on=int(time.time()) + 3600
+    )
+
+    with patch(
+        "workflow_notifier.notifications._get_credential", return_value=credential
+    ):
+        get_access_token()
+        get_access_token()
+        get_access_token()
+
+    sources = {
+        p.attributes["source"]: p.count
+        for p in _points(reader)["notifier_token_duration"]
+    }
+    assert sources == {"credential": 1, "cache": 2}
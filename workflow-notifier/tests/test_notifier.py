@@ -1,33 +1,24 @@
+import gzip
 import json
+import sys
 from unittest.mock import patch
 from uuid import uuid4
 
 import pytest
 import requests
 import requests_mock
-import typer
 from typer.testing import CliRunner
 
 from workflow_notifier.config.settings import settings
+from workflow_notifier.idempotency import idempotency_key
+from workflow_notifier.notifications import NotifierError
 from workflow_notifier.notifier import app
 
 runner = CliRunner()
 WORKFLOW_ID = uuid4()
 
 
-@pytest.fixture(autouse=True)
-def fake_token():
-    """Bypass MSAL during tests."""
-    with patch(
-        "workflow_notifier.notifier.get_access_token", return_value="fake-token"
-    ):
-        yield
-
-
-@pytest.fixture
-def mock_http():
-    with requests_mock.Mocker() as m:
-        yield m
+pytestmark = pytest.mark.usefixtures("fake_token")
 
 
 def test_started_sends_put_with_no_body(mock_http: requests_mock.Mocker):
@@ -67,6 +58,89 @@ def test_result_sends_payload_verbatim(mock_http: requests_mock.Mocker):
     assert body["resultJson"] == payload
 
 
+def _mock_streamed_put(mock_http: requests_mock.Mocker, url: str) -> list[dict]:
+    """Register ``url`` and collect the JSON of streamed request bodies.
+
+    The body has to be consumed inside the callback: requests_mock does not
+    drain generator bodies, and the file behind them is closed afterwards.
+    """
+    bodies: list[dict] = []
+
+    def callback(request, context):
+        body = b"".join(request.body)
+        if request.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        bodies.append(json.loads(body))
+        context.status_code = 204
+        return ""
+
+    mock_http.put(url, text=callback)
+    return bodies
+
+
+def test_result_from_file_streams_payload_verbatim(
+    mock_http: requests_mock.Mocker, tmp_path
+):
+    url = f"{settings.workflow_base_url}/{WORKFLOW_ID}/result"
+    bodies = _mock_streamed_put(mock_http, url)
+    # Larger than one read chunk, with non-ASCII and escaped characters.
+    payload = json.dumps(
+        {"readings": [[20.5 + i, '\u00b0C "q" \U0001f321'] for i in range(20_000)]},
+        ensure_ascii=False,
+    )
+    result_file = tmp_path / "result.json"
+    result_file.write_text(payload, encoding="utf-8")
+
+    result = runner.invoke(
+        app, ["result", str(WORKFLOW_ID), "--from-file", str(result_file)]
+    )
+
+    assert result.exit_code == 0
+    assert mock_http.last_request.headers["Content-Type"] == "application/json"
+    assert bodies == [{"resultJson": payload}]
+
+
+def test_result_from_stdin(mock_http: requests_mock.Mocker):
+    url = f"{settings.workflow_base_url}/{WORKFLOW_ID}/result"
+    bodies = _mock_streamed_put(mock_http, url)
+    payload = '{"isBreak": false, "confidence": 0.5}'
+
+    result = runner.invoke(
+        app, ["result", str(WORKFLOW_ID), "--from-stdin"], input=payload
+    )
+
+    assert result.exit_code == 0
+    assert bodies == [{"resultJson": payload}]
+
+
+def test_invalid_result_file_rejected_before_http(
+    mock_http: requests_mock.Mocker, tmp_path
+):
+    result_file = tmp_path / "result.json"
+    result_file.write_text('{"oilLevel": ')
+
+    result = runner.invoke(
+        app, ["result", str(WORKFLOW_ID), "--from-file", str(result_file)]
+    )
+
+    assert result.exit_code != 0
+    assert "JSON" in result.output
+    assert not mock_http.called
+
+
+def test_result_requires_exactly_one_source(tmp_path):
+    result_file = tmp_path / "result.json"
+    result_file.write_text("{}")
+
+    missing = runner.invoke(app, ["result", str(WORKFLOW_ID)])
+    both = runner.invoke(
+        app, ["result", str(WORKFLOW_ID), "{}", "--from-file", str(result_file)]
+    )
+
+    assert missing.exit_code != 0
+    assert both.exit_code != 0
+
+
 def test_exited_succeeded_omits_error_message(mock_http: requests_mock.Mocker):
     url = f"{settings.workflow_base_url}/{WORKFLOW_ID}/exited"
     mock_http.put(url, status_code=204)
@@ -107,6 +181,34 @@ def test_exited_failed_accepts_failures_array(mock_http: requests_mock.Mocker):
     }
 
 
+def test_notifications_carry_deterministic_idempotency_keys(
+    mock_http: requests_mock.Mocker,
+):
+    mock_http.put(requests_mock.ANY, status_code=204)
+    commands = [
+        ["started", str(WORKFLOW_ID)],
+        ["result", str(WORKFLOW_ID), "{}"],
+        ["exited", str(WORKFLOW_ID), "Failed", "boom"],
+        ["exited", str(WORKFLOW_ID), "Failed", "boom again"],
+        ["exited", str(WORKFLOW_ID), "Succeeded"],
+    ]
+
+    keys = []
+    for command in commands:
+        assert runner.invoke(app, command).exit_code == 0
+        keys.append(mock_http.last_request.headers["Idempotency-Key"])
+
+    assert keys == [
+        idempotency_key(WORKFLOW_ID, "started"),
+        idempotency_key(WORKFLOW_ID, "result"),
+        idempotency_key(WORKFLOW_ID, "exited", "Failed"),
+        idempotency_key(WORKFLOW_ID, "exited", "Failed"),
+        idempotency_key(WORKFLOW_ID, "exited", "Succeeded"),
+    ]
+    assert len(set(keys)) == 4
+    assert idempotency_key(uuid4(), "started") != keys[0]
+
+
 def test_invalid_workflow_id_rejected_before_http():
     result = runner.invoke(app, ["started", "not-a-uuid"])
     assert result.exit_code != 0
@@ -134,3 +236,143 @@ def test_http_error_propagates_as_exit_code(mock_http: requests_mock.Mocker):
 
 def test_workflow_url_uses_api_prefix():
     assert settings.workflow_base_url.endswith("/api/workflow")
+
+
+def _mock_lifecycle(mock_http: requests_mock.Mocker) -> None:
+    for suffix in ("started", "result", "exited"):
+        mock_http.put(f"{settings.workflow_base_url}/{WORKFLOW_ID}/{suffix}")
+
+
+def _sent(mock_http: requests_mock.Mocker) -> list[str]:
+    return [request.path.rsplit("/", 1)[-1] for request in mock_http.request_history]
+
+
+def test_run_reports_stdout_as_result(mock_http: requests_mock.Mocker):
+    _mock_lifecycle(mock_http)
+    script = "print('{\"temperature\": 42}')"
+
+    result = runner.invoke(
+        app, ["run", str(WORKFLOW_ID), "--", sys.executable, "-c", script]
+    )
+
+    assert result.exit_code == 0
+    assert _sent(mock_http) == ["started", "result", "exited"]
+    assert mock_http.request_history[1].json() == {
+        "resultJson": '{"temperature": 42}\n'
+    }
+    assert mock_http.last_request.json() == {"exitStatus": "Succeeded"}
+
+
+def test_run_reads_result_file(mock_http: requests_mock.Mocker, tmp_path):
+    _mock_lifecycle(mock_http)
+    bodies = _mock_streamed_put(
+        mock_http, f"{settings.workflow_base_url}/{WORKFLOW_ID}/result"
+    )
+    result_file = tmp_path / "result.json"
+    script = f"open({str(result_file)!r}, 'w').write('{{\"rain\": false}}')"
+
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            str(WORKFLOW_ID),
+            "--result-file",
+            str(result_file),
+            "--",
+            sys.executable,
+            "-c",
+            script,
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert bodies == [{"resultJson": '{"rain": false}'}]
+
+
+def test_run_failed_command_reports_stderr_tail(mock_http: requests_mock.Mocker):
+    _mock_lifecycle(mock_http)
+    script = "import sys; sys.stderr.write('model crashed'); sys.exit(3)"
+
+    result = runner.invoke(
+        app, ["run", str(WORKFLOW_ID), "--", sys.executable, "-c", script]
+    )
+
+    assert result.exit_code == 3
+    assert _sent(mock_http) == ["started", "exited"]
+    assert mock_http.last_request.json() == {
+        "exitStatus": "Failed",
+        "errorMessage": "model crashed",
+    }
+
+
+def test_run_invalid_result_reports_failed(mock_http: requests_mock.Mocker):
+    _mock_lifecycle(mock_http)
+
+    result = runner.invoke(
+        app, ["run", str(WORKFLOW_ID), "--", sys.executable, "-c", "print('nope {')"]
+    )
+
+    assert result.exit_code == 1
+    assert _sent(mock_http) == ["started", "exited"]
+    assert mock_http.last_request.json()["exitStatus"] == "Failed"
+    assert "Invalid result" in mock_http.last_request.json()["errorMessage"]
+
+
+def test_run_without_result(mock_http: requests_mock.Mocker):
+    _mock_lifecycle(mock_http)
+
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            str(WORKFLOW_ID),
+            "--no-report-result",
+            "--",
+            sys.executable,
+            "-c",
+            "pass",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert _sent(mock_http) == ["started", "exited"]
+
+
+def test_run_runs_command_without_a_token(mock_http: requests_mock.Mocker, tmp_path):
+    marker = tmp_path / "ran"
+
+    with patch(
+        "workflow_notifier.notifications.get_access_token",
+        side_effect=NotifierError("no token"),
+    ):
+        result = runner.invoke(
+            app,
+            [
+                "run",
+                str(WORKFLOW_ID),
+                "--no-report-result",
+                "--",
+                sys.executable,
+                "-c",
+                f"open({str(marker)!r}, 'w')",
+            ],
+        )
+
+    assert result.exit_code == 1
+    assert marker.exists()
+    assert mock_http.request_history == []
+
+
+def test_run_reports_signal_exit_like_a_shell(mock_http: requests_mock.Mocker):
+    _mock_lifecycle(mock_http)
+    script = "import os, signal; os.kill(os.getpid(), signal.SIGKILL)"
+
+    result = runner.invoke(
+        app, ["run", str(WORKFLOW_ID), "--", sys.executable, "-c", script]
+    )
+
+    assert result.exit_code == 128 + 9
+    assert mock_http.last_request.json() == {
+        "exitStatus": "Failed",
+        "errorMessage": "Command was killed by SIGKILL",
+    }
@@ -0,0 +1,215 @@
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+import requests
+import requests_mock
+from typer.testing import CliRunner
+
+from workflow_notifier.config.settings import settings
+from workflow_notifier.idempotency import idempotency_key
+from workflow_notifier.notifier import app
+from workflow_notifier.outbox import Outbox, OutboxEntry
+
+runner = CliRunner()
+
+
+pytestmark = pytest.mark.usefixtures("fake_token")
+
+
+@pytest.fixture
+def outbox_path(tmp_path: Path, monkeypatch) -> Path:
+    path = tmp_path / "outbox" / "notifications.db"
+    monkeypatch.setattr(settings, "OUTBOX_PATH", str(path))
+    monkeypatch.setattr(settings, "HTTP_MAX_RETRIES", 0)
+    return path
+
+
+def _http_error(status_code: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+def test_enqueue_replaces_superseded_event(tmp_path: Path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    outbox.enqueue("wf", "started", None)
+    outbox.enqueue("wf", "result", '{"resultJson": "1"}')
+    outbox.enqueue("wf", "result", '{"resultJson": "2"}')
+
+    sent: list[OutboxEntry] = []
+    outbox.drain(sent.append, batch_size=10)
+
+    assert [(e.event, e.body) for e in sent] == [
+        ("started", None),
+        ("result", '{"resultJson": "2"}'),
+    ]
+    assert outbox.pending_count() == 0
+
+
+def test_replaced_event_keeps_its_place_ahead_of_later_events(tmp_path: Path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    outbox.enqueue("wf", "result", '{"resultJson": "1"}')
+    outbox.enqueue("wf", "exited", '{"exitStatus": "Succeeded"}')
+    outbox.enqueue("wf", "result", '{"resultJson": "2"}')
+
+    sent: list[OutboxEntry] = []
+    outbox.drain(sent.append, batch_size=10)
+
+    assert [(e.event, e.body) for e in sent] == [
+        ("result", '{"resultJson": "2"}'),
+        ("exited", '{"exitStatus": "Succeeded"}'),
+    ]
+
+
+def test_event_superseded_during_drain_is_sent_before_later_events(tmp_path: Path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    outbox.enqueue("wf", "exited", '{"exitStatus": "Failed"}')
+    outbox.enqueue("wf", "progress", '{"percent": 100}')
+    outbox.enqueue("other", "exited", None)
+    sent: list[OutboxEntry] = []
+
+    def send(entry: OutboxEntry) -> None:
+        if not sent:
+            outbox.enqueue("wf", "exited", '{"exitStatus": "Succeeded"}')
+        sent.append(entry)
+
+    drained = outbox.drain(send, batch_size=10)
+
+    assert [(e.workflow_id, e.event, e.body) for e in sent] == [
+        ("wf", "exited", '{"exitStatus": "Failed"}'),
+        ("other", "exited", None),
+        ("wf", "exited", '{"exitStatus": "Succeeded"}'),
+        ("wf", "progress", '{"percent": 100}'),
+    ]
+    assert drained.completed
+    assert outbox.pending_count() == 0
+
+
+def test_drain_stops_at_transient_failure_and_keeps_order(tmp_path: Path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    for i in range(5):
+        outbox.enqueue(f"wf-{i}", "exited", None)
+    send = MagicMock(side_effect=[None, _http_error(503)])
+
+    drained = outbox.drain(send, batch_size=2)
+
+    assert (drained.delivered, drained.completed) == (1, False)
+    assert outbox.pending_count() == 4
+    sent: list[OutboxEntry] = []
+    outbox.drain(sent.append, batch_size=2)
+    assert [e.workflow_id for e in sent] == ["wf-1", "wf-2", "wf-3", "wf-4"]
+    assert sent[0].attempts == 1
+
+
+def test_drain_drops_permanently_rejected_entries(tmp_path: Path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    outbox.enqueue("unknown", "exited", None)
+    outbox.enqueue("known", "exited", None)
+    send = MagicMock(side_effect=[_http_error(404), None])
+
+    drained = outbox.drain(send, batch_size=10)
+
+    assert (drained.delivered, drained.dropped, drained.completed) == (1, 1, True)
+    assert outbox.pending_count() == 0
+
+
+@pytest.mark.parametrize("status_code", [401, 403])
+def test_drain_keeps_entries_when_the_token_is_refused(
+    tmp_path: Path, status_code: int
+):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    outbox.enqueue("first", "exited", None)
+    outbox.enqueue("second", "exited", None)
+    send = MagicMock(side_effect=_http_error(status_code))
+
+    drained = outbox.drain(send, batch_size=10)
+
+    assert (drained.delivered, drained.dropped, drained.completed) == (0, 0, False)
+    send.assert_called_once()
+    assert outbox.pending_count() == 2
+
+
+def test_undeliverable_notifications_are_queued_then_flushed(
+    outbox_path: Path, mock_http: requests_mock.Mocker
+):
+    workflow_id = str(uuid4())
+    base = f"{settings.workflow_base_url}/{workflow_id}"
+    sara_available = False
+    delivered: list[tuple[str, dict]] = []
+    keys: list[str] = []
+
+    def callback(request, context):
+        if not sara_available:
+            context.status_code = 503
+            return ""
+        body = request.body
+        if not isinstance(body, (str, bytes)):
+            body = b"".join(body)
+        delivered.append((request.path.rsplit("/", 1)[-1], json.loads(body)))
+        keys.append(request.headers["Idempotency-Key"])
+        context.status_code = 204
+        return ""
+
+    mock_http.put(f"{base}/result", text=callback)
+    mock_http.put(f"{base}/exited", text=callback)
+
+    result = runner.invoke(app, ["result", workflow_id, '{"rain": true}'])
+    assert result.exit_code == 0
+    sara_available = True
+    # SARA is back, but exited must not overtake the queued result.
+    result = runner.invoke(app, ["exited", workflow_id, "Succeeded"])
+    assert result.exit_code == 0
+    assert delivered == []
+    assert Outbox(str(outbox_path)).pending_count() == 2
+
+    result = runner.invoke(app, ["flush"])
+
+    assert result.exit_code == 0
+    assert delivered == [
+        ("result", {"resultJson": '{"rain": true}'}),
+        ("exited", {"exitStatus": "Succeeded"}),
+    ]
+    # The same keys as if they had been delivered right away.
+    assert keys == [
+        idempotency_key(UUID(workflow_id), "result"),
+        idempotency_key(UUID(workflow_id), "exited", "Succeeded"),
+    ]
+    assert Outbox(str(outbox_path)).pending_count() == 0
+
+
+def test_flush_fails_while_sara_is_unavailable(
+    outbox_path: Path, mock_http: requests_mock.Mocker
+):
+    workflow_id = str(uuid4())
+    mock_http.put(
+        f"{settings.workflow_base_url}/{workflow_id}/started", status_code=502
+    )
+    runner.invoke(app, ["started", workflow_id])
+
+    result = runner.invoke(app, ["flush"])
+
+    assert result.exit_code == 1
+    assert Outbox(str(outbox_path)).pending_count() == 1
+
+
+def test_client_errors_are_not_queued(
+    outbox_path: Path, mock_http: requests_mock.Mocker
+):
+    workflow_id = str(uuid4())
+    mock_http.put(
+        f"{settings.workflow_base_url}/{workflow_id}/started", status_code=404
+    )
+
+    result = runner.invoke(app, ["started", workflow_id])
+
+    assert result.exit_code == 1
+    assert Outbox(str(outbox_path)).pending_count() == 0
+
+
+def test_flush_requires_outbox_path():
+    result = runner.invoke(app, ["flush"])
+
+    assert result.exit_code == 2
@@ -0,0 +1,83 @@
+import time
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+import requests_mock
+from typer.testing import CliRunner
+
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifications import NotifierError
+from workflow_notifier.notifier import app
+
+runner = CliRunner()
+WORKFLOW_ID = uuid4()
+TOKEN_SECONDS = 0.4
+
+
+def _slow_token() -> str:
+    time.sleep(TOKEN_SECONDS)
+    return "fake-token"
+
+
+def _slow_validation(stream) -> None:
+    time.sleep(TOKEN_SECONDS)
+
+
+def test_token_is_acquired_while_result_is_validated(tmp_path: Path):
+    result_file = tmp_path / "result.json"
+    result_file.write_text('{"rain": true}')
+
+    with (
+        requests_mock.Mocker() as mock_http,
+        patch(
+            "workflow_notifier.notifications.get_access_token", side_effect=_slow_token
+        ),
+        patch(
+            "workflow_notifier.notifications.validate_json_stream",
+            side_effect=_slow_validation,
+        ),
+    ):
+        mock_http.put(
+            f"{settings.workflow_base_url}/{WORKFLOW_ID}/result", status_code=204
+        )
+        start = time.perf_counter()
+        result = runner.invoke(
+            app, ["result", str(WORKFLOW_ID), "--from-file", str(result_file)]
+        )
+        elapsed = time.perf_counter() - start
+
+    assert result.exit_code == 0
+    assert mock_http.last_request.headers["Authorization"] == "Bearer fake-token"
+    assert elapsed < 2 * TOKEN_SECONDS
+
+
+def test_invalid_result_does_not_wait_for_token():
+    with (
+        requests_mock.Mocker() as mock_http,
+        patch(
+            "workflow_notifier.notifications.get_access_token",
+            side_effect=lambda: time.sleep(5) or "fake-token",
+        ),
+    ):
+        start = time.perf_counter()
+        result = runner.invoke(app, ["result", str(WORKFLOW_ID), '{"oilLevel": '])
+        elapsed = time.perf_counter() - start
+
+    assert result.exit_code == 2
+    assert not mock_http.called
+    assert elapsed < 1
+
+
+def test_token_failure_in_background_fails_the_command():
+    with (
+        requests_mock.Mocker() as mock_http,
+        patch(
+            "workflow_notifier.notifications.get_access_token",
+            side_effect=NotifierError("no token"),
+        ),
+    ):
+        result = runner.invoke(app, ["result", str(WORKFLOW_ID), '{"rain": true}'])
+
+    assert result.exit_code == 1
+    assert not mock_http.called
@@ -0,0 +1,86 @@
+import json
+import pstats
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+import requests_mock
+from typer.testing import CliRunner
+
+from workflow_notifier import profiling
+from workflow_notifier.notifier import app
+
+runner = CliRunner()
+
+
+def _invoke(*args: str) -> tuple[int, list[dict]]:
+    with (
+        requests_mock.Mocker() as mock_http,
+        patch("workflow_notifier.notifications.get_access_token", return_value="token"),
+        patch.object(profiling.logger, "info") as log_info,
+    ):
+        mock_http.put(requests_mock.ANY, status_code=204)
+        result = runner.invoke(app, list(args))
+    reports = [
+        json.loads(call.args[0].removeprefix("notifier profile "))
+        for call in log_info.call_args_list
+        if call.args[0].startswith("notifier profile ")
+    ]
+    return result.exit_code, reports
+
+
+def test_profile_logs_phase_breakdown():
+    exit_code, reports = _invoke("--profile", "result", str(uuid4()), '{"rain": true}')
+
+    assert exit_code == 0
+    (report,) = reports
+    assert report["command"] == "result"
+    assert report["cprofile"] is None
+    phases = report["phases_ms"]
+    for phase in (
+        "startup",
+        "token",
+        "validate",
+        "request",
+        "total",
+        "telemetry_shutdown",
+    ):
+        assert phases[phase] >= 0
+    assert phases["total"] >= phases["request"]
+
+
+def test_no_profile_by_default():
+    exit_code, reports = _invoke("exited", str(uuid4()), "Succeeded")
+
+    assert exit_code == 0
+    assert reports == []
+    assert profiling._active is None
+
+
+def test_profile_output_writes_cprofile_stats(tmp_path: Path):
+    output = tmp_path / "exited.prof"
+
+    exit_code, reports = _invoke(
+        "--profile-output", str(output), "exited", str(uuid4()), "Succeeded"
+    )
+
+    assert exit_code == 0
+    assert reports[0]["cprofile"] == str(output)
+    profiles = pstats.Stats(str(output)).get_stats_profile().func_profiles
+    assert "notify_exited" in profiles
+
+
+def test_profile_is_reported_when_the_command_fails():
+    with (
+        patch("workflow_notifier.notifications.get_access_token", return_value="token"),
+        requests_mock.Mocker() as mock_http,
+        patch("workflow_notifier.transport._sleep"),
+        patch.object(profiling.logger, "info") as log_info,
+    ):
+        mock_http.put(requests_mock.ANY, status_code=404)
+        result = runner.invoke(app, ["--profile", "started", str(uuid4())])
+
+    assert result.exit_code == 1
+    assert any(
+        call.args[0].startswith("notifier profile ") for call in log_info.call_args_list
+    )
@@ -0,0 +1,112 @@
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from typer.testing import CliRunner
+
+from mocks.sara_mock import SaraMock
+from workflow_notifier.batch import coalesce_progress, parse_event
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifier import app
+from workflow_notifier.progress import ProgressThrottle, claim_send_slot
+
+runner = CliRunner()
+
+
+pytestmark = pytest.mark.usefixtures("fake_token")
+
+
+def test_throttle_holds_updates_until_the_interval_has_passed():
+    now = [100.0]
+    throttle: ProgressThrottle[int] = ProgressThrottle(30, clock=lambda: now[0])
+
+    assert throttle.offer("w", 10) == 0
+    assert throttle.take("w") == 10
+
+    now[0] = 110.0
+    assert throttle.offer("w", 20) == 20
+    assert throttle.offer("w", 30) is None
+    assert throttle.take("w") == 30
+    assert throttle.take("w") is None
+
+
+def test_throttle_drops_pending_update_on_discard():
+    throttle: ProgressThrottle[int] = ProgressThrottle(30)
+    throttle.offer("w", 10)
+    throttle.take("w")
+    throttle.offer("w", 20)
+
+    throttle.discard("w")
+
+    assert throttle.take("w") is None
+    assert throttle.offer("w", 30) == 0
+
+
+def test_send_slot_is_shared_through_the_state_directory(tmp_path: Path):
+    workflow_id = uuid4()
+    now = [1000.0]
+
+    def claim() -> bool:
+        return claim_send_slot(str(tmp_path), workflow_id, 30, clock=lambda: now[0])
+
+    assert claim()
+    now[0] = 1029.0
+    assert not claim()
+    now[0] = 1030.0
+    assert claim()
+    assert claim_send_slot(str(tmp_path), uuid4(), 30, clock=lambda: now[0])
+
+
+def test_progress_command_sends_first_update_and_drops_the_next(sara: SaraMock):
+    workflow_id = str(uuid4())
+
+    first = runner.invoke(app, ["progress", workflow_id, "10", "--stage", "Frames"])
+    second = runner.invoke(app, ["progress", workflow_id, "20"])
+
+    assert first.exit_code == 0, first.output
+    assert second.exit_code == 0, second.output
+    [received] = sara.received
+    assert received.event == "progress"
+    assert received.body == {"percent": 10.0, "stage": "Frames"}
+
+
+def test_exited_resets_the_progress_interval(sara: SaraMock):
+    workflow_id = str(uuid4())
+
+    runner.invoke(app, ["progress", workflow_id, "10"])
+    runner.invoke(app, ["exited", workflow_id, "Succeeded"])
+    result = runner.invoke(app, ["progress", workflow_id, "--stage", "Rerun"])
+
+    assert result.exit_code == 0, result.output
+    assert [r.event for r in sara.received] == ["progress", "exited", "progress"]
+
+
+def test_progress_command_rejects_an_empty_update(sara: SaraMock):
+    result = runner.invoke(app, ["progress", str(uuid4())])
+
+    assert result.exit_code == 2
+    assert sara.received == []
+
+
+def test_undeliverable_progress_does_not_fail_the_step(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(settings, "PROGRESS_STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "SARA_SERVER_URL", "http://127.0.0.1:9")
+    monkeypatch.setattr(settings, "HTTP_MAX_RETRIES", 0)
+
+    result = runner.invoke(app, ["progress", str(uuid4()), "50"])
+
+    assert result.exit_code == 0, result.output
+
+
+def test_batch_sends_only_the_last_progress_of_each_workflow():
+    first, second = str(uuid4()), str(uuid4())
+    events = [
+        parse_event(f'{{"workflowId": "{first}", "event": "progress", "percent": 10}}'),
+        parse_event(f'{{"workflowId": "{second}", "event": "started"}}'),
+        parse_event(f'{{"workflowId": "{first}", "event": "progress", "percent": 20}}'),
+    ]
+
+    coalesced = coalesce_progress(events)
+
+    assert coalesced == events[1:]
+    assert "idempotencyKey" not in coalesced[1]
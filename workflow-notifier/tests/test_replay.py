@@ -0,0 +1,61 @@
+import json
+import random
+import time
+from unittest.mock import patch
+from uuid import uuid4
+
+from mocks.replay import replay, synthetic_result
+from mocks.sara_mock import SaraMock
+from workflow_notifier.config.settings import settings
+
+
+def test_synthetic_results_match_the_logged_body_size():
+    for size in (100, 501, 100_000):
+        body = json.dumps({"resultJson": synthetic_result(size, random.Random(0))})
+        assert len(body) == size
+
+
+def test_replay_resends_logged_events_on_an_accelerated_schedule(monkeypatch):
+    sara = SaraMock()
+    workflow_ids = [str(uuid4()) for _ in range(3)]
+    entries = []
+    for i, workflow_id in enumerate(workflow_ids):
+        for offset, event, size in (
+            (0, "started", 0),
+            (1, "result", 2000),
+            (2, "exited", 27),
+        ):
+            entries.append(
+                {
+                    "ts": 1000.0 + i + offset,
+                    "event": event,
+                    "workflowId": workflow_id,
+                    "payloadBytes": size,
+                }
+            )
+    entries.append(
+        {"ts": 1001.5, "event": "batch", "workflowId": None, "payloadBytes": 10}
+    )
+
+    with (
+        patch("workflow_notifier.notifications.get_access_token", return_value="token"),
+        sara.serve() as base_url,
+    ):
+        monkeypatch.setattr(settings, "SARA_SERVER_URL", base_url)
+        start = time.monotonic()
+        summary = replay(entries, speed=10.0, workers=4)
+        elapsed = time.monotonic() - start
+
+    assert summary["replayed"] == 9
+    assert summary["skipped"] == 1
+    assert summary["originalSeconds"] == 4.0
+    assert 0.4 <= elapsed < 4.0
+    assert summary["callbacks"]["result"]["errors"] == 0
+    by_workflow: dict[str, list[str]] = {}
+    for notification in sara.received:
+        by_workflow.setdefault(notification.workflow_id, []).append(notification.event)
+    assert by_workflow == {
+        workflow_id: ["started", "result", "exited"] for workflow_id in workflow_ids
+    }
+    results = [n for n in sara.received if n.event == "result"]
+    assert all(n.wire_bytes == 2000 for n in results)
@@ -0,0 +1,64 @@
+import io
+import json
+
+import pytest
+
+from workflow_notifier import result_payload
+from workflow_notifier.result_payload import validate_json_stream
+
+DOCUMENTS = [
+    '{"a": [1, -2.5e3, true, null, "x\\"y\\u00e9"], "b": {}}',
+    "[[], [[1, 2], [3]], {}, NaN, -Infinity]",
+    '[0, {"a": 1, "b": "x"}, {}, [1, 2], [], {"c": [true]}, [{"d": null}]]',
+    '{"a": 1, "b": {"c": 2}, "d": [3, 4], "e": {"f": [5]}}',
+    '[0, {"a": 1,}]',
+    '[0, {"a" 1}]',
+    "[0, [1 2]]",
+    "[0, [1, 2,]]",
+    '{"a": 1, "b": {"c": 2]}',
+    '  "just a string"\n',
+    '{"a": 1,}',
+    "[1, 2,]",
+    "[01]",
+    '{"a" 1}',
+    '"\\x"',
+    '"unterminated',
+    "[1, 2",
+    "{} {}",
+    "tru",
+    "",
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("chunk_size", [1, 3, 64 * 1024])
+def test_stream_is_judged_like_json_loads(document, chunk_size, monkeypatch):
+    monkeypatch.setattr(result_payload, "CHUNK_SIZE", chunk_size)
+    try:
+        json.loads(document)
+        expected_valid = True
+    except ValueError:
+        expected_valid = False
+
+    stream = io.StringIO(document)
+    if expected_valid:
+        validate_json_stream(stream)
+    else:
+        with pytest.raises(ValueError):
+            validate_json_stream(stream)
+    assert stream.tell() == 0
+
+
+def test_stream_is_read_in_chunks(monkeypatch):
+    monkeypatch.setattr(result_payload, "CHUNK_SIZE", 1024)
+    document = json.dumps({"temperatures": [[20.5] * 1000 for _ in range(100)]})
+    reads: list[int] = []
+
+    class RecordingStream(io.StringIO):
+        def read(self, size: int = -1) -> str:
+            reads.append(size)
+            return super().read(size)
+
+    validate_json_stream(RecordingStream(document))
+
+    assert set(reads) == {1024}
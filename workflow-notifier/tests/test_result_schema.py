@@ -0,0 +1,220 @@
+import json
+import random
+import sys
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from typer.testing import CliRunner
+
+from mocks import result_generators
+from mocks.sara_mock import SaraMock
+from workflow_notifier import result_schema
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifier import app
+from workflow_notifier.result_schema import (
+    SCHEMA_DIR,
+    ResultSchemaError,
+    SchemaError,
+    compile_schema,
+)
+
+runner = CliRunner()
+
+
+pytestmark = pytest.mark.usefixtures("fake_token")
+
+
+@pytest.fixture(autouse=True)
+def schema_settings(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(settings, "RESULT_SCHEMA_CACHE_DIR", str(tmp_path / "cache"))
+    result_schema.result_schema.cache_clear()
+    yield
+    result_schema.result_schema.cache_clear()
+
+
+def _error_text(output: str) -> str:
+    """The output with Typer's error box and line wrapping removed."""
+    return " ".join(output.replace("│", " ").split())
+
+
+@pytest.mark.parametrize(
+    "workflow_type, generator, params",
+    [
+        ("anonymizer", "anonymizer", {"detections": 4}),
+        ("cloe", "oil_level", {"samples": 30}),
+        ("fencilla", "fencilla", {"segments": 20}),
+        ("thermal-reading", "thermal", {"width": 16, "height": 12}),
+    ],
+)
+def test_shipped_schemas_accept_mock_results(workflow_type, generator, params):
+    schema = result_schema.result_schema(workflow_type)
+    payload = result_generators.GENERATORS[generator](random.Random(0), **params)
+
+    assert schema is not None
+    schema.validate_json(json.dumps(payload))
+
+
+def test_every_shipped_schema_compiles():
+    paths = sorted(SCHEMA_DIR.glob("*.schema.json"))
+
+    assert paths
+    for path in paths:
+        compile_schema(json.loads(path.read_text()))
+        assert result_schema.result_schema(path.name.removesuffix(".schema.json"))
+
+
+@pytest.mark.parametrize(
+    "workflow_type, result",
+    [
+        ("anonymizer", {"isPersonInImage": True}),
+        ("cloe", {}),
+        ("cloe", {"oilLevel": None, "confidence": None}),
+        ("fencilla", {"isBreak": False, "confidence": 0.4}),
+        ("thermal-reading", {"temperature": 21.5}),
+    ],
+)
+def test_shipped_schemas_require_only_non_nullable_properties(workflow_type, result):
+    # Mirrors the nullability of the result classes in
+    # api/Services/ResultHandlers/WorkflowResultHandlers.
+    result_schema.result_schema(workflow_type).validate(result)
+
+
+def test_result_missing_required_property_fails_before_sending(
+    sara: SaraMock, monkeypatch
+):
+    monkeypatch.setattr(settings, "WORKFLOW_TYPE", "fencilla")
+
+    result = runner.invoke(app, ["result", str(uuid4()), '{"confidence": 0.9}'])
+
+    assert result.exit_code == 2
+    assert "$.isBreak: required property is missing" in _error_text(result.output)
+    assert sara.received == []
+
+
+def test_result_file_with_wrong_type_names_the_value(
+    sara: SaraMock, monkeypatch, tmp_path: Path
+):
+    monkeypatch.setattr(settings, "WORKFLOW_TYPE", "anonymizer")
+    result_file = tmp_path / "result.json"
+    result_file.write_text(
+        json.dumps(
+            {
+                "isPersonInImage": False,
+                "outputBlobStorageLocation": {
+                    "storageAccount": "a",
+                    "blobContainer": "c",
+                    "blobName": 42,
+                },
+            }
+        )
+    )
+
+    result = runner.invoke(
+        app, ["result", str(uuid4()), "--from-file", str(result_file)]
+    )
+
+    assert result.exit_code == 2
+    assert (
+        "$.outputBlobStorageLocation.blobName: expected string, got number"
+        in _error_text(result.output)
+    )
+    assert sara.received == []
+
+
+def test_property_names_match_case_insensitively(sara: SaraMock, monkeypatch):
+    monkeypatch.setattr(settings, "WORKFLOW_TYPE", "fencilla")
+
+    result = runner.invoke(
+        app, ["result", str(uuid4()), '{"IsBreak": true, "Confidence": 0.8}']
+    )
+
+    assert result.exit_code == 0, result.output
+    assert len(sara.received) == 1
+
+
+def test_run_reports_invalid_result_as_failed(sara: SaraMock, monkeypatch):
+    monkeypatch.setattr(settings, "WORKFLOW_TYPE", "thermal-reading")
+    script = 'print(\'{"temperature": "hot"}\')'
+
+    result = runner.invoke(
+        app, ["run", str(uuid4()), "--", sys.executable, "-c", script]
+    )
+
+    assert result.exit_code == 1
+    assert [r.event for r in sara.received] == ["started", "exited"]
+    assert sara.received[1].body == {
+        "exitStatus": "Failed",
+        "errorMessage": "Invalid result: result does not match the thermal-reading "
+        "schema: $.temperature: expected number, got string",
+    }
+
+
+def test_array_items_are_checked_with_their_index(monkeypatch, tmp_path: Path):
+    (tmp_path / "samples.schema.json").write_text(
+        json.dumps(
+            {
+                "type": "object",
+                "properties": {
+                    "samples": {"type": "array", "items": {"type": "number"}}
+                },
+            }
+        )
+    )
+    monkeypatch.setattr(settings, "RESULT_SCHEMA_DIR", str(tmp_path))
+    schema = result_schema.result_schema("samples")
+
+    with pytest.raises(ResultSchemaError) as error:
+        schema.validate_json('{"samples": [1, 2.5, null, 4]}')
+
+    assert error.value.path == "$.samples[2]"
+
+
+def test_compiled_schema_is_loaded_from_the_cache(monkeypatch):
+    result_schema.result_schema("cloe")
+    result_schema.result_schema.cache_clear()
+
+    with patch.object(
+        result_schema, "compile_schema", side_effect=AssertionError("compiled")
+    ):
+        schema = result_schema.result_schema("cloe")
+
+    with pytest.raises(ResultSchemaError):
+        schema.validate_json('{"oilLevel": 1.5, "confidence": 0.9}')
+
+
+def test_unsupported_keyword_is_refused():
+    with pytest.raises(SchemaError, match="unsupported keywords"):
+        compile_schema({"type": "object", "patternProperties": {}})
+
+
+def test_broken_schema_falls_back_to_syntax_check(
+    sara: SaraMock, monkeypatch, tmp_path: Path
+):
+    (tmp_path / "broken.schema.json").write_text('{"type": "object", "oneOf": []}')
+    monkeypatch.setattr(settings, "RESULT_SCHEMA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "WORKFLOW_TYPE", "broken")
+
+    result = runner.invoke(app, ["result", str(uuid4()), '{"anything": 1}'])
+
+    assert result.exit_code == 0, result.output
+    assert len(sara.received) == 1
+
+
+def test_broken_shipped_schema_fails_the_step(
+    sara: SaraMock, monkeypatch, tmp_path: Path
+):
+    (tmp_path / "broken.schema.json").write_text('{"type": "object", "oneOf": []}')
+    monkeypatch.setattr(result_schema, "SCHEMA_DIR", tmp_path)
+    monkeypatch.setattr(settings, "WORKFLOW_TYPE", "broken")
+    script = "print('{}')"
+
+    result = runner.invoke(
+        app, ["run", str(uuid4()), "--", sys.executable, "-c", script]
+    )
+
+    assert result.exit_code == 1
+    assert [r.event for r in sara.received] == ["started", "exited"]
+    assert sara.received[1].body["exitStatus"] == "Failed"
+    assert "unsupported keywords" in sara.received[1].body["errorMessage"]
@@ -0,0 +1,187 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+from unittest.mock import patch
+from uuid import uuid4
+
+from mocks.sara_mock import SaraMock
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifier import _deliver_event
+from workflow_notifier.server import NotificationServer, send_events
+
+
+@contextmanager
+def running_server(
+    socket_path: Path,
+    deliver: Callable[[dict], None],
+    concurrency: int = 4,
+    queue_size: int = 100,
+    progress_interval: float = 0.0,
+) -> Iterator[NotificationServer]:
+    server = NotificationServer(
+        str(socket_path),
+        deliver,
+        concurrency=concurrency,
+        queue_size=queue_size,
+        max_event_bytes=1024 * 1024,
+        progress_interval=progress_interval,
+    )
+    thread = threading.Thread(target=asyncio.run, args=(server.run(),))
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not socket_path.exists():
+        assert time.monotonic() < deadline, "server did not start"
+        time.sleep(0.01)
+    try:
+        yield server
+    finally:
+        server.stop()
+        thread.join(timeout=10)
+
+
+def _started(workflow_id: str) -> dict:
+    return {"workflowId": workflow_id, "event": "started"}
+
+
+def _exited(workflow_id: str) -> dict:
+    return {"workflowId": workflow_id, "event": "exited", "exitStatus": "Succeeded"}
+
+
+def test_events_for_a_workflow_are_delivered_in_order(tmp_path: Path):
+    delivered: list[tuple[str, str]] = []
+
+    def deliver(event: dict) -> None:
+        time.sleep(random.uniform(0, 0.01))
+        delivered.append((event["workflowId"], event["event"]))
+
+    workflow_ids = [str(uuid4()) for _ in range(10)]
+    events = [_started(w) for w in workflow_ids] + [_exited(w) for w in workflow_ids]
+
+    with running_server(tmp_path / "notifier.sock", deliver) as server:
+        replies = send_events(server.socket_path, events)
+
+    assert replies == [{"ok": True}] * len(events)
+    assert len(delivered) == len(events)
+    for workflow_id in workflow_ids:
+        assert [e for w, e in delivered if w == workflow_id] == ["Started", "Exited"]
+
+
+def test_invalid_events_are_rejected(tmp_path: Path):
+    delivered: list[dict] = []
+
+    with running_server(tmp_path / "notifier.sock", delivered.append) as server:
+        replies = send_events(
+            server.socket_path,
+            [{"workflowId": "nope", "event": "started"}, _started(str(uuid4()))],
+        )
+
+    assert replies[0]["ok"] is False
+    assert "workflowId" in replies[0]["error"]
+    assert replies[1] == {"ok": True}
+    assert len(delivered) == 1
+
+
+def test_full_queue_holds_back_the_client(tmp_path: Path):
+    release = threading.Event()
+    replies: list[dict] = []
+
+    def deliver(event: dict) -> None:
+        release.wait(timeout=10)
+
+    def client(socket_path: str) -> None:
+        for _ in range(3):
+            replies.extend(send_events(socket_path, [_started(str(uuid4()))]))
+
+    with running_server(
+        tmp_path / "notifier.sock", deliver, concurrency=1, queue_size=1
+    ) as server:
+        producer = threading.Thread(target=client, args=(server.socket_path,))
+        producer.start()
+        time.sleep(0.3)
+        # One event is being delivered and one is queued; the third waits.
+        assert len(replies) == 2
+        release.set()
+        producer.join(timeout=10)
+
+    assert len(replies) == 3
+
+
+def test_queued_events_are_delivered_on_stop(tmp_path: Path):
+    delivered: list[dict] = []
+
+    def deliver(event: dict) -> None:
+        time.sleep(0.05)
+        delivered.append(event)
+
+    with running_server(tmp_path / "notifier.sock", deliver, concurrency=1) as server:
+        send_events(server.socket_path, [_started(str(uuid4())) for _ in range(5)])
+
+    assert len(delivered) == 5
+    assert not (tmp_path / "notifier.sock").exists()
+
+
+def test_daemon_delivers_to_sara(tmp_path: Path, monkeypatch):
+    sara = SaraMock()
+    workflow_id = str(uuid4())
+    with (
+        patch(
+            "workflow_notifier.notifications.get_access_token",
+            return_value="fake-token",
+        ),
+        sara.serve() as base_url,
+    ):
+        monkeypatch.setattr(settings, "SARA_SERVER_URL", base_url)
+        with running_server(tmp_path / "notifier.sock", _deliver_event) as server:
+            send_events(
+                server.socket_path,
+                [
+                    _started(workflow_id),
+                    {
+                        "workflowId": workflow_id,
+                        "event": "result",
+                        "resultJson": '{"rain": true}',
+                    },
+                    _exited(workflow_id),
+                ],
+            )
+
+    assert [(n.event, n.body) for n in sara.received] == [
+        ("started", None),
+        ("result", {"resultJson": '{"rain": true}'}),
+        ("exited", {"exitStatus": "Succeeded"}),
+    ]
+
+
+def test_daemon_coalesces_progress_and_drops_it_on_exit(tmp_path: Path):
+    delivered: list[dict] = []
+    workflow_id = str(uuid4())
+
+    def progress(percent: float) -> dict:
+        return {"workflowId": workflow_id, "event": "progress", "percent": percent}
+
+    with running_server(
+        tmp_path / "notifier.sock", delivered.append, progress_interval=0.2
+    ) as server:
+        send_events(server.socket_path, [progress(10)])
+        time.sleep(0.05)
+        send_events(server.socket_path, [progress(20), progress(30)])
+        time.sleep(0.5)
+        send_events(
+            server.socket_path,
+            [
+                progress(40),
+                progress(50),
+                {"workflowId": workflow_id, "event": "exited", "exitStatus": "Failed"},
+            ],
+        )
+
+    assert [(e["event"], e.get("percent")) for e in delivered] == [
+        ("Progress", 10),
+        ("Progress", 30),
+        ("Progress", 40),
+        ("Exited", None),
+    ]
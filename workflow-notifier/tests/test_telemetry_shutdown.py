@@ -0,0 +1,98 @@
+"""Exit-time telemetry export in a fresh notifier process.
+
+Each test runs a short script that sets up OpenTelemetry, emits a span, a log
+record and a metric, and exits, so the bounded shutdown runs from ``atexit``
+exactly as it does at the end of an Argo step.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+SHUTDOWN_TIMEOUT_SECONDS = 1.0
+# Interpreter start-up and scheduling noise on a busy CI runner.
+SLACK_SECONDS = 1.5
+
+SCRIPT = """
+import logging
+
+from opentelemetry import metrics, trace
+
+from workflow_notifier.config.open_telemetry import setup_open_telemetry
+
+setup_open_telemetry()
+with trace.get_tracer("test").start_as_current_span("step"):
+    logging.getLogger("test").warning("step done")
+    metrics.get_meter("test").create_counter("steps").add(1)
+"""
+
+
+@pytest.fixture
+def dead_collector() -> Iterator[str]:
+    """A listener that accepts connections into its backlog but never answers."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(64)
+        yield f"http://127.0.0.1:{listener.getsockname()[1]}"
+
+
+def _run(tmp_path: Path, **env: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        env={
+            **os.environ,
+            "OTEL_SHUTDOWN_TIMEOUT_SECONDS": str(SHUTDOWN_TIMEOUT_SECONDS),
+            "OTEL_FILE_EXPORT_DIRECTORY": str(tmp_path / "otel"),
+            **env,
+        },
+        capture_output=True,
+        check=True,
+        timeout=60,
+    )
+    return time.perf_counter() - start
+
+
+def test_file_protocol_writes_otlp_json_lines(tmp_path: Path):
+    _run(tmp_path, OTEL_EXPORTER_OTLP_PROTOCOL="file")
+
+    otel = tmp_path / "otel"
+    traces = [json.loads(line) for line in (otel / "traces.jsonl").open()]
+    span = traces[0]["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "step"
+    assert len(span["traceId"]) == 32
+    int(span["traceId"], 16)
+
+    logs = [json.loads(line) for line in (otel / "logs.jsonl").open()]
+    bodies = [
+        record["body"]["stringValue"]
+        for request in logs
+        for resource in request["resourceLogs"]
+        for scope in resource["scopeLogs"]
+        for record in scope["logRecords"]
+    ]
+    assert "step done" in bodies
+
+    metrics = (otel / "metrics.jsonl").read_text()
+    assert '"name":"steps"' in metrics
+
+
+@pytest.mark.parametrize("protocol", ["http", "grpc"])
+def test_dead_collector_delays_exit_by_at_most_the_deadline(
+    tmp_path: Path, dead_collector: str, protocol: str
+):
+    baseline = _run(tmp_path, OTEL_EXPORTER_OTLP_PROTOCOL="file")
+    elapsed = _run(
+        tmp_path,
+        OTEL_EXPORTER_OTLP_PROTOCOL=protocol,
+        OTEL_EXPORTER_OTLP_ENDPOINT=dead_collector,
+    )
+
+    assert elapsed - baseline < SHUTDOWN_TIMEOUT_SECONDS + SLACK_SECONDS
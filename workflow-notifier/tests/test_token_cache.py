@@ -0,0 +1,114 @@
+import multiprocessing
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifications import get_access_token
+from workflow_notifier.token_cache import CachedToken, TokenCache
+
+KEY = "key"
+
+
+def _token(name: str, lifetime_seconds: int = 3600) -> CachedToken:
+    return CachedToken(name, int(time.time()) + lifetime_seconds)
+
+
+def test_cache_miss_acquires_and_stores(tmp_path: Path):
+    cache = TokenCache(str(tmp_path / "tokens.json"), refresh_margin_seconds=300)
+    acquire = MagicMock(return_value=_token("fresh"))
+
+    assert cache.get_or_acquire(KEY, acquire).token == "fresh"
+    assert cache.get_or_acquire(KEY, acquire).token == "fresh"
+    acquire.assert_called_once()
+
+
+def test_token_within_refresh_margin_is_refreshed(tmp_path: Path):
+    cache = TokenCache(str(tmp_path / "tokens.json"), refresh_margin_seconds=300)
+    cache.get_or_acquire(KEY, lambda: _token("stale", lifetime_seconds=60))
+
+    token = cache.get_or_acquire(KEY, lambda: _token("refreshed"))
+
+    assert token.token == "refreshed"
+
+
+def test_entries_are_keyed(tmp_path: Path):
+    cache = TokenCache(str(tmp_path / "tokens.json"), refresh_margin_seconds=300)
+    cache.get_or_acquire("a", lambda: _token("token-a"))
+
+    assert cache.get_or_acquire("b", lambda: _token("token-b")).token == "token-b"
+    assert cache.get_or_acquire("a", lambda: _token("other")).token == "token-a"
+
+
+def test_corrupt_cache_file_is_treated_as_miss(tmp_path: Path):
+    path = tmp_path / "tokens.json"
+    path.write_text("{not json")
+    cache = TokenCache(str(path), refresh_margin_seconds=300)
+
+    assert cache.get_or_acquire(KEY, lambda: _token("fresh")).token == "fresh"
+    assert cache.get_or_acquire(KEY, lambda: _token("other")).token == "fresh"
+
+
+def test_unusable_cache_location_falls_back_to_acquire(tmp_path: Path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = TokenCache(str(blocker / "tokens.json"), refresh_margin_seconds=300)
+
+    assert cache.get_or_acquire(KEY, lambda: _token("direct")).token == "direct"
+
+
+def test_acquire_errors_propagate(tmp_path: Path):
+    cache = TokenCache(str(tmp_path / "tokens.json"), refresh_margin_seconds=300)
+
+    def fail() -> CachedToken:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_acquire(KEY, fail)
+
+
+def _acquire_in_process(cache_path: str, counter_path: str) -> None:
+    def acquire() -> CachedToken:
+        with open(counter_path, "a") as f:
+            f.write("x")
+        time.sleep(0.2)
+        return _token("shared")
+
+    TokenCache(cache_path, refresh_margin_seconds=300).get_or_acquire(KEY, acquire)
+
+
+def test_concurrent_processes_acquire_once(tmp_path: Path):
+    cache_path = str(tmp_path / "tokens.json")
+    counter_path = tmp_path / "acquired"
+    counter_path.write_text("")
+
+    ctx = multiprocessing.get_context("fork")
+    processes = [
+        ctx.Process(target=_acquire_in_process, args=(cache_path, str(counter_path)))
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=10)
+
+    assert all(process.exitcode == 0 for process in processes)
+    assert counter_path.read_text() == "x"
+
+
+def test_get_access_token_reuses_cached_token(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_CACHE_PATH", str(tmp_path / "tokens.json"))
+    credential = MagicMock()
+    credential.get_token.return_value = MagicMock(
+        token="from-entra", expires_on=int(time.time()) + 3600
+    )
+
+    with patch(
+        "workflow_notifier.notifications._get_credential", return_value=credential
+    ):
+        assert get_access_token() == "from-entra"
+        assert get_access_token() == "from-entra"
+
+    credential.get_token.assert_called_once()
@@ -0,0 +1,92 @@
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+import requests_mock
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from typer.testing import CliRunner
+
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifier import app
+
+runner = CliRunner()
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_SPAN_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture(scope="module")
+def provider_exporter() -> InMemorySpanExporter:
+    # The global tracer provider can only be set once per process, so the
+    # other test modules share it.
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return exporter
+
+
+@pytest.fixture
+def exporter(provider_exporter: InMemorySpanExporter) -> InMemorySpanExporter:
+    provider_exporter.clear()
+    return provider_exporter
+
+
+def test_command_continues_argo_trace_and_propagates_to_sara(
+    exporter: InMemorySpanExporter, monkeypatch
+):
+    monkeypatch.setenv("TRACEPARENT", f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01")
+    workflow_id = uuid4()
+
+    with (
+        requests_mock.Mocker() as mock_http,
+        patch("workflow_notifier.notifications.get_access_token", return_value="token"),
+    ):
+        mock_http.put(
+            f"{settings.workflow_base_url}/{workflow_id}/result", status_code=204
+        )
+        result = runner.invoke(app, ["result", str(workflow_id), '{"rain": true}'])
+        traceparent = mock_http.last_request.headers["traceparent"]
+
+    assert result.exit_code == 0
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    command = spans["notifier result"]
+    assert format(command.context.trace_id, "032x") == TRACE_ID
+    assert format(command.parent.span_id, "016x") == PARENT_SPAN_ID
+    assert command.attributes["workflow.id"] == str(workflow_id)
+
+    for name in ("token", "validate", "request"):
+        assert spans[name].parent.span_id == command.context.span_id
+    put = spans["PUT"]
+    assert put.parent.span_id == spans["request"].context.span_id
+    assert put.attributes["http.response.status_code"] == 204
+    assert traceparent == f"00-{TRACE_ID}-{format(put.context.span_id, '016x')}-01"
+
+
+def test_retried_request_has_a_span_per_attempt(exporter: InMemorySpanExporter):
+    workflow_id = uuid4()
+
+    with (
+        requests_mock.Mocker() as mock_http,
+        patch("workflow_notifier.notifications.get_access_token", return_value="token"),
+        patch("workflow_notifier.transport._sleep"),
+    ):
+        mock_http.put(
+            f"{settings.workflow_base_url}/{workflow_id}/started",
+            [{"status_code": 503}, {"status_code": 204}],
+        )
+        result = runner.invoke(app, ["started", str(workflow_id)])
+
+    assert result.exit_code == 0
+    attempts = [s for s in exporter.get_finished_spans() if s.name == "PUT"]
+    assert [s.attributes["http.response.status_code"] for s in attempts] == [
+        503,
+        204,
+    ]
+    assert attempts[1].attributes["http.request.resend_count"] == 1
+    command = next(
+        s for s in exporter.get_finished_spans() if s.name == "notifier started"
+    )
+    assert command.parent is None
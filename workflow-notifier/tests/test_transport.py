@@ -0,0 +1,132 @@
+import json
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+import requests
+from typer.testing import CliRunner
+
+from workflow_notifier import transport
+from workflow_notifier.config.settings import settings
+from workflow_notifier.notifier import app
+
+runner = CliRunner()
+WORKFLOW_ID = uuid4()
+URL = "http://sara-test.local/api/workflow/x/started"
+
+
+pytestmark = pytest.mark.usefixtures("fake_token")
+
+
+@pytest.fixture
+def sleep(monkeypatch) -> MagicMock:
+    sleep = MagicMock()
+    monkeypatch.setattr(transport, "_sleep", sleep)
+    return sleep
+
+
+def _put() -> requests.Response:
+    return transport.put_with_retry(URL, {}, lambda: {"json": None})
+
+
+def test_retries_transient_status_then_succeeds(mock_http, sleep):
+    mock_http.put(
+        URL, [{"status_code": 503}, {"status_code": 502}, {"status_code": 204}]
+    )
+
+    assert _put().status_code == 204
+    assert mock_http.call_count == 3
+    assert sleep.call_count == 2
+
+
+def test_retry_after_is_honoured(mock_http, sleep):
+    mock_http.put(
+        URL,
+        [{"status_code": 429, "headers": {"Retry-After": "7"}}, {"status_code": 204}],
+    )
+
+    _put()
+
+    sleep.assert_called_once_with(7.0)
+
+
+def test_retry_after_is_capped(mock_http, sleep, monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_RETRY_BACKOFF_MAX_SECONDS", 2.0)
+    mock_http.put(
+        URL,
+        [{"status_code": 503, "headers": {"Retry-After": "600"}}, {"status_code": 204}],
+    )
+
+    _put()
+
+    sleep.assert_called_once_with(2.0)
+
+
+def test_backoff_is_jittered_and_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_RETRY_BACKOFF_BASE_SECONDS", 1.0)
+    monkeypatch.setattr(settings, "HTTP_RETRY_BACKOFF_MAX_SECONDS", 5.0)
+
+    delays = [transport._backoff(attempt) for attempt in range(1, 8) for _ in range(50)]
+
+    assert all(0 <= delay <= 5.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_gives_up_after_max_retries(mock_http, sleep, monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_MAX_RETRIES", 2)
+    mock_http.put(URL, status_code=503)
+
+    with pytest.raises(requests.HTTPError):
+        _put()
+    assert mock_http.call_count == 3
+
+
+def test_client_errors_are_not_retried(mock_http, sleep):
+    mock_http.put(URL, status_code=404)
+
+    with pytest.raises(requests.HTTPError):
+        _put()
+    assert mock_http.call_count == 1
+    sleep.assert_not_called()
+
+
+def test_connection_errors_are_retried(mock_http, sleep):
+    mock_http.put(
+        URL, [{"exc": requests.exceptions.ConnectTimeout}, {"status_code": 204}]
+    )
+
+    assert _put().status_code == 204
+    assert mock_http.call_count == 2
+
+
+def test_timeouts_come_from_settings(mock_http, monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_CONNECT_TIMEOUT_SECONDS", 1.5)
+    monkeypatch.setattr(settings, "HTTP_READ_TIMEOUT_SECONDS", 9.0)
+    mock_http.put(URL, status_code=204)
+
+    _put()
+
+    assert mock_http.last_request.timeout == (1.5, 9.0)
+
+
+def test_streamed_result_is_resent_in_full_on_retry(mock_http, sleep, tmp_path):
+    url = f"{settings.workflow_base_url}/{WORKFLOW_ID}/result"
+    payload = json.dumps({"temperatures": list(range(50_000))})
+    result_file = tmp_path / "result.json"
+    result_file.write_text(payload)
+    bodies = []
+
+    def callback(request, context):
+        bodies.append(b"".join(request.body))
+        context.status_code = 503 if len(bodies) == 1 else 204
+        return ""
+
+    mock_http.put(url, text=callback)
+
+    result = runner.invoke(
+        app, ["result", str(WORKFLOW_ID), "--from-file", str(result_file)]
+    )
+
+    assert result.exit_code == 0
+    assert len(bodies) == 2
+    assert bodies[0] == bodies[1]